@@ -0,0 +1,4 @@
+""" Benchmarks for the XML mapper and the connection layer.
+
+Run them with `python -m benchmarks` (see `python -m benchmarks --help` for the options).
+"""
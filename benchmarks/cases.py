@@ -0,0 +1,174 @@
+""" Benchmark cases.
+
+Each case is a function (registered with `@case`) that receives the `Config` of the run and
+returns a `Case`: the callable to measure, plus what it processes (used to compute the throughput).
+"""
+from dataclasses import dataclass, field
+from pathlib import Path
+import tempfile
+from typing import Any, Callable, Optional
+
+import lxml.etree as ET
+
+from easyfatt_db_connector.xml import iter_documents, read_xml
+from easyfatt_db_connector.xml.company import Company
+from easyfatt_db_connector.xml.document import Document, Payment
+from easyfatt_db_connector.xml.product import Product
+from easyfatt_db_connector.xml.root import EasyfattXML
+
+
+@dataclass
+class Config(object):
+    """ Input files shared by all the cases of a run. """
+
+    xml_path: Path
+    """ Synthetic `.DefXml` file. """
+
+    archive_path: Path
+    """ Synthetic archive (random bytes) used to measure the snapshot cost. """
+
+    database_path: Optional[Path] = None
+    """ Real Easyfatt archive used to measure `EasyfattFDB.connect` (requires the Firebird client). """
+
+
+@dataclass
+class Case(object):
+    """ What a benchmark case measures. """
+
+    run: Callable[[], Any]
+    """ The function that is timed. """
+
+    items: int
+    """ Number of items processed by each call of `run`. """
+
+    unit: str
+    """ Name of the items (e.g. `documents`). """
+
+    size: int = 0
+    """ Number of bytes processed by each call of `run` (0 if not meaningful). """
+
+    teardown: Optional[Callable[[], None]] = None
+    """ Called once all the measurements are done. """
+
+    info: "dict[str, Any]" = field(default_factory=dict)
+    """ Additional information included in the report. """
+
+
+CASES: "dict[str, Callable[[Config], Optional[Case]]]" = {}
+""" All the registered cases, by name. """
+
+
+def case(name: str):
+    """ Registers a benchmark case. The function may return `None` if the case cannot run with the given config. """
+
+    def decorator(function: Callable[[Config], Optional[Case]]):
+        CASES[name] = function
+        return function
+
+    return decorator
+
+
+def _count_documents(path: Path) -> int:
+    return sum(1 for _ in ET.iterparse(str(path), tag="Document", huge_tree=True))
+
+
+@case("read_xml")
+def bench_read_xml(config: Config) -> Case:
+    return Case(
+        run=lambda: read_xml(config.xml_path),
+        items=_count_documents(config.xml_path),
+        unit="documents",
+        size=config.xml_path.stat().st_size,
+    )
+
+
+@case("iter_documents")
+def bench_iter_documents(config: Config) -> Case:
+    def run():
+        for _ in iter_documents(config.xml_path):
+            pass
+
+    return Case(
+        run=run,
+        items=_count_documents(config.xml_path),
+        unit="documents",
+        size=config.xml_path.stat().st_size,
+    )
+
+
+def _from_xml_case(cls: type, xpath: str) -> Callable[[Config], Case]:
+    """ Creates a case measuring `cls.from_xml` on all the elements matching `xpath` (the parsing itself is excluded). """
+
+    def factory(config: Config) -> Case:
+        tree = ET.parse(str(config.xml_path), parser=ET.XMLParser(huge_tree=True))
+        elements = tree.xpath(xpath)
+
+        def run():
+            for element in elements:
+                cls.from_xml(element)
+
+        return Case(run=run, items=len(elements), unit="elements")
+
+    return factory
+
+
+for _cls, _xpath in [
+    (EasyfattXML, "/EasyfattDocuments"),
+    (Company, "/EasyfattDocuments/Company"),
+    (Document, "/EasyfattDocuments/Documents/Document"),
+    (Product, "/EasyfattDocuments/Documents/Document/Rows/Row"),
+    (Payment, "/EasyfattDocuments/Documents/Document/Payments/Payment"),
+]:
+    case(f"from_xml[{_cls.__name__}]")(_from_xml_case(_cls, _xpath))
+
+
+def _snapshot_case(force: bool) -> Callable[[Config], Case]:
+    """ Creates a case measuring the snapshot taken by each connection (`force=True` always copies the archive). """
+
+    def factory(config: Config) -> Case:
+        from easyfatt_db_connector.core.connection._snapshot import SnapshotManager
+
+        folder = tempfile.TemporaryDirectory()
+        manager = SnapshotManager(config.archive_path, directory=folder.name)
+        strategy = manager.refresh().strategy
+
+        def teardown():
+            manager.close()
+            folder.cleanup()
+
+        return Case(
+            run=lambda: manager.refresh(force=force),
+            items=1,
+            unit="snapshots",
+            size=config.archive_path.stat().st_size if force else 0,
+            teardown=teardown,
+            info={"strategy": strategy},
+        )
+
+    return factory
+
+
+case("snapshot[copy]")(_snapshot_case(force=True))
+case("snapshot[cached]")(_snapshot_case(force=False))
+
+
+@case("EasyfattFDB.connect")
+def bench_connect(config: Config) -> Optional[Case]:
+    if config.database_path is None:
+        return None
+
+    from easyfatt_db_connector.core.connection import EasyfattFDB
+
+    database = EasyfattFDB(config.database_path)
+
+    def run():
+        with database.connect():
+            pass
+
+    return Case(
+        run=run,
+        items=1,
+        unit="connections",
+        teardown=database.snapshots.close,
+        info={"strategy": database.snapshots.refresh().strategy},
+    )
@@ -0,0 +1,192 @@
+""" Runs the benchmarks and prints a report with the throughput and the peak memory of each case.
+
+Every case runs in a new process, so that its peak memory is not affected by the other cases.
+
+Examples:
+    ```shell
+    python -m benchmarks
+    python -m benchmarks --documents 5000 --rows 50 --pdf-size 200000 --repeat 5
+    python -m benchmarks "from_xml[*]" --json results.json
+    python -m benchmarks --database "~/Documents/Danea Easyfatt/Archivio.eft"
+    ```
+"""
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+import fnmatch
+import gc
+import json
+import multiprocessing
+from pathlib import Path
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Optional
+
+from benchmarks.cases import CASES, Config
+from benchmarks.synthetic import generate_archive, generate_defxml
+
+
+@dataclass
+class Result(object):
+    """ Measurements of a single case. """
+
+    name: str
+    items: int
+    unit: str
+    size: int
+    timings: "list[float]"
+    """ Duration (in seconds) of each repetition. """
+
+    peak_python: int
+    """ Peak of the memory allocated by Python (see `tracemalloc`), in bytes. """
+
+    peak_rss: Optional[int]
+    """ Growth of the peak resident memory of the process (including `libxml2`), in bytes. Not available on Windows. """
+
+    info: "dict[str, Any]" = field(default_factory=dict)
+
+    @property
+    def best(self) -> float:
+        return min(self.timings)
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.timings)
+
+
+def _max_rss() -> Optional[int]:
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def run_case(name: str, config: Config, repeat: int) -> Optional[Result]:
+    """ Runs a case (in the current process) and returns its measurements. """
+    case = CASES[name](config)
+    if case is None:
+        return None
+
+    try:
+        gc.collect()
+        rss_before = _max_rss()
+
+        # The first run also warms up the caches (e.g. the parse plans) and measures the memory
+        tracemalloc.start()
+        case.run()
+        _, peak_python = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        timings = []
+        for _ in range(repeat):
+            gc.collect()
+            start = time.perf_counter()
+            case.run()
+            timings.append(time.perf_counter() - start)
+
+        rss_after = _max_rss()
+    finally:
+        if case.teardown is not None:
+            case.teardown()
+
+    return Result(
+        name=name,
+        items=case.items,
+        unit=case.unit,
+        size=case.size,
+        timings=timings,
+        peak_python=peak_python,
+        peak_rss=None if rss_before is None else rss_after - rss_before,
+        info=case.info,
+    )
+
+
+def _format_size(size: Optional[float]) -> str:
+    if size is None:
+        return "n/a"
+
+    for unit in ["B", "KiB", "MiB", "GiB"]:
+        if abs(size) < 1024 or unit == "GiB":
+            return f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def print_report(results: "list[Result]"):
+    header = f"{'case':<28} {'best':>10} {'median':>10} {'throughput':>24} {'bandwidth':>12} {'peak (py)':>11} {'peak (rss)':>11}"
+    print(header)
+    print("-" * len(header))
+
+    for result in results:
+        throughput = f"{result.items / result.best:,.1f} {result.unit}/s"
+        bandwidth = f"{_format_size(result.size / result.best)}/s" if result.size else ""
+        print(
+            f"{result.name:<28} {result.best * 1000:>8.2f}ms {result.median * 1000:>8.2f}ms {throughput:>24} "
+            f"{bandwidth:>12} {_format_size(result.peak_python):>11} {_format_size(result.peak_rss):>11}"
+            + "".join(f"  {key}={value}" for key, value in result.info.items())
+        )
+
+
+def main(arguments: Optional["list[str]"] = None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.splitlines()[0])
+    parser.add_argument("cases", nargs="*", default=["*"], help="Names (or glob patterns) of the cases to run. Defaults to all.")
+    parser.add_argument("--list", action="store_true", help="List the available cases and exit.")
+    parser.add_argument("--documents", type=int, default=1000, help="Number of documents of the synthetic XML file.")
+    parser.add_argument("--rows", type=int, default=10, help="Number of rows per document.")
+    parser.add_argument("--pdf-size", type=int, default=0, help="Size (in bytes) of the PDF embedded in each document.")
+    parser.add_argument("--archive-size", type=int, default=64, help="Size (in MiB) of the synthetic archive.")
+    parser.add_argument("--database", type=Path, help="Real Easyfatt archive used to benchmark `EasyfattFDB.connect`.")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of timed repetitions of each case.")
+    parser.add_argument("--json", type=Path, help="Also write the results to this JSON file.")
+    args = parser.parse_args(arguments)
+
+    if args.list:
+        print("\n".join(CASES))
+        return
+
+    names = [name for name in CASES if any(fnmatch.fnmatchcase(name, pattern) for pattern in args.cases)]
+    if not names:
+        parser.error(f"No case matches {args.cases}")
+
+    with tempfile.TemporaryDirectory() as folder:
+        config = Config(
+            xml_path=generate_defxml(
+                Path(folder) / "synthetic.DefXml",
+                documents=args.documents,
+                rows=args.rows,
+                pdf_size=args.pdf_size,
+            ),
+            archive_path=generate_archive(Path(folder) / "synthetic.eft", args.archive_size * 1024 * 1024),
+            database_path=args.database.expanduser() if args.database else None,
+        )
+        print(
+            f"XML: {args.documents} documents, {args.rows} rows each, {args.pdf_size} bytes PDF "
+            f"({_format_size(config.xml_path.stat().st_size)}) - Archive: {args.archive_size} MiB\n"
+        )
+
+        results = []
+        context = multiprocessing.get_context("spawn")
+        for name in names:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                result = executor.submit(run_case, name, config, args.repeat).result()
+
+            if result is not None:
+                results.append(result)
+
+    print_report(results)
+
+    if args.json:
+        args.json.write_text(
+            json.dumps([{**asdict(result), "best": result.best, "median": result.median} for result in results], indent=4),
+            encoding="utf-8",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+""" Generators of synthetic `.DefXml` files and archives used by the benchmarks. """
+import base64
+import os
+from pathlib import Path
+import random
+from typing import Union
+from xml.sax.saxutils import escape
+
+HEADER = """<?xml version="1.0" encoding="UTF-8"?>
+<EasyfattDocuments AppVersion="2" Creator="Danea Soft" CreatorUrl="http://www.danea.it">
+  <Company>
+    <Name>Tuttobimbi Srl</Name>
+    <Address>Via Armando Diaz, 162</Address>
+    <Postcode>35010</Postcode>
+    <City>Vigonza</City>
+    <Province>PD</Province>
+    <Country>Italia</Country>
+    <FiscalCode>00165987261</FiscalCode>
+    <VatCode>00165987261</VatCode>
+  </Company>
+  <Documents>
+"""
+
+FOOTER = """  </Documents>
+</EasyfattDocuments>
+"""
+
+DOCUMENT_TYPES = "ABCDEFGHIJLMNOPQRS"
+
+
+def generate_row(rng: random.Random, index: int) -> str:
+    """ Returns a synthetic `<Row>` element. """
+    quantity = rng.randint(1, 20)
+    price = round(rng.uniform(0.5, 500), 2)
+
+    return f"""      <Row>
+        <Code>{index:06d}</Code>
+        <Description>{escape(f"Articolo di prova n° {index}")}</Description>
+        <Qty>{quantity}</Qty>
+        <Um>pz</Um>
+        <Price>{price}</Price>
+        <Discounts/>
+        <VatCode Perc="22" Class="Imponibile" Description="Aliquota 22%">22</VatCode>
+        <Total>{round(quantity * price, 2)}</Total>
+        <Stock>{"true" if index % 2 else "false"}</Stock>
+        <Notes/>
+      </Row>
+"""
+
+
+def generate_document(rng: random.Random, number: int, rows: int, pdf_size: int = 0) -> str:
+    """ Returns a synthetic `<Document>` element.
+
+    Args:
+        rng (random.Random): The random generator.
+        number (int): The number of the document.
+        rows (int): Number of `<Row>` elements.
+        pdf_size (int, optional): Size (in bytes, before the base64 encoding) of the embedded PDF. Defaults to 0 (no PDF).
+    """
+    pdf = ""
+    if pdf_size > 0:
+        content = base64.encodebytes(rng.randbytes(pdf_size) if hasattr(rng, "randbytes") else os.urandom(pdf_size))
+        pdf = f'    <Pdf FileName="Documento-{number}.pdf">{content.decode("ascii")}</Pdf>\n'
+
+    payments = "".join(
+        f"""      <Payment>
+        <Advance>false</Advance>
+        <Date>2023-{month:02d}-28</Date>
+        <Amount>{round(rng.uniform(10, 1000), 2)}</Amount>
+        <Paid>{"true" if month % 2 else "false"}</Paid>
+      </Payment>
+"""
+        for month in range(1, 3)
+    )
+
+    return f"""    <Document>
+    <CustomerCode>{number % 500:04d}</CustomerCode>
+    <CustomerName>Cliente {number % 500}</CustomerName>
+    <CustomerAddress>Via Roma, {number % 200}</CustomerAddress>
+    <CustomerPostcode>10100</CustomerPostcode>
+    <CustomerCity>Torino</CustomerCity>
+    <CustomerProvince>TO</CustomerProvince>
+    <CustomerVatCode>01234567890</CustomerVatCode>
+    <DocumentType>{DOCUMENT_TYPES[number % len(DOCUMENT_TYPES)]}</DocumentType>
+    <Date>2023-{1 + number % 12:02d}-{1 + number % 28:02d}</Date>
+    <Number>{number}</Number>
+    <Numbering/>
+    <TotalWithoutTax>{round(rng.uniform(10, 10000), 2)}</TotalWithoutTax>
+    <VatAmount>{round(rng.uniform(1, 2000), 2)}</VatAmount>
+    <Total>{round(rng.uniform(10, 12000), 2)}</Total>
+    <PricesIncludeVat>false</PricesIncludeVat>
+    <PaymentName>Bonifico 30 gg</PaymentName>
+    <Payments>
+{payments}    </Payments>
+    <Rows>
+{"".join(generate_row(rng, index) for index in range(rows))}    </Rows>
+{pdf}    </Document>
+"""
+
+
+def generate_defxml(
+    path: Union[str, Path],
+    documents: int = 100,
+    rows: int = 10,
+    pdf_size: int = 0,
+    seed: int = 0,
+) -> Path:
+    """ Writes a synthetic `.DefXml` file (one document at a time, so that big files can be generated).
+
+    Args:
+        path (str | Path): Path of the file.
+        documents (int, optional): Number of `<Document>` elements. Defaults to 100.
+        rows (int, optional): Number of `<Row>` elements per document. Defaults to 10.
+        pdf_size (int, optional): Size (in bytes) of the PDF embedded in each document. Defaults to 0 (no PDF).
+        seed (int, optional): Seed of the random generator (the same seed always generates the same file). Defaults to 0.
+
+    Returns:
+        Path: The path of the file.
+    """
+    rng = random.Random(seed)
+    path = Path(path)
+
+    with open(path, "w", encoding="utf-8", newline="\n") as file:
+        file.write(HEADER)
+        for number in range(1, documents + 1):
+            file.write(generate_document(rng, number, rows, pdf_size))
+        file.write(FOOTER)
+
+    return path
+
+
+def generate_archive(path: Union[str, Path], size: int, seed: int = 0) -> Path:
+    """ Writes a file of random bytes, used as a fake `.eft` archive to measure the snapshot cost.
+
+    Args:
+        path (str | Path): Path of the file.
+        size (int): Size of the file in bytes.
+        seed (int, optional): Seed of the random generator. Defaults to 0.
+
+    Returns:
+        Path: The path of the file.
+    """
+    rng = random.Random(seed)
+    path = Path(path)
+    chunk_size = 1024 * 1024
+
+    with open(path, "wb") as file:
+        written = 0
+        while written < size:
+            length = min(chunk_size, size - written)
+            file.write(rng.randbytes(length) if hasattr(rng, "randbytes") else os.urandom(length))
+            written += length
+
+    return path
@@ -1,4 +1,13 @@
+from ._async import AsyncCursor, AsyncFDBConnection, AsyncSQLAlchemyConnection
 from ._fdb import EasyfattFDB
+from ._pool import FDBConnectionPool
 from ._sqlalchemy import EasyfattDB
 
-__all__ = ["EasyfattFDB", "EasyfattDB"]
\ No newline at end of file
+__all__ = [
+    "EasyfattFDB",
+    "EasyfattDB",
+    "FDBConnectionPool",
+    "AsyncCursor",
+    "AsyncFDBConnection",
+    "AsyncSQLAlchemyConnection",
+]
\ No newline at end of file
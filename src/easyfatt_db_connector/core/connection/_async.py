@@ -0,0 +1,286 @@
+""" Asyncio facade over the (blocking) connections of `EasyfattFDB` and `EasyfattDB`.
+
+Every blocking call (the snapshot copy made by `connect`, the attach, the queries and the fetches)
+runs on a dedicated and bounded thread pool owned by the database object (see `AsyncExecutor`), so
+the event loop is never blocked. The size of the pool also bounds the number of Firebird calls
+running at the same time.
+
+Example:
+    ```python
+    database = EasyfattFDB(archive_path=database_path)
+
+    async with database.aconnect() as connection:
+        cursor = await connection.execute('SELECT * FROM "TDocRighe"')
+
+        async for row in cursor:
+            print(row)
+    ```
+"""
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+import functools
+import threading
+from typing import Any, AsyncGenerator, AsyncIterator, Callable, ContextManager, Optional
+
+__all__ = ["AsyncExecutor", "AsyncCursor", "AsyncFDBConnection", "AsyncSQLAlchemyConnection"]
+
+DEFAULT_ASYNC_WORKERS = 4
+""" Default number of threads running the blocking calls of a database object. """
+
+DEFAULT_ARRAYSIZE = 1000
+""" Default number of rows fetched by each call of `AsyncCursor.fetchmany` (and by the async iteration). """
+
+
+class AsyncExecutor(object):
+    """ Bounded thread pool running the blocking calls of a database object.
+
+    The threads are created only when the first call is made.
+    """
+
+    max_workers: int
+
+    def __init__(self, max_workers: int = DEFAULT_ASYNC_WORKERS, name: str = "easyfatt-db") -> None:
+        """ Initialize a new executor.
+
+        Args:
+            max_workers (int, optional): Maximum number of threads. Defaults to DEFAULT_ASYNC_WORKERS.
+            name (str, optional): Prefix of the names of the threads. Defaults to "easyfatt-db".
+        """
+        if max_workers < 1:
+            raise ValueError("The executor must have at least 1 worker")
+
+        self.max_workers = max_workers
+        self._name = name
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"<AsyncExecutor: {self._name} (max_workers={self.max_workers})>"
+
+    def run(self, function: Callable, *args, **kwargs) -> "asyncio.Future":
+        """ Runs a blocking function in the thread pool (MUST be called from the event loop).
+
+        Args:
+            function (Callable): The function.
+            *args: Positional arguments passed to the function.
+            **kwargs: Keyword arguments passed to the function.
+
+        Returns:
+            asyncio.Future: The future of the result of the function.
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix=self._name)
+            executor = self._executor
+
+        return asyncio.get_running_loop().run_in_executor(executor, functools.partial(function, *args, **kwargs))
+
+    def shutdown(self, wait: bool = True):
+        """ Stops the threads (new ones will be created on the next call of `run`).
+
+        Args:
+            wait (bool, optional): Whether to wait for the running calls to complete. Defaults to True.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+class AsyncCursor(object):
+    """ Async wrapper of an `fdb.Cursor` (or of a `sqlalchemy.engine.Result`).
+
+    Iterating over the cursor with `async for` fetches the rows `arraysize` at a time.
+    """
+
+    cursor: Any
+    """ The wrapped (blocking) cursor. """
+
+    arraysize: int
+    """ Number of rows fetched by `fetchmany` when the size is not given. """
+
+    def __init__(self, cursor: Any, executor: AsyncExecutor, arraysize: int = DEFAULT_ARRAYSIZE) -> None:
+        self.cursor = cursor
+        self.arraysize = arraysize
+        self._executor = executor
+
+    async def execute(self, query: str, parameters: Optional[Any] = None) -> "AsyncCursor":
+        """ Executes a query (only for the `fdb` cursors).
+
+        Args:
+            query (str): The query.
+            parameters (Any, optional): The parameters of the query. Defaults to None.
+
+        Returns:
+            AsyncCursor: The cursor itself.
+        """
+        await self._executor.run(self.cursor.execute, query, parameters)
+        return self
+
+    async def fetchone(self) -> Optional[Any]:
+        """ Returns the next row (`None` if there are no more rows). """
+        return await self._executor.run(self.cursor.fetchone)
+
+    async def fetchmany(self, size: Optional[int] = None) -> "list[Any]":
+        """ Returns the next rows.
+
+        Args:
+            size (int, optional): Maximum number of rows. Defaults to `AsyncCursor.arraysize`.
+
+        Returns:
+            list: The rows (empty if there are no more rows).
+        """
+        return list(await self._executor.run(self.cursor.fetchmany, self.arraysize if size is None else size))
+
+    async def fetchall(self) -> "list[Any]":
+        """ Returns all the remaining rows. """
+        return list(await self._executor.run(self.cursor.fetchall))
+
+    async def close(self):
+        """ Closes the cursor. """
+        await self._executor.run(self.cursor.close)
+
+    async def batches(self, size: Optional[int] = None) -> AsyncGenerator["list[Any]", None]:
+        """ Yields the remaining rows in batches (see `fetchmany`).
+
+        Args:
+            size (int, optional): Maximum number of rows of each batch. Defaults to `AsyncCursor.arraysize`.
+
+        Yields:
+            list: The rows.
+        """
+        while True:
+            rows = await self.fetchmany(size)
+            if not rows:
+                return
+
+            yield rows
+
+    async def _iterate(self) -> AsyncGenerator[Any, None]:
+        async for rows in self.batches():
+            for row in rows:
+                yield row
+
+    def __aiter__(self) -> AsyncIterator[Any]:
+        return self._iterate()
+
+
+class AsyncFDBConnection(object):
+    """ Async wrapper of a connection returned by `EasyfattFDB.connect` (see `EasyfattFDB.aconnect`). """
+
+    connection: Any
+    """ The wrapped (blocking) `fdb` connection. """
+
+    def __init__(self, connection: Any, executor: AsyncExecutor) -> None:
+        self.connection = connection
+        self._executor = executor
+
+    def cursor(self) -> AsyncCursor:
+        """ Returns a new cursor (creating a cursor does not call the database). """
+        return AsyncCursor(self.connection.cursor(), self._executor)
+
+    async def execute(self, query: str, parameters: Optional[Any] = None) -> AsyncCursor:
+        """ Executes a query on a new cursor.
+
+        Args:
+            query (str): The query.
+            parameters (Any, optional): The parameters of the query. Defaults to None.
+
+        Returns:
+            AsyncCursor: The cursor, ready to fetch the rows.
+        """
+        return await self.cursor().execute(query, parameters)
+
+    async def commit(self):
+        """ Commits the current transaction. """
+        await self._executor.run(self.connection.commit)
+
+    async def rollback(self):
+        """ Rolls back the current transaction. """
+        await self._executor.run(self.connection.rollback)
+
+
+class AsyncSQLAlchemyConnection(object):
+    """ Async wrapper of a connection returned by `EasyfattDB.connect` (see `EasyfattDB.aconnect`). """
+
+    connection: Any
+    """ The wrapped (blocking) `sqlalchemy.engine.Connection`. """
+
+    def __init__(self, connection: Any, executor: AsyncExecutor) -> None:
+        self.connection = connection
+        self._executor = executor
+
+    async def execute(self, statement: Any, parameters: Optional[Any] = None) -> AsyncCursor:
+        """ Executes a statement.
+
+        Args:
+            statement (Any): The statement (e.g. `sqlalchemy.select(TDocRighe)` or `sqlalchemy.text(...)`).
+            parameters (Any, optional): The parameters of the statement. Defaults to None.
+
+        Returns:
+            AsyncCursor: The result, ready to fetch the rows.
+        """
+        result = await self._executor.run(self.connection.execute, statement, parameters)
+        return AsyncCursor(result, self._executor)
+
+    async def stream(self, statement: Any, parameters: Optional[Any] = None) -> AsyncCursor:
+        """ Executes a statement, fetching the rows from the server only while they are read (`stream_results`).
+
+        See `execute` for the arguments.
+        """
+        connection = self.connection.execution_options(stream_results=True)
+        result = await self._executor.run(connection.execute, statement, parameters)
+        return AsyncCursor(result, self._executor)
+
+    async def commit(self):
+        """ Commits the current transaction. """
+        await self._executor.run(self.connection.commit)
+
+    async def rollback(self):
+        """ Rolls back the current transaction. """
+        await self._executor.run(self.connection.rollback)
+
+
+def _exit_abandoned(context: ContextManager, executor: AsyncExecutor, future: "asyncio.Future"):
+    """ Closes a connection opened by a worker thread after the task waiting for it was cancelled. """
+    if not future.cancelled() and future.exception() is None:
+        executor.run(context.__exit__, None, None, None)
+
+
+@asynccontextmanager
+async def open_async(
+    context_factory: Callable[[], ContextManager],
+    wrapper: Callable[[Any, AsyncExecutor], Any],
+    executor: AsyncExecutor,
+) -> AsyncGenerator[Any, None]:
+    """ Enters and exits a (blocking) connection context manager in the thread pool.
+
+    Args:
+        context_factory (Callable): Function returning the context manager (e.g. `lambda: database.connect()`).
+        wrapper (Callable): Class wrapping the connection (e.g. `AsyncFDBConnection`).
+        executor (AsyncExecutor): The thread pool.
+
+    Yields:
+        Any: The wrapped connection.
+    """
+    context = context_factory()
+
+    future = executor.run(context.__enter__)
+    try:
+        # The connection cannot be interrupted while it is being opened (e.g. during the copy of the archive)
+        connection = await asyncio.shield(future)
+    except asyncio.CancelledError:
+        future.add_done_callback(functools.partial(_exit_abandoned, context, executor))
+        raise
+
+    try:
+        yield wrapper(connection, executor)
+    except BaseException as e:
+        if not await executor.run(context.__exit__, type(e), e, e.__traceback__):
+            raise
+    else:
+        await executor.run(context.__exit__, None, None, None)
@@ -13,6 +13,45 @@ from easyfatt_db_connector.constants import (
     DEFAULT_FIREBIRD_LOCATION,
 )
 from easyfatt_db_connector.core.exceptions import FirebirdClientError
+from easyfatt_db_connector.core.connection._async import AsyncExecutor
+from easyfatt_db_connector.core.connection._snapshot import SnapshotManager
+from easyfatt_db_connector.utils.filesystem import is_file_locked
+
+
+DIRECT_CONNECT_ARGS = {
+    "isolation_level": fdb.ISOLATION_LEVEL_READ_COMMITED_RO,
+    "no_gc": True,
+}
+""" Arguments of `fdb.connect` used to attach the archive directly or a shared snapshot (see `EasyfattFDB.connect`).
+
+Every transaction is read-only (so no query can modify the archive) and the attachment does not
+run the garbage collection, which would otherwise write to the archive while reading it.
+"""
+
+
+def is_lock_error(error: BaseException) -> bool:
+    """ Whether an error raised by `fdb.connect` means that the archive is locked (e.g. Easyfatt is open).
+
+    Args:
+        error (BaseException): The error.
+
+    Returns:
+        bool: Whether the archive is locked.
+    """
+    if not isinstance(error, (fdb.DatabaseError, UnicodeDecodeError)):
+        return False
+
+    error_message = str(error)
+    try:
+        sqlcode = error.args[1]
+    except (IndexError, TypeError):
+        sqlcode = None
+
+    return (
+        ("codec can't decode byte" in error_message) or   # Not sure why, but sometimes this error pops up when the database is locked
+        ("lock manager error" in error_message) or        # Database locked
+        (sqlcode == -902)                                 # Database file used by another process
+    )
 
 
 class EasyfattDBGeneric(object):
@@ -24,6 +63,12 @@ class EasyfattDBGeneric(object):
     db_password: str
     db_charset: Optional[str]
 
+    snapshots: SnapshotManager
+    """ Manager of the temporary copies of the archive used by the connections. """
+
+    executor: AsyncExecutor
+    """ Thread pool running the blocking calls of the async connections (see `EasyfattFDB.aconnect`). """
+
     def __init__(
         self,
         archive_path: Union[str, Path],
@@ -48,6 +93,9 @@ class EasyfattDBGeneric(object):
         
         if not self.archive_path.exists():
             raise FirebirdClientError(f"The path '{self.archive_path}' does not exist.")
+
+        self.snapshots = SnapshotManager(self.archive_path)
+        self.executor = AsyncExecutor(name="easyfatt-fdb")
         
         # Check if the charset is supported
         if charset is None:
@@ -85,6 +133,20 @@ class EasyfattDBGeneric(object):
 
     def __repr__(self) -> str:
         return f"<EasyfattDBGeneric: {self.archive_path}>"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.dispose()
+
+    def dispose(self):
+        """ Deletes the snapshots that are no longer in use and stops the threads of `executor`.
+
+        The object can still be used afterwards: a new snapshot is taken on the next connection.
+        """
+        self.snapshots.close()
+        self.executor.shutdown()
     
     def get_connection_string(self, username=None, charset=None, protocol="firebird") -> str:
         """Returns the URI to connect to the database.
@@ -107,43 +169,14 @@ class EasyfattDBGeneric(object):
         return f"{protocol}://{self.db_username}:{self.db_password}@/{self.archive_path}?{parameters}"
     
 
-    def is_locked(self):
-        """ Check if the database is locked.
-        
-        TODO: Decide wether to make this method static or move it to the global scope and then reference it.
-        This way could be parametrized to accept a path.
+    def is_locked(self) -> bool:
+        """ Check if the database is locked (e.g. because Easyfatt is open).
 
-        FIXME: this method may cause your program to hang briefly (few seconds) when exiting.
-        This behaviour could be caused by a global object that gets instantiated by the 
-        `fdb.connect` call and it takes some time to be destroyed by the GC at the end.
+        The lock state of the archive file is read from the operating system (see
+        `easyfatt_db_connector.utils.filesystem.is_file_locked`) without attaching the database,
+        so the check returns immediately and can be polled.
 
         Returns:
             bool: Whether the database is locked or not.
         """
-        try:
-            # Use `WIN1252` instead of `UTF8` to fix error "SQLCODE: -204 block size exceeds implementation restriction"
-            # See https://stackoverflow.com/q/40170882/8965861
-            fdb.connect(
-                database=str(self.archive_path),
-                user=self.db_username,
-                password=self.db_password if self.db_password else None,
-                charset=self.db_charset,
-                fb_library_name=str(self.firebird_path / "fbembed.dll"),
-            )
-        except (fdb.DatabaseError, UnicodeDecodeError) as e:
-            error_message = str(e)
-            try:
-                sqlcode = e.args[1]
-            except:
-                sqlcode = None
-            
-            if "codec can't decode byte" in error_message or "lock manager error" in error_message:
-                return True
-            elif sqlcode == -902: # File used by another process (Error while connecting to database:\n- SQLCODE: -902\n- I/O error during "CreateFile (open)" operation for file "C:\\USERS\\{...}.EFT"\n- Error while trying to open file)
-                return True
-            else:
-                raise
-        except Exception as e:
-            raise
-        else:
-            return False
\ No newline at end of file
+        return is_file_locked(self.archive_path)
@@ -1,14 +1,16 @@
 from contextlib import contextmanager
-import os
-import shutil
-import tempfile
-from typing import Any, Generator, Literal, Optional
+import logging
+from typing import Any, AsyncContextManager, Generator, Literal, Optional
 from pathlib import Path
 
 import fdb
 
 from easyfatt_db_connector.core.exceptions import DatabaseLockedError
-from easyfatt_db_connector.core.connection._base import EasyfattDBGeneric
+from easyfatt_db_connector.core.connection._async import AsyncFDBConnection, open_async
+from easyfatt_db_connector.core.connection._base import DIRECT_CONNECT_ARGS, EasyfattDBGeneric, is_lock_error
+from easyfatt_db_connector.core.connection._pool import FDBConnectionPool
+
+logger = logging.getLogger(__name__)
 
 class TypedFDBConnection(fdb.Connection):
     """ Stub class used only to provide correct type hjinting to child classes,
@@ -24,11 +26,12 @@ class TypedFDBConnection(fdb.Connection):
 
 
 class EasyfattFDB(EasyfattDBGeneric):
-    def _connect(self, database_path: Path) -> TypedFDBConnection:
+    def _connect(self, database_path: Path, read_only: bool = False) -> TypedFDBConnection:
         """ Wrapper around `fdb.connect` which handles some edge cases.
 
         Args:
             database_path (Path): The path to the database file.
+            read_only (bool, optional): Whether to use only read-only transactions (see `DIRECT_CONNECT_ARGS`). Defaults to False.
 
         Raises:
             FirebirdClientError: If the database is locked.
@@ -42,59 +45,106 @@ class EasyfattFDB(EasyfattDBGeneric):
                 password=self.db_password if self.db_password else None,
                 charset=self.db_charset,
                 fb_library_name=str(self.firebird_path / "fbembed.dll"),
+                **(DIRECT_CONNECT_ARGS if read_only else {}),
             )
         except (fdb.DatabaseError, UnicodeDecodeError) as e:
-            error_message = str(e)
-
-            try:
-                sqlcode = e.args[1]
-            except:
-                sqlcode = None
-            
-            if (
-                ("codec can't decode byte" in error_message) or   # Not sure why, but sometimes this error pops up when the database is locked
-                ("lock manager error" in error_message) or        # Database locked
-                (sqlcode == -902)                                 # Database file used by another process
-            ):
+            if is_lock_error(e):
                 raise DatabaseLockedError(
                     f"The database '{self.archive_path}' is locked. Close Easyfatt and try again."
                 )
             
             # Error is not handled, propagate it to the caller
             raise
+
+    def _connect_direct(self) -> Optional[TypedFDBConnection]:
+        """ Attaches the archive itself in read-only mode, returning `None` if it is locked. """
+        # The attach itself is still checked, since the archive may be opened right after the probe
+        if not self.is_locked():
+            try:
+                return self._connect(self.archive_path, read_only=True)
+            except DatabaseLockedError:
+                pass
+
+        logger.debug(f"The archive '{self.archive_path}' is in use, falling back to a snapshot")
+        return None
         
     """ Implementation of the `EasyfattDBGeneric` class using the `fdb` library. """
     @contextmanager
-    def connect(self) -> Generator[TypedFDBConnection, None, None]:
+    def connect(self, direct: bool = False) -> Generator[TypedFDBConnection, None, None]:
         """Connect to the database and return a connection object.
 
         Can be used as a context manager.
 
+        The connection is made against a snapshot (temporary copy) of the archive, which is
+        shared with the other connections and refreshed only when the archive is modified
+        (see `EasyfattFDB.snapshots`). Since the snapshot is shared, the connection uses
+        read-only transactions: a write would otherwise be visible to every other connection.
+
+        With `direct=True` the archive is attached directly, without copying it, if nobody is
+        using it (e.g. Easyfatt is closed); only if the archive is locked the connection falls
+        back to the snapshot. The direct connection uses read-only transactions, so it cannot
+        modify the archive, but while it is open Easyfatt cannot open the archive: use it only
+        when Easyfatt is guaranteed to be closed (e.g. in overnight batch jobs).
+
+        Args:
+            direct (bool, optional): Attach the archive directly (in read-only mode) when it is not in use. Defaults to False.
+
         Yields:
             TypedFDBConnection: The connection object.
         
         Raises:
             FirebirdClientError: If the database is locked.
-        """     
-        handle, path = tempfile.mkstemp(prefix=f"{self.archive_path.stem}-", suffix=".eft.tmp~")
-        os.close(handle)
+        """
+        connection = self._connect_direct() if direct else None
+        if connection is not None:
+            try:
+                yield connection
+            finally:
+                connection.close()
+            return
 
-        temp_database = Path(path)
-        shutil.copy(self.archive_path, temp_database)
+        with self.snapshots.acquire() as snapshot:
+            connection = None
+            try:
+                connection: TypedFDBConnection = self._connect(snapshot.path, read_only=True)
+                yield connection
 
-        connection = None
-        try:
-            connection: TypedFDBConnection = self._connect(temp_database)
-            yield connection
+            except Exception:
+                raise
 
-        except Exception:
-            raise
+            finally:
+                if connection is not None:
+                    connection.close()
 
-        finally:
-            if connection is not None:
-                connection.close()
+    def aconnect(self, direct: bool = False) -> AsyncContextManager[AsyncFDBConnection]:
+        """Connect to the database without blocking the event loop.
+
+        Async version of `connect`, to be used as an async context manager: the snapshot copy,
+        the attach and every query run on the thread pool of `EasyfattFDB.executor`.
+
+        Args:
+            direct (bool, optional): Attach the archive directly (in read-only mode) when it is not in use (see `connect`). Defaults to False.
 
-            temp_database.unlink(missing_ok=True)
+        Returns:
+            AsyncContextManager[AsyncFDBConnection]: The async connection.
+        """
+        return open_async(lambda: self.connect(direct=direct), AsyncFDBConnection, self.executor)
+
+    def pool(self, size: int = 5, timeout: Optional[float] = None) -> FDBConnectionPool:
+        """Create a pool of reusable connections.
+
+        The pooled connections stay attached to the current snapshot of the archive and are
+        recycled when the snapshot is refreshed, so that the attach/detach overhead is paid
+        only once per connection instead of once per `connect`.
+
+        Args:
+            size (int, optional): Maximum number of open connections. Defaults to 5.
+            timeout (float | None, optional): Seconds to wait for a free connection (`None` waits forever). Defaults to None.
+
+        Returns:
+            FDBConnectionPool: The connection pool (can be used as a context manager).
+        """
+        return FDBConnectionPool(self, size=size, timeout=timeout)
 
 
 
@@ -102,7 +152,7 @@ if __name__ == "__main__":
     database_path = Path("~/Documents/Danea Easyfatt/TestArchivio.eft").expanduser()
 
     db = EasyfattFDB(database_path)
-    # print(f"- Is database locked: {db.is_locked()}")
+    print(f"- Is database locked: {db.is_locked()}")
     print(f"- Connection string : '{db.get_connection_string()}'")
 
     with db.connect() as connection:
@@ -0,0 +1,212 @@
+""" Pool of reusable `fdb` connections. """
+from __future__ import annotations
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Generator, Optional
+
+import fdb
+
+from easyfatt_db_connector.core.connection._snapshot import Snapshot
+from easyfatt_db_connector.core.exceptions import PoolTimeoutError
+
+if TYPE_CHECKING:
+    from easyfatt_db_connector.core.connection._fdb import EasyfattFDB, TypedFDBConnection
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["FDBConnectionPool"]
+
+VALIDATION_QUERY = "SELECT 1 FROM RDB$DATABASE"
+""" Query used to check whether a pooled connection is still usable. """
+
+
+@dataclass(eq=False)
+class _PooledConnection(object):
+    connection: "TypedFDBConnection"
+    snapshot: Snapshot
+
+
+class FDBConnectionPool(object):
+    """ Bounded pool of connections attached to the current snapshot of the archive.
+
+    Connections are handed out to one thread at a time, validated on checkout and closed
+    (then replaced) as soon as the snapshot they are attached to is refreshed. They use
+    read-only transactions, since the snapshot is shared (see `EasyfattFDB.connect`).
+
+    Example:
+        ```python
+        database = EasyfattFDB(archive_path=database_path)
+
+        with database.pool(size=4) as pool:
+            with pool.connection() as connection:
+                connection.cursor().execute("SELECT * FROM RDB$RELATIONS").fetchall()
+        ```
+    """
+
+    database: "EasyfattFDB"
+    size: int
+    timeout: Optional[float]
+
+    def __init__(self, database: "EasyfattFDB", size: int = 5, timeout: Optional[float] = None) -> None:
+        """ Initialize a new connection pool.
+
+        Args:
+            database (EasyfattFDB): The database the connections are made to.
+            size (int, optional): Maximum number of open connections. Defaults to 5.
+            timeout (float | None, optional): Seconds to wait for a free connection (`None` waits forever). Defaults to None.
+        """
+        if size < 1:
+            raise ValueError("The size of the pool must be at least 1")
+
+        self.database = database
+        self.size = size
+        self.timeout = timeout
+
+        self._condition = threading.Condition()
+        self._idle: "list[_PooledConnection]" = []
+        self._opened = 0
+        self._closed = False
+
+    def __repr__(self) -> str:
+        return f"<FDBConnectionPool: {self.database.archive_path} (size={self.size}, opened={self._opened})>"
+
+    def __enter__(self) -> "FDBConnectionPool":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def _open(self) -> _PooledConnection:
+        snapshot = self.database.snapshots.checkout()
+        try:
+            # The snapshot is shared with the other connections, so it is attached in read-only mode
+            connection = self.database._connect(snapshot.path, read_only=True)
+        except BaseException:
+            self.database.snapshots.release(snapshot)
+            raise
+
+        return _PooledConnection(connection, snapshot)
+
+    def _discard(self, pooled: _PooledConnection):
+        try:
+            pooled.connection.close()
+        except fdb.DatabaseError as e:
+            logger.debug(f"Error while closing a pooled connection: {e}")
+        finally:
+            self.database.snapshots.release(pooled.snapshot)
+
+    def _is_valid(self, pooled: _PooledConnection) -> bool:
+        if pooled.connection.closed:
+            return False
+
+        try:
+            pooled.connection.cursor().execute(VALIDATION_QUERY).fetchall()
+        except fdb.DatabaseError:
+            return False
+
+        return True
+
+    def _checkout(self) -> _PooledConnection:
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("The connection pool has been closed")
+
+                if self._idle or self._opened < self.size:
+                    break
+
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise PoolTimeoutError(
+                        f"No connection available in the pool after {self.timeout} seconds."
+                    )
+                self._condition.wait(remaining)
+
+            pooled = self._idle.pop() if self._idle else None
+            self._opened += pooled is None
+
+        current = self.database.snapshots.refresh()
+
+        # Idle connections attached to an old snapshot would keep its file alive, so close them now
+        with self._condition:
+            stale = [item for item in self._idle if item.snapshot is not current]
+            self._idle = [item for item in self._idle if item.snapshot is current]
+            self._opened -= len(stale)
+            if stale:
+                self._condition.notify_all()
+
+        for item in stale:
+            self._discard(item)
+
+        # Connections attached to an old snapshot (or broken) are replaced by new ones
+        if pooled is not None and (pooled.snapshot is not current or not self._is_valid(pooled)):
+            self._discard(pooled)
+            pooled = None
+
+        if pooled is None:
+            try:
+                pooled = self._open()
+            except BaseException:
+                with self._condition:
+                    self._opened -= 1
+                    self._condition.notify()
+                raise
+
+        return pooled
+
+    def _checkin(self, pooled: _PooledConnection):
+        reuse = not self._closed and pooled.snapshot is self.database.snapshots.current
+
+        if reuse and not pooled.connection.closed:
+            try:
+                # Never keep transactions open between checkouts, otherwise the next user would not see fresh data
+                pooled.connection.rollback()
+            except fdb.DatabaseError:
+                reuse = False
+        else:
+            reuse = False
+
+        if not reuse:
+            self._discard(pooled)
+
+        with self._condition:
+            if reuse:
+                self._idle.append(pooled)
+            else:
+                self._opened -= 1
+            self._condition.notify()
+
+    @contextmanager
+    def connection(self) -> Generator["TypedFDBConnection", None, None]:
+        """ Borrow a connection from the pool.
+
+        Can be used as a context manager. The connection is given back to the pool when the context exits.
+
+        Yields:
+            TypedFDBConnection: The connection object.
+
+        Raises:
+            PoolTimeoutError: If no connection becomes available before the timeout.
+        """
+        pooled = self._checkout()
+        try:
+            yield pooled.connection
+        finally:
+            self._checkin(pooled)
+
+    def close(self):
+        """ Closes all the idle connections. Borrowed connections are closed when given back to the pool. """
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._opened -= len(idle)
+            self._condition.notify_all()
+
+        for pooled in idle:
+            self._discard(pooled)
@@ -0,0 +1,226 @@
+""" Cached copies ("snapshots") of the Easyfatt archive.
+
+Easyfatt keeps the archive open while running, so every connection is made against a
+temporary copy of the `.eft` file. Copying a big archive is expensive, so the same copy is
+shared by all the connections as long as the original archive does not change.
+"""
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+import hashlib
+import logging
+import os
+from pathlib import Path
+import tempfile
+import threading
+import time
+from typing import Generator, Optional, Union
+import weakref
+
+from easyfatt_db_connector.utils.filesystem import CopyStrategy, copy_file
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["Snapshot", "SnapshotManager"]
+
+FINGERPRINT_HEADER_SIZE = 4096
+""" Number of bytes read from the beginning of the archive to compute its fingerprint.
+
+The first page of a Firebird database is the header page, which contains (among other things)
+the counter of the next transaction and so it changes every time Easyfatt commits something.
+"""
+
+
+@dataclass(eq=False)
+class Snapshot(object):
+    """ A temporary copy of the archive. """
+
+    path: Path
+    """ Path to the copy of the archive. """
+
+    fingerprint: tuple
+    """ Fingerprint of the original archive at the moment of the copy. """
+
+    strategy: Optional[CopyStrategy] = None
+    """ Strategy used to copy the archive (see `easyfatt_db_connector.utils.filesystem.copy_file`). """
+
+    created_at: float = field(default_factory=time.time)
+    """ Timestamp of the creation of the snapshot. """
+
+    users: int = 0
+    """ Number of connections currently using the snapshot. """
+
+    def remove(self):
+        """ Deletes the copy of the archive. """
+        logger.debug(f"Removing snapshot '{self.path}'")
+        self.path.unlink(missing_ok=True)
+
+
+def get_fingerprint(path: Path) -> tuple:
+    """ Returns a cheap fingerprint of a file, which changes whenever the file is modified.
+
+    The fingerprint is composed of the size and modification time of the file and of the hash of
+    its first bytes (see `FINGERPRINT_HEADER_SIZE`).
+
+    Args:
+        path (Path): The path to the file.
+
+    Returns:
+        tuple: The fingerprint of the file.
+    """
+    stat = path.stat()
+
+    with open(path, "rb") as file:
+        header_hash = hashlib.sha1(file.read(FINGERPRINT_HEADER_SIZE)).hexdigest()
+
+    return (stat.st_size, stat.st_mtime_ns, header_hash)
+
+
+def _remove_files(paths: "set[Path]"):
+    """ Deletes all the given files (used as a finalizer by `SnapshotManager`). """
+    for path in list(paths):
+        path.unlink(missing_ok=True)
+    paths.clear()
+
+
+class SnapshotManager(object):
+    """ Keeps a single copy of the archive, refreshing it only when the archive is modified.
+
+    The same snapshot is shared by all the callers of `acquire` while the original archive stays
+    the same. When the archive changes a new snapshot is created, while the old one is deleted as
+    soon as the last connection using it is closed.
+
+    All the snapshots are deleted when the manager is garbage collected (or the program exits).
+    """
+
+    archive_path: Path
+    directory: Optional[Path]
+
+    def __init__(self, archive_path: Union[str, Path], directory: Optional[Union[str, Path]] = None) -> None:
+        """ Initialize a new SnapshotManager.
+
+        Args:
+            archive_path (str | Path): The path to the database file (with `.eft` extension).
+            directory (str | Path | None, optional): Folder where the snapshots will be created. Defaults to the system temporary folder.
+        """
+        self.archive_path = Path(archive_path).expanduser().resolve()
+        self.directory = Path(directory).expanduser().resolve() if directory is not None else None
+
+        self._lock = threading.Lock()
+        self._current: Optional[Snapshot] = None
+
+        self._files: "set[Path]" = set()
+        self._finalizer = weakref.finalize(self, _remove_files, self._files)
+
+    def __repr__(self) -> str:
+        return f"<SnapshotManager: {self.archive_path}>"
+
+    @property
+    def current(self) -> Optional[Snapshot]:
+        """ The most recent snapshot (if any). """
+        return self._current
+
+    def is_stale(self) -> bool:
+        """ Whether the archive has been modified since the current snapshot was taken. """
+        current = self._current
+        return current is None or current.fingerprint != get_fingerprint(self.archive_path)
+
+    def _create(self, fingerprint: tuple) -> Snapshot:
+        handle, path = tempfile.mkstemp(
+            prefix=f"{self.archive_path.stem}-",
+            suffix=".eft.tmp~",
+            dir=self.directory,
+        )
+        os.close(handle)
+
+        snapshot_path = Path(path)
+        self._files.add(snapshot_path)
+
+        start = time.perf_counter()
+        try:
+            strategy = copy_file(self.archive_path, snapshot_path)
+        except BaseException:
+            self._discard(Snapshot(snapshot_path, fingerprint))
+            raise
+
+        logger.debug(
+            f"Created snapshot '{snapshot_path}' of '{self.archive_path}' in {time.perf_counter() - start:.3f}s (strategy: {strategy})"
+        )
+        return Snapshot(snapshot_path, fingerprint, strategy=strategy)
+
+    def _discard(self, snapshot: Snapshot):
+        snapshot.remove()
+        self._files.discard(snapshot.path)
+
+    def _retire_current(self):
+        """ Replaces the current snapshot, deleting it if nobody is using it. """
+        if self._current is not None and self._current.users == 0:
+            self._discard(self._current)
+        self._current = None
+
+    def _update(self, force: bool = False) -> Snapshot:
+        """ Creates a new snapshot if needed (MUST be called while holding the lock). """
+        fingerprint = get_fingerprint(self.archive_path)
+
+        if force or self._current is None or self._current.fingerprint != fingerprint:
+            self._retire_current()
+            self._current = self._create(fingerprint)
+
+        return self._current
+
+    def refresh(self, force: bool = False) -> Snapshot:
+        """ Returns the current snapshot, creating a new one if the archive has changed.
+
+        Args:
+            force (bool, optional): Create a new snapshot even if the archive did not change. Defaults to False.
+
+        Returns:
+            Snapshot: The current snapshot.
+        """
+        with self._lock:
+            return self._update(force=force)
+
+    def checkout(self) -> Snapshot:
+        """ Returns an up-to-date snapshot of the archive and marks it as in use.
+
+        The snapshot will not be deleted until it is given back with `release`.
+
+        Returns:
+            Snapshot: The snapshot.
+        """
+        with self._lock:
+            snapshot = self._update()
+            snapshot.users += 1
+
+        return snapshot
+
+    def release(self, snapshot: Snapshot):
+        """ Marks a snapshot obtained with `checkout` as no longer in use.
+
+        Args:
+            snapshot (Snapshot): The snapshot.
+        """
+        with self._lock:
+            snapshot.users -= 1
+
+            if snapshot is not self._current and snapshot.users == 0:
+                self._discard(snapshot)
+
+    @contextmanager
+    def acquire(self) -> Generator[Snapshot, None, None]:
+        """ Returns an up-to-date snapshot of the archive.
+
+        Can be used as a context manager. The snapshot is guaranteed to exist until the context exits.
+
+        Yields:
+            Snapshot: The snapshot.
+        """
+        snapshot = self.checkout()
+        try:
+            yield snapshot
+        finally:
+            self.release(snapshot)
+
+    def close(self):
+        """ Deletes the current snapshot (if not in use). A new one will be created on the next `acquire`. """
+        with self._lock:
+            self._retire_current()
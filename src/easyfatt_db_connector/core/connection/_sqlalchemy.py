@@ -1,16 +1,23 @@
 from __future__ import annotations
 from contextlib import contextmanager
+import logging
+import threading
 import time
 
 from pathlib import Path
-import shutil
 
 from fdb.ibase import charset_map
 
 import sqlalchemy
+import sqlalchemy.orm
+import sqlalchemy.pool
 # import sqlalchemy_firebird
 
 from easyfatt_db_connector.core.exceptions import FirebirdClientError
+from easyfatt_db_connector.core.connection._async import AsyncExecutor, AsyncSQLAlchemyConnection, open_async
+from easyfatt_db_connector.core.connection._base import DIRECT_CONNECT_ARGS, is_lock_error
+from easyfatt_db_connector.core.connection._snapshot import SnapshotManager
+from easyfatt_db_connector.utils.filesystem import is_file_locked
 from easyfatt_db_connector.constants import (
     DEFAULT_DATABASE_CHARSET,
     DEFAULT_DATABASE_PASSWORD,
@@ -18,6 +25,8 @@ from easyfatt_db_connector.constants import (
     DEFAULT_FIREBIRD_LOCATION,
 )
 
+logger = logging.getLogger(__name__)
+
 
 class EasyfattDB(object):
     """ Implementation of the `EasyfattDBGeneric` class using the `sqlalchemy` library. """
@@ -28,6 +37,16 @@ class EasyfattDB(object):
     db_password: str
     db_charset: str | None
 
+    pool_size: int
+    pool_recycle: int
+    pool_pre_ping: bool
+
+    snapshots: SnapshotManager
+    """ Manager of the temporary copies of the archive used by the engine. """
+
+    executor: AsyncExecutor
+    """ Thread pool running the blocking calls of the async connections (see `EasyfattDB.aconnect`). """
+
     def __init__(
         self,
         archive_path: str | Path,
@@ -35,6 +54,9 @@ class EasyfattDB(object):
         db_user=DEFAULT_DATABASE_USERNAME,
         db_password=DEFAULT_DATABASE_PASSWORD,
         db_charset: str | None = DEFAULT_DATABASE_CHARSET,
+        pool_size: int = 5,
+        pool_recycle: int = 3600,
+        pool_pre_ping: bool = True,
     ):
         """Initialize a new EasyfattDB object and connect to the DB.
 
@@ -44,9 +66,25 @@ class EasyfattDB(object):
             db_user (str, optional): The user that will be used to connect to the database.
             db_password (str, optional): The password that will be used to connect to the database.
             db_charset (str | None, optional): The character set that will be used to interpret data.
+            pool_size (int, optional): Number of connections kept open by the engine pool. Defaults to 5.
+            pool_recycle (int, optional): Seconds after which a pooled connection is replaced. Defaults to 3600.
+            pool_pre_ping (bool, optional): Whether to test pooled connections before using them. Defaults to True.
         """
         self.archive_path = Path(archive_path).expanduser().resolve()
         self.firebird_path = Path(firebird_path).expanduser().resolve()
+
+        self.pool_size = pool_size
+        self.pool_recycle = pool_recycle
+        self.pool_pre_ping = pool_pre_ping
+
+        self.snapshots = SnapshotManager(self.archive_path)
+        self.executor = AsyncExecutor(name="easyfatt-db")
+        self._engine = None
+        self._engine_snapshot = None
+        self._engine_lock = threading.RLock()
+        self._retired_engines = []
+        self._engine_users = {}
+        self._direct_engine = None
         
         if db_charset is None:
             self.db_charset = charset_map[None]
@@ -76,9 +114,29 @@ class EasyfattDB(object):
             )
 
 
-    def create_engine(self, username=None, password=None, database_path: Path=None):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.dispose()
+
+    def create_engine(self, username=None, password=None, database_path: Path=None, **kwargs):
+        """Create a new SQLAlchemy engine.
+
+        Prefer the `EasyfattDB.engine` property, which returns an engine already connected to
+        an up-to-date snapshot of the archive and reused across calls.
+
+        Args:
+            username (str, optional): Username used to connect to the database. Defaults to None.
+            password (str, optional): Password used to connect to the database. Defaults to None.
+            database_path (Path, optional): Path to the database file. Defaults to the archive path.
+            **kwargs: Additional arguments passed to `sqlalchemy.create_engine`.
+
+        Returns:
+            sqlalchemy.engine.base.Engine: The engine.
+        """
         connection_url = sqlalchemy.URL.create(
-            drivername="firebird",
+            drivername="firebird+fdb",
             username=self.db_username if username is None else username,
             database=str(self.archive_path.resolve() if database_path is None else database_path.resolve()),
             query={
@@ -87,35 +145,184 @@ class EasyfattDB(object):
                 # "user": self.db_username if username is None else username
             }
         )
-        return sqlalchemy.create_engine(connection_url, echo=False)
-    
+        return sqlalchemy.create_engine(connection_url, echo=False, **kwargs)
+
+    def _release_retired_engines(self):
+        """ Disposes the engines of old snapshots once all their connections have been returned. """
+        still_in_use = []
+        for engine, snapshot in self._retired_engines:
+            if engine.pool.checkedout() > 0 or self._engine_users.get(engine, 0) > 0:
+                still_in_use.append((engine, snapshot))
+                continue
+
+            engine.dispose()
+            self.snapshots.release(snapshot)
+
+        self._retired_engines = still_in_use
+
+    @property
+    def engine(self) -> sqlalchemy.engine.base.Engine:
+        """The engine connected to the current snapshot of the archive.
+
+        The engine (and its connection pool) is created once and reused until Easyfatt modifies
+        the archive: at that point a new snapshot is taken and a new engine is built on top of it.
+        The old engine is disposed as soon as all its connections have been returned.
+
+        Since the snapshot is shared by every connection, all the transactions are read-only
+        (see `DIRECT_CONNECT_ARGS`): to write to a copy of the archive build a dedicated engine
+        with `EasyfattDB.create_engine`.
+        """
+        with self._engine_lock:
+            current = self.snapshots.refresh()
+
+            if self._engine is None or self._engine_snapshot is not current:
+                if self._engine is not None:
+                    self._retired_engines.append((self._engine, self._engine_snapshot))
+
+                snapshot = self.snapshots.checkout()
+                try:
+                    self._engine = self.create_engine(
+                        database_path=snapshot.path,
+                        pool_size=self.pool_size,
+                        pool_recycle=self.pool_recycle,
+                        pool_pre_ping=self.pool_pre_ping,
+                        connect_args=DIRECT_CONNECT_ARGS,
+                    )
+                except BaseException:
+                    self.snapshots.release(snapshot)
+                    self._engine = None
+                    raise
+
+                self._engine_snapshot = snapshot
+                logger.debug(f"Created engine for snapshot '{snapshot.path}'")
+
+            self._release_retired_engines()
+
+            return self._engine
+
+    @contextmanager
+    def _pinned_engine(self):
+        """ Yields the current engine, keeping it (and its snapshot) alive until the context exits.
+
+        The engine is pinned while holding the lock, so a concurrent refresh cannot dispose it
+        (and delete its snapshot) before the connection has been checked out.
+        """
+        with self._engine_lock:
+            engine = self.engine
+            self._engine_users[engine] = self._engine_users.get(engine, 0) + 1
+
+        try:
+            yield engine
+        finally:
+            with self._engine_lock:
+                self._engine_users[engine] -= 1
+                if self._engine_users[engine] == 0:
+                    del self._engine_users[engine]
+
+                self._release_retired_engines()
+
+    def is_locked(self) -> bool:
+        """Check if the archive is locked (e.g. because Easyfatt is open), without attaching it (see `EasyfattFDB.is_locked`)."""
+        return is_file_locked(self.archive_path)
+
+    @property
+    def direct_engine(self) -> sqlalchemy.engine.base.Engine:
+        """The engine attached directly to the archive (in read-only mode), used by `connect(direct=True)`.
+
+        The connections are not pooled: each one is detached as soon as it is closed, so that
+        the archive is not kept open longer than needed.
+        """
+        with self._engine_lock:
+            if self._direct_engine is None:
+                self._direct_engine = self.create_engine(
+                    poolclass=sqlalchemy.pool.NullPool,
+                    connect_args=DIRECT_CONNECT_ARGS,
+                )
+
+            return self._direct_engine
+
+    def _connect_direct(self):
+        """ Connects to the archive itself, returning `None` if it is locked. """
+        # The attach itself is still checked, since the archive may be opened right after the probe
+        if not self.is_locked():
+            try:
+                return self.direct_engine.connect()
+            except sqlalchemy.exc.DBAPIError as e:
+                if not is_lock_error(e.orig):
+                    raise
+            except UnicodeDecodeError:
+                pass
+
+        logger.debug(f"The archive '{self.archive_path}' is in use, falling back to a snapshot")
+        return None
+
+    def dispose(self):
+        """Dispose all the engines and delete the snapshots that are no longer in use."""
+        with self._engine_lock:
+            if self._direct_engine is not None:
+                self._direct_engine.dispose()
+                self._direct_engine = None
+
+            if self._engine is not None:
+                self._retired_engines.append((self._engine, self._engine_snapshot))
+                self._engine = None
+                self._engine_snapshot = None
+
+            for engine, snapshot in self._retired_engines:
+                engine.dispose()
+                self.snapshots.release(snapshot)
+            self._retired_engines = []
+
+        self.snapshots.close()
+        self.executor.shutdown()
+
     @contextmanager
-    def connect(self, engine: sqlalchemy.engine.base.Engine = None):
+    def session(self, **kwargs):
+        """Create an ORM session bound to `EasyfattDB.engine`.
+
+        Can be used as a context manager. The session is read-only, like every connection of the engine.
+
+        Args:
+            **kwargs: Additional arguments passed to `sqlalchemy.orm.Session`.
+
+        Yields:
+            sqlalchemy.orm.Session: The session object.
+        """
+        with self._pinned_engine() as engine, sqlalchemy.orm.Session(engine, **kwargs) as session:
+            yield session
+
+    @contextmanager
+    def connect(self, engine: sqlalchemy.engine.base.Engine = None, direct: bool = False):
         """Connect to the database and return a connection object.
 
         Can be used as a context manager.
 
+        With `direct=True` the archive is attached directly (see `EasyfattDB.direct_engine`),
+        without copying it, if nobody is using it (e.g. Easyfatt is closed); only if the archive
+        is locked the connection falls back to the snapshot. Use it only when Easyfatt is
+        guaranteed to be closed, since it cannot open the archive while the connection is open.
+
         Args:
-            engine (sqlalchemy.engine.base.Engine, optional): The engine that will be used to connect to the database. Defaults to None.
+            engine (sqlalchemy.engine.base.Engine, optional): The engine that will be used to connect to the database. Defaults to `EasyfattDB.engine`.
+            direct (bool, optional): Attach the archive directly (in read-only mode) when it is not in use. Ignored if `engine` is given. Defaults to False.
 
         Yields:
             sqlalchemy.engine.base.Connection: The connection object.
         """
-        temp_database = None
-
-        if engine is None:
-            temp_database = Path(f"{self.archive_path}.tmp~")
-            shutil.copy(self.archive_path, temp_database)
-    
-            engine = self.create_engine(database_path=temp_database)
+        connection = self._connect_direct() if direct and engine is None else None
+        if connection is not None:
+            with connection:
+                yield connection
+            return
 
         try:
-            with engine.connect() as connection:
-                yield connection
+            if engine is None:
+                with self._pinned_engine() as pinned_engine, pinned_engine.connect() as connection:
+                    yield connection
+            else:
+                with engine.connect() as connection:
+                    yield connection
 
-            if temp_database is not None:
-                engine.dispose()
-            
         except sqlalchemy.exc.OperationalError as e:
             if "lock manager" in str(e):
                 raise FirebirdClientError(
@@ -123,14 +330,20 @@ class EasyfattDB(object):
                 )
             else:
                 raise
-        finally:
-            if temp_database is not None:
-                try:
-                    engine.dispose()
-                except:
-                    pass
-                temp_database.unlink(missing_ok=True)
 
+    def aconnect(self, direct: bool = False):
+        """Connect to the database without blocking the event loop.
+
+        Async version of `connect`, to be used as an async context manager: the creation of the
+        snapshot, the attach and every statement run on the thread pool of `EasyfattDB.executor`.
+
+        Args:
+            direct (bool, optional): Attach the archive directly (in read-only mode) when it is not in use (see `connect`). Defaults to False.
+
+        Returns:
+            AsyncContextManager[AsyncSQLAlchemyConnection]: The async connection.
+        """
+        return open_async(lambda: self.connect(direct=direct), AsyncSQLAlchemyConnection, self.executor)
 
 
 if __name__ == "__main__":
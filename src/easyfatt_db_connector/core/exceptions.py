@@ -15,5 +15,11 @@ class FirebirdClientError(EasyfattDBConnectorError):
 class DatabaseLockedError(EasyfattDBConnectorError):
     """ Error raised when the Firebird database is locked. """
 
+class PoolTimeoutError(EasyfattDBConnectorError):
+    """ Error raised when no connection becomes available in a connection pool before the timeout. """
+
 class TypeConversionError(EasyfattXMLError):
-    """ Error raised when a type conversion of an XML field is not possible. """
\ No newline at end of file
+    """ Error raised when a type conversion of an XML field is not possible. """
+
+class SourceChangedError(EasyfattXMLError):
+    """ Error raised when the XML file an element was parsed from has been modified (or deleted). """
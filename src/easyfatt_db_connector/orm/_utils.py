@@ -0,0 +1,26 @@
+""" Helpers shared by the ORM modules. """
+from typing import Any
+
+import sqlalchemy
+
+__all__ = ["get_table"]
+
+
+def get_table(model: Any) -> sqlalchemy.Table:
+    """ Returns the `Table` of a static model, of a `table_factory` class or the table itself.
+
+    Args:
+        model (Any): A static model (e.g. `TDocRighe`), a class created by `table_factory` or a `sqlalchemy.Table`.
+
+    Raises:
+        TypeError: If the object is not a model nor a table.
+
+    Returns:
+        sqlalchemy.Table: The table.
+    """
+    table = getattr(model, "__table__", model)
+
+    if not isinstance(table, sqlalchemy.Table):
+        raise TypeError(f"Expected a model or a table, not {type(model)}")
+
+    return table
@@ -0,0 +1,279 @@
+""" Incremental change extraction ("change data capture") for the database tables.
+
+Easyfatt does not keep track of the modified rows, so the changes are detected by comparing
+the hash of each row (identified by its primary key) with the one computed during the previous
+extraction. The hashes are persisted in a local "sidecar" JSON file, so that only the rows that
+were actually inserted, updated or deleted are returned by the next extraction.
+
+!!! Warning
+    The first extraction of a table (i.e. without a previous state) returns **all** its rows as
+    inserted, each one as a dictionary: for big tables (e.g. `TDocRighe`) this means holding the
+    whole table in memory. If the current content is not needed (e.g. it has already been
+    exported), use `ChangeTracker.initialize` instead, which records only the keys and hashes.
+
+!!! Example
+    ```python
+    from easyfatt_db_connector.core.connection import EasyfattDB
+    from easyfatt_db_connector.orm.changes import ChangeTracker
+    from easyfatt_db_connector.orm.static import TDocTestate, TDocRighe
+
+    database = EasyfattDB(database_path)
+    tracker = ChangeTracker("sync-state.json", models=[TDocTestate, TDocRighe])
+
+    with database.connect() as connection:
+        for changes in tracker.extract(connection).values():
+            print(f"{changes.table}: {len(changes.inserted)} inserted, {len(changes.updated)} updated, {len(changes.deleted)} deleted")
+
+    # Persist the new state only once the changes have been processed
+    tracker.save()
+    ```
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Iterable, Optional, Sequence, Union
+
+import sqlalchemy
+
+from easyfatt_db_connector.orm._utils import get_table
+from easyfatt_db_connector.orm.static import TDocRighe, TDocTestate, TMovMagazz, TPrimaNota
+
+__all__ = ["TableChanges", "ChangeTracker", "diff_snapshots"]
+
+DEFAULT_MODELS = (TDocTestate, TDocRighe, TMovMagazz, TPrimaNota)
+""" Tables tracked by default. """
+
+DEFAULT_BATCH_SIZE = 10_000
+""" Number of rows fetched at once while scanning a table. """
+
+STATE_VERSION = 1
+""" Version of the format of the sidecar file. """
+
+
+@dataclass
+class TableChanges(object):
+    """ Changes of a single table between two extractions. """
+
+    table: str
+    """ Name of the table. """
+
+    inserted: "list[dict[str, Any]]" = field(default_factory=list)
+    """ Rows that did not exist in the previous extraction. """
+
+    updated: "list[dict[str, Any]]" = field(default_factory=list)
+    """ Rows whose content has changed since the previous extraction. """
+
+    deleted: "list[dict[str, Any]]" = field(default_factory=list)
+    """ Primary keys of the rows that no longer exist. """
+
+    def __bool__(self) -> bool:
+        return bool(self.inserted or self.updated or self.deleted)
+
+
+def _encode_key(values: Sequence[Any]) -> str:
+    return json.dumps(list(values), default=str, separators=(",", ":"))
+
+
+def _hash_row(values: Sequence[Any]) -> str:
+    return hashlib.blake2b(repr(tuple(values)).encode("utf-8"), digest_size=12).hexdigest()
+
+
+def _scan(
+    connection: sqlalchemy.Connection,
+    table: sqlalchemy.Table,
+    previous: "dict[str, str]",
+    batch_size: int,
+    collect_rows: bool = True,
+) -> "tuple[TableChanges, dict[str, str]]":
+    """ Scans a whole table, comparing each row with the previous state.
+
+    If `collect_rows` is `False` only the new state is computed (the returned changes are empty).
+
+    Returns:
+        tuple[TableChanges, dict[str, str]]: The changes and the new state of the table.
+    """
+    primary_key = list(table.primary_key.columns)
+    if not primary_key:
+        raise ValueError(f"The table '{table.name}' does not have a primary key")
+
+    key_names = [column.name for column in primary_key]
+    key_indexes = [list(table.columns).index(column) for column in primary_key]
+
+    changes = TableChanges(table.name)
+    state = {}
+
+    query = sqlalchemy.select(table).order_by(*primary_key)
+    result = connection.execution_options(stream_results=True, yield_per=batch_size).execute(query)
+
+    for rows in result.partitions(batch_size):
+        for row in rows:
+            key = _encode_key([row[index] for index in key_indexes])
+            row_hash = _hash_row(row)
+            state[key] = row_hash
+
+            if not collect_rows:
+                continue
+
+            previous_hash = previous.get(key)
+            if previous_hash is None:
+                changes.inserted.append(dict(row._mapping))
+            elif previous_hash != row_hash:
+                changes.updated.append(dict(row._mapping))
+
+    if collect_rows:
+        changes.deleted = [
+            dict(zip(key_names, json.loads(key))) for key in sorted(previous.keys() - state.keys())
+        ]
+
+    return changes, state
+
+
+class ChangeTracker(object):
+    """ Extracts the rows changed since the previous extraction, persisting the state in a sidecar file. """
+
+    state_path: Path
+    models: "tuple[Any, ...]"
+    batch_size: int
+
+    def __init__(
+        self,
+        state_path: Union[str, Path],
+        models: Iterable[Any] = DEFAULT_MODELS,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> None:
+        """ Initialize a new ChangeTracker.
+
+        Args:
+            state_path (str | Path): Path of the sidecar JSON file containing the state of the previous extraction.
+            models (Iterable[Any], optional): Static models (or tables) to track. Defaults to DEFAULT_MODELS.
+            batch_size (int, optional): Number of rows fetched at once. Defaults to DEFAULT_BATCH_SIZE.
+        """
+        self.state_path = Path(state_path).expanduser()
+        self.models = tuple(models)
+        self.batch_size = batch_size
+
+        self._state: "dict[str, dict[str, str]]" = self._load()
+
+    def __repr__(self) -> str:
+        return f"<ChangeTracker: {self.state_path}>"
+
+    def _load(self) -> "dict[str, dict[str, str]]":
+        if not self.state_path.exists():
+            return {}
+
+        content = json.loads(self.state_path.read_text(encoding="utf-8"))
+        if content.get("version") != STATE_VERSION:
+            raise ValueError(
+                f"Unsupported version of the state file '{self.state_path}': {content.get('version')}"
+            )
+
+        return content["tables"]
+
+    def save(self):
+        """ Writes the current state to the sidecar file (atomically). """
+        temp_path = self.state_path.with_name(f"{self.state_path.name}.tmp~")
+        temp_path.write_text(
+            json.dumps({"version": STATE_VERSION, "tables": self._state}, separators=(",", ":")),
+            encoding="utf-8",
+        )
+        os.replace(temp_path, self.state_path)
+
+    def reset(self, models: Optional[Iterable[Any]] = None):
+        """ Forgets the state, so that the next extraction returns all the rows as inserted.
+
+        Args:
+            models (Iterable[Any], optional): Reset only these tables. Defaults to all the tables.
+        """
+        if models is None:
+            self._state = {}
+            return
+
+        for model in models:
+            self._state.pop(get_table(model).name, None)
+
+    def initialize(
+        self,
+        connection: sqlalchemy.Connection,
+        models: Optional[Iterable[Any]] = None,
+        save: bool = False,
+    ):
+        """ Records the current state of the tables without returning their rows.
+
+        Only the keys and the hashes of the rows are kept in memory, so it is the cheap alternative to
+        the first `extract` of a big table: the following extractions return only the later changes.
+
+        Args:
+            connection (sqlalchemy.Connection): The connection (see `EasyfattDB.connect`).
+            models (Iterable[Any], optional): Tables to initialize. Defaults to the tables passed to the constructor.
+            save (bool, optional): Whether to immediately persist the new state (see `save`). Defaults to False.
+        """
+        for model in self.models if models is None else models:
+            table = get_table(model)
+
+            _, self._state[table.name] = _scan(connection, table, {}, self.batch_size, collect_rows=False)
+
+        if save:
+            self.save()
+
+    def extract(
+        self,
+        connection: sqlalchemy.Connection,
+        models: Optional[Iterable[Any]] = None,
+        save: bool = False,
+    ) -> "dict[str, TableChanges]":
+        """ Returns the changes since the previous extraction and updates the state in memory.
+
+        The tables without a previous state return all their rows as inserted, loaded in memory
+        at once (see `initialize` to avoid it).
+
+        Args:
+            connection (sqlalchemy.Connection): The connection (see `EasyfattDB.connect`).
+            models (Iterable[Any], optional): Tables to extract. Defaults to the tables passed to the constructor.
+            save (bool, optional): Whether to immediately persist the new state (see `save`). Defaults to False.
+
+        Returns:
+            dict[str, TableChanges]: The changes, indexed by table name.
+        """
+        result = {}
+        for model in self.models if models is None else models:
+            table = get_table(model)
+
+            changes, state = _scan(connection, table, self._state.get(table.name, {}), self.batch_size)
+            self._state[table.name] = state
+            result[table.name] = changes
+
+        if save:
+            self.save()
+
+        return result
+
+
+def diff_snapshots(
+    old_connection: sqlalchemy.Connection,
+    new_connection: sqlalchemy.Connection,
+    models: Iterable[Any] = DEFAULT_MODELS,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> "dict[str, TableChanges]":
+    """ Returns the changes between two snapshots of the archive (without using any sidecar file).
+
+    Args:
+        old_connection (sqlalchemy.Connection): Connection to the older snapshot.
+        new_connection (sqlalchemy.Connection): Connection to the newer snapshot.
+        models (Iterable[Any], optional): Static models (or tables) to compare. Defaults to DEFAULT_MODELS.
+        batch_size (int, optional): Number of rows fetched at once. Defaults to DEFAULT_BATCH_SIZE.
+
+    Returns:
+        dict[str, TableChanges]: The changes, indexed by table name.
+    """
+    result = {}
+    for model in models:
+        table = get_table(model)
+
+        _, old_state = _scan(old_connection, table, {}, batch_size, collect_rows=False)
+        result[table.name], _ = _scan(new_connection, table, old_state, batch_size)
+
+    return result
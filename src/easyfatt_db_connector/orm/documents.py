@@ -0,0 +1,333 @@
+""" Loading of the documents from the database as `easyfatt_db_connector.xml` objects.
+
+The documents are read with a fixed number of queries, whatever their number: one for the
+headers (`TDocTestate`), one for all their rows (`TDocRighe`), one for all their payments
+(`TPrimaNota`) and one for the VAT codes (`TIva`). The rows and the payments are joined to the
+same filtered headers and grouped by document in Python, so no query is made per document (as
+it would happen by following the `relationship`s of the models).
+
+The objects are the same returned by `read_xml` (`Document`, `Product`, `Payment` and `VatCode`)
+and the values are converted in the same way: each value is formatted as it would be written in
+a `.DefXml` file and then converted by the parse plan of the class (see `convert_types`).
+
+!!! Example
+    ```python
+    from datetime import date
+    from easyfatt_db_connector.core.connection import EasyfattDB
+    from easyfatt_db_connector.orm.documents import load_documents
+
+    database = EasyfattDB(database_path)
+    with database.connect() as connection:
+        invoices = load_documents(connection, types="I", date_from=date(2023, 1, 1), date_to=date(2023, 1, 31))
+
+    for invoice in invoices:
+        print(invoice.number, invoice.customer.name, len(invoice.rows))
+    ```
+"""
+from __future__ import annotations
+
+import copy
+from datetime import date
+from decimal import Decimal
+from typing import Any, Iterable, Mapping, Optional, Union
+
+import sqlalchemy
+
+from easyfatt_db_connector.core.exceptions import TypeConversionError
+from easyfatt_db_connector.orm.static import TDocRighe, TDocTestate, TIva, TPrimaNota
+from easyfatt_db_connector.xml.common.plan import CHILD, GROUP, NO_DEFAULT, FieldPlan
+from easyfatt_db_connector.xml.common.writer import format_value
+from easyfatt_db_connector.xml.document import Document, Payment
+from easyfatt_db_connector.xml.product import Product
+from easyfatt_db_connector.xml.vat_code import VatCode
+
+__all__ = ["load_documents", "DOCUMENT_COLUMNS", "ROW_COLUMNS", "PAYMENT_COLUMNS", "VAT_CODE_COLUMNS"]
+
+# The values of the mappings below are:
+#
+# - the name of a column;
+# - a tuple `(net, gross)` of columns, chosen by the `UsaPrezzoIvato` flag of the document (like Easyfatt does in the XML files);
+# - a dictionary, for the `FieldGroup`s.
+#
+# The nested mapper objects (`VatCode`) are read from the `TIva` table by their code.
+
+VAT_CODE_COLUMNS = {
+    "code": "CodIva",
+    "description": "DescIva",
+    "percentage": "PercIva",
+    "vat_class": "ClasseIva",
+}
+""" Columns of `TIva` used for the attributes of `VatCode`. """
+
+DOCUMENT_COLUMNS = {
+    "date": "Data",
+    "number": "Num",
+    "numbering": "Numeraz",
+    "type": "TipoDoc",
+    "delivery": {
+        "name": "Anagr_DestNome",
+        "address": "Anagr_DestIndirizzo",
+        "postcode": "Anagr_DestCap",
+        "city": "Anagr_DestCitta",
+        "province": "Anagr_DestProv",
+        "country": "Anagr_DestNazione",
+    },
+    "transport": {
+        "carrier": "Vettore",
+        "reason": "CausaleTrasporto",
+        "goods_appearance": "AspettoBeni",
+        "pieces": "NumColli",
+        "date_time": "DataOraTrasporto",
+        "shipment_terms": "Porto",
+        "weight": "Trasp_Peso",
+        "tracking_number": "Trasp_CodSpedizione",
+    },
+    "customer": {
+        "name": "Anagr_Nome",
+        "address": "Anagr_Indirizzo",
+        "postcode": "Anagr_Cap",
+        "city": "Anagr_Citta",
+        "province": "Anagr_Prov",
+        "country": "Anagr_Nazione",
+        "fiscal_code": "Anagr_CodiceFiscale",
+        "vat_code": "Anagr_PartitaIva",
+    },
+    "notes": {
+        "internal_comment": "NoteInterne",
+        "custom1": "Extra1",
+        "custom2": "Extra2",
+        "custom3": "Extra3",
+        "custom4": "Extra4",
+        "foot_note": "Note",
+    },
+    "cost_description": "Spese_Nome",
+    "cost_vat_code": "Spese_CodIva",
+    "cost_amount": ("Spese_ImportoNetto", "Spese_ImportoIvato"),
+    "total_without_tax": "TotNetto",
+    "total_vat": "TotIva",
+    "total": "TotDoc",
+    "prices_include_vat": "UsaPrezzoIvato",
+    "total_subject_to_withholding_tax": "ImportoSoggettoRA",
+    "withholding_tax": {
+        "rate1": "PercRitAcconto",
+        "rate2": "PercRitAcconto2",
+        "amount": "TotRitAcconto",
+        "amount_extras": "TotRitVarie",
+        "name_extras": "DescRitVarie",
+    },
+    "contributions": {
+        "description": "ContrPrev_Nome",
+        "percentage": "ContrPrev_Perc",
+        "is_subject_to_withholding_tax": "ContrPrev_SoggettoRA",
+        "total": ("ContrPrev_ImportoNetto", "ContrPrev_ImportoIvato"),
+    },
+    "delayed_vat": "IvaPerCassa",
+    "delayed_vat_description": "DescIvaPerCassa",
+    "delayed_vat_dueWithinOneYear": "IvaDovutaEntroUnAnno",
+    "warehouse": "Magazz",
+    "price_list": "IDListino",
+    "payment_name": "Pagamento",
+    "payment_bank": "Pagam_CoordBancarie",
+    "sales_agent": "Agente",
+    "expected_conclusion": "DataPrevistaConclOrdine",
+}
+""" Columns of `TDocTestate` used for the attributes of `Document`. """
+
+ROW_COLUMNS = {
+    "code": "CodArticolo",
+    "supplier_code": "CodArticoloForn",
+    "description": "Desc",
+    "quantity": "Qta",
+    "unit_measure": "Udm",
+    "lot": "Lotto",
+    "expiry_date": "DataScadenza",
+    "price": ("PrezzoNetto", "PrezzoIvato"),
+    "discounts": "Sconti",
+    "eco_fee": ("EcoContribNetto", "EcoContribIvato"),
+    "vat_info": "CodIva",
+    "total": ("ImportoNettoRiga", "ImportoIvatoRiga"),
+    "withholding_tax": "RitAcconto",
+    "stock": "MovMagazz",
+    "notes": "Note",
+    "commission_percentage": "PercProvv",
+}
+""" Columns of `TDocRighe` used for the attributes of `Product`. """
+
+PAYMENT_COLUMNS = {
+    "advance": "IsAcconto",
+    "amount": "Importo",
+    "date": "DataScad",
+    "paid": "Saldato",
+}
+""" Columns of `TPrimaNota` used for the attributes of `Payment`. """
+
+
+def _column_names(mapping: dict) -> "set[str]":
+    """ Returns the names of all the columns referenced by a mapping. """
+    names = set()
+    for source in mapping.values():
+        if isinstance(source, dict):
+            names |= _column_names(source)
+        elif isinstance(source, tuple):
+            names.update(source)
+        else:
+            names.add(source)
+
+    return names
+
+
+def _compile(cls: type, mapping: dict, native: bool) -> "list[tuple[FieldPlan, Any]]":
+    """ Pairs the mapping with the parse plan of the class (in the order of the `__xml_mapping__`). """
+    compiled = []
+    for field in cls._get_parse_plan(native=native).fields:
+        source = mapping.get(field.attr)
+        if source is None:
+            continue
+
+        if field.kind == GROUP:
+            source = _compile(field.target, source, native)
+
+        compiled.append((field, source))
+
+    return compiled
+
+
+def _format(value: Any, field: FieldPlan) -> str:
+    """ Formats a value as it would be written in a `.DefXml` file. """
+    if field.type_name == "bool":
+        # Easyfatt stores the booleans as `SMALLINT` (0 or 1)
+        return format_value(bool(value))
+    elif isinstance(value, (float, Decimal)):
+        # Amounts are stored with 4 decimals (e.g. `306.9600`), while Easyfatt writes them without trailing zeros
+        number = Decimal(repr(value)) if isinstance(value, float) else value
+        return format(number.normalize(), "f")
+
+    return format_value(value)
+
+
+def _build(
+    cls: type,
+    compiled: "list[tuple[FieldPlan, Any]]",
+    row: Mapping[str, Any],
+    gross: bool,
+    vat_codes: "dict[str, VatCode]",
+    convert_types,
+):
+    """ Creates an instance of a mapper class from a row, like `XMLMapper.from_xml` does from an element. """
+    defaulted = []
+
+    xml_object = cls()
+    for field, source in compiled:
+        if field.kind == GROUP:
+            setattr(xml_object, field.attr, _build(field.target, source, row, gross, vat_codes, convert_types))
+            continue
+
+        value = row.get(source[gross] if isinstance(source, tuple) else source)
+        if value is None or value == "":
+            # Missing values are handled as the tags omitted from the XML files
+            if field.default is not NO_DEFAULT:
+                setattr(xml_object, field.attr, field.default)
+                defaulted.append(field.attr)
+            continue
+
+        if field.kind == CHILD:
+            vat_code = vat_codes.get(value)
+            if vat_code is None:
+                vat_code = VatCode()
+                vat_code.code = value
+
+            setattr(xml_object, field.attr, copy.copy(vat_code))
+            continue
+
+        text = _format(value, field)
+        if not convert_types or field.converter is None:
+            setattr(xml_object, field.attr, text)
+            continue
+
+        try:
+            setattr(xml_object, field.attr, field.converter(text))
+        except ValueError:
+            raise TypeConversionError(
+                f"Error while converting `{cls.__name__}.{field.attr}`: `{text}` cannot be converted to `{field.type_name}`."
+            )
+
+    if defaulted:
+        xml_object.__xml_defaulted__ = frozenset(defaulted)
+
+    return xml_object
+
+
+def load_documents(
+    connection: sqlalchemy.Connection,
+    types: Optional[Union[str, Iterable[str]]] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    convert_types=True,
+) -> "list[Document]":
+    """ Loads the documents (with their rows, payments and VAT codes) as `Document` objects.
+
+    The filters on the date and on the type use the `TDocTestate_I1` index (`Data`, `TipoDoc`, `Num`).
+
+    Args:
+        connection (sqlalchemy.Connection): The connection (see `EasyfattDB.connect`).
+        types (str | Iterable[str], optional): Type(s) of the documents (`TipoDoc`, e.g. `"I"` for the invoices). Defaults to all the types.
+        date_from (date, optional): Only the documents from this date (included). Defaults to None.
+        date_to (date, optional): Only the documents up to this date (included). Defaults to None.
+        convert_types (bool | str, optional): Whether to convert the values to Python types, as in `read_xml` (`"native"` also converts dates and amounts). Defaults to True.
+
+    Returns:
+        list[Document]: The documents, ordered by date, type and number.
+    """
+    native = convert_types == "native"
+    headers = TDocTestate.__table__
+    rows = TDocRighe.__table__
+    payments = TPrimaNota.__table__
+    vat_table = TIva.__table__
+
+    conditions = []
+    if date_from is not None:
+        conditions.append(headers.c.Data >= date_from)
+    if date_to is not None:
+        conditions.append(headers.c.Data <= date_to)
+    if types is not None:
+        conditions.append(headers.c.TipoDoc.in_([types] if isinstance(types, str) else list(types)))
+
+    def select(table: sqlalchemy.Table, mapping: dict, *order_by) -> sqlalchemy.Select:
+        columns = [table.c[name] for name in sorted(_column_names(mapping) | {"IDDoc"})]
+        query = sqlalchemy.select(*columns).where(*conditions).order_by(*order_by)
+
+        if table is not headers:
+            query = query.select_from(table.join(headers, table.c.IDDoc == headers.c.IDDoc))
+
+        return query
+
+    vat_compiled = _compile(VatCode, VAT_CODE_COLUMNS, native)
+    vat_codes = {
+        row.CodIva: _build(VatCode, vat_compiled, row._mapping, False, {}, convert_types)
+        for row in connection.execute(sqlalchemy.select(*[vat_table.c[name] for name in _column_names(VAT_CODE_COLUMNS)]))
+    }
+
+    documents = {}
+    compiled = _compile(Document, DOCUMENT_COLUMNS, native)
+    query = select(headers, DOCUMENT_COLUMNS, headers.c.Data, headers.c.TipoDoc, headers.c.Num, headers.c.IDDoc)
+    for row in connection.execute(query):
+        gross = bool(row.UsaPrezzoIvato)
+
+        document = _build(Document, compiled, row._mapping, gross, vat_codes, convert_types)
+        document.rows = []
+        document.payments = []
+        documents[row.IDDoc] = (document, gross)
+
+    compiled = _compile(Product, ROW_COLUMNS, native)
+    query = select(rows, ROW_COLUMNS, rows.c.IDDoc, rows.c.IDDocRiga)
+    for row in connection.execution_options(stream_results=True).execute(query):
+        document, gross = documents[row.IDDoc]
+        document.rows.append(_build(Product, compiled, row._mapping, gross, vat_codes, convert_types))
+
+    compiled = _compile(Payment, PAYMENT_COLUMNS, native)
+    query = select(payments, PAYMENT_COLUMNS, payments.c.IDDoc, payments.c.DataScad, payments.c.IDPrimaNota)
+    for row in connection.execution_options(stream_results=True).execute(query):
+        document, gross = documents[row.IDDoc]
+        document.payments.append(_build(Payment, compiled, row._mapping, gross, vat_codes, convert_types))
+
+    return [document for document, _ in documents.values()]
@@ -0,0 +1,240 @@
+""" Columnar export of the database tables to Apache Arrow and Parquet.
+
+The rows are fetched in large batches and converted column by column: apart from the `Row`
+tuples returned by SQLAlchemy, no dictionary or mapper object is created per row.
+
+!!! Note
+    This module requires the optional dependency [`pyarrow`](https://arrow.apache.org/docs/python/)
+    (`pip install easyfatt-db-connector[arrow]`).
+
+!!! Example
+    ```python
+    from easyfatt_db_connector.core.connection import EasyfattDB
+    from easyfatt_db_connector.orm.export import write_parquet
+    from easyfatt_db_connector.orm.static import TDocRighe
+
+    database = EasyfattDB(database_path)
+    with database.connect() as connection:
+        write_parquet(connection, TDocRighe, "TDocRighe.parquet")
+    ```
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterator, Optional, Sequence, Union
+
+import sqlalchemy
+
+from easyfatt_db_connector.orm._utils import get_table
+
+if TYPE_CHECKING:
+    import pyarrow
+
+__all__ = ["arrow_schema", "iter_record_batches", "read_arrow", "write_parquet"]
+
+DEFAULT_BATCH_SIZE = 50_000
+""" Default number of rows fetched (and converted) at once. """
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError(
+            "The optional dependency 'pyarrow' is required to export tables (install it with `pip install easyfatt-db-connector[arrow]`)."
+        ) from e
+
+    return pyarrow
+
+
+def _get_column_type(column: sqlalchemy.Column) -> sqlalchemy.types.TypeEngine:
+    """ Returns the type of a column, following the foreign keys if the type is not declared. """
+    column_type = column.type
+
+    if isinstance(column_type, sqlalchemy.types.NullType):
+        for foreign_key in column.foreign_keys:
+            return _get_column_type(foreign_key.column)
+
+    return column_type
+
+
+def _arrow_type(column: sqlalchemy.Column, smallint_as_bool: bool) -> "pyarrow.DataType":
+    """ Maps the type of a column to the corresponding Arrow type. """
+    pa = _import_pyarrow()
+    column_type = _get_column_type(column)
+
+    # The order matters: `SmallInteger` is a subclass of `Integer` and `Float` of `Numeric`
+    if isinstance(column_type, sqlalchemy.SmallInteger):
+        # Easyfatt uses `SMALLINT` columns (with value 0 or 1) to store booleans
+        return pa.bool_() if smallint_as_bool else pa.int16()
+    elif isinstance(column_type, sqlalchemy.BigInteger):
+        return pa.int64()
+    elif isinstance(column_type, sqlalchemy.Integer):
+        return pa.int32()
+    elif isinstance(column_type, sqlalchemy.Float):
+        return pa.float64()
+    elif isinstance(column_type, sqlalchemy.Numeric):
+        if column_type.precision is None:
+            return pa.float64()
+        return pa.decimal128(column_type.precision, column_type.scale or 0)
+    elif isinstance(column_type, sqlalchemy.DateTime):
+        return pa.timestamp("us")
+    elif isinstance(column_type, sqlalchemy.Date):
+        return pa.date32()
+    elif isinstance(column_type, sqlalchemy.Time):
+        return pa.time64("us")
+    elif isinstance(column_type, sqlalchemy.LargeBinary):
+        return pa.large_binary()
+    elif isinstance(column_type, sqlalchemy.Text):
+        return pa.large_string()
+
+    return pa.string()
+
+
+def arrow_schema(
+    model: Any,
+    columns: Optional[Sequence[str]] = None,
+    smallint_as_bool: bool = True,
+) -> "pyarrow.Schema":
+    """ Returns the Arrow schema of a table.
+
+    Args:
+        model (Any): A static model (e.g. `TDocRighe`), a class created by `table_factory` or a `sqlalchemy.Table`.
+        columns (Sequence[str], optional): Names of the columns to include. Defaults to all the columns.
+        smallint_as_bool (bool, optional): Whether to export `SMALLINT` columns as booleans. Defaults to True.
+
+    Returns:
+        pyarrow.Schema: The schema.
+    """
+    pa = _import_pyarrow()
+    table = get_table(model)
+
+    selected = table.columns if columns is None else [table.columns[name] for name in columns]
+    return pa.schema(
+        [pa.field(column.name, _arrow_type(column, smallint_as_bool), nullable=True) for column in selected]
+    )
+
+
+def _to_array(values: Sequence[Any], field: "pyarrow.Field") -> "pyarrow.Array":
+    pa = _import_pyarrow()
+
+    if pa.types.is_boolean(field.type):
+        # Booleans are stored as integers, which pyarrow does not convert implicitly
+        return pa.array(values, type=pa.int16()).cast(pa.bool_())
+
+    return pa.array(values, type=field.type)
+
+
+def iter_record_batches(
+    connection: sqlalchemy.Connection,
+    model: Any,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    columns: Optional[Sequence[str]] = None,
+    where: Optional[sqlalchemy.ColumnElement[bool]] = None,
+    smallint_as_bool: bool = True,
+) -> Iterator["pyarrow.RecordBatch"]:
+    """ Streams the content of a table as Arrow record batches.
+
+    Args:
+        connection (sqlalchemy.Connection): The connection (see `EasyfattDB.connect`).
+        model (Any): A static model (e.g. `TDocRighe`), a class created by `table_factory` or a `sqlalchemy.Table`.
+        batch_size (int, optional): Number of rows fetched at once (and size of each batch). Defaults to DEFAULT_BATCH_SIZE.
+        columns (Sequence[str], optional): Names of the columns to export. Defaults to all the columns.
+        where (sqlalchemy.ColumnElement[bool], optional): Filter applied to the query. Defaults to None.
+        smallint_as_bool (bool, optional): Whether to export `SMALLINT` columns as booleans. Defaults to True.
+
+    Yields:
+        pyarrow.RecordBatch: The batches of rows.
+    """
+    pa = _import_pyarrow()
+    table = get_table(model)
+    schema = arrow_schema(table, columns=columns, smallint_as_bool=smallint_as_bool)
+
+    query = sqlalchemy.select(*[table.columns[name] for name in schema.names])
+    if where is not None:
+        query = query.where(where)
+
+    result = connection.execution_options(stream_results=True, yield_per=batch_size).execute(query)
+    for rows in result.partitions(batch_size):
+        column_values = list(zip(*rows))
+
+        yield pa.RecordBatch.from_arrays(
+            [_to_array(values, field) for values, field in zip(column_values, schema)],
+            schema=schema,
+        )
+
+
+def read_arrow(
+    connection: sqlalchemy.Connection,
+    model: Any,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    columns: Optional[Sequence[str]] = None,
+    where: Optional[sqlalchemy.ColumnElement[bool]] = None,
+    smallint_as_bool: bool = True,
+) -> "pyarrow.Table":
+    """ Reads a whole table as an Arrow table (see `iter_record_batches` for the arguments).
+
+    Returns:
+        pyarrow.Table: The table.
+    """
+    pa = _import_pyarrow()
+
+    return pa.Table.from_batches(
+        list(
+            iter_record_batches(
+                connection,
+                model,
+                batch_size=batch_size,
+                columns=columns,
+                where=where,
+                smallint_as_bool=smallint_as_bool,
+            )
+        ),
+        schema=arrow_schema(model, columns=columns, smallint_as_bool=smallint_as_bool),
+    )
+
+
+def write_parquet(
+    connection: sqlalchemy.Connection,
+    model: Any,
+    path: Union[str, Path],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    columns: Optional[Sequence[str]] = None,
+    where: Optional[sqlalchemy.ColumnElement[bool]] = None,
+    smallint_as_bool: bool = True,
+    **parquet_options,
+) -> int:
+    """ Writes the content of a table to a Parquet file, one batch at a time.
+
+    Args:
+        connection (sqlalchemy.Connection): The connection (see `EasyfattDB.connect`).
+        model (Any): A static model (e.g. `TDocRighe`), a class created by `table_factory` or a `sqlalchemy.Table`.
+        path (str | Path): Path of the Parquet file.
+        batch_size (int, optional): Number of rows fetched (and written) at once. Defaults to DEFAULT_BATCH_SIZE.
+        columns (Sequence[str], optional): Names of the columns to export. Defaults to all the columns.
+        where (sqlalchemy.ColumnElement[bool], optional): Filter applied to the query. Defaults to None.
+        smallint_as_bool (bool, optional): Whether to export `SMALLINT` columns as booleans. Defaults to True.
+        **parquet_options: Additional arguments passed to `pyarrow.parquet.ParquetWriter` (e.g. `compression`).
+
+    Returns:
+        int: The number of rows written.
+    """
+    _import_pyarrow()
+    import pyarrow.parquet as pq
+
+    schema = arrow_schema(model, columns=columns, smallint_as_bool=smallint_as_bool)
+
+    rows = 0
+    with pq.ParquetWriter(str(path), schema, **parquet_options) as writer:
+        for batch in iter_record_batches(
+            connection,
+            model,
+            batch_size=batch_size,
+            columns=columns,
+            where=where,
+            smallint_as_bool=smallint_as_bool,
+        ):
+            writer.write_batch(batch)
+            rows += batch.num_rows
+
+    return rows
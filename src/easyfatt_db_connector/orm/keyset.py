@@ -0,0 +1,189 @@
+""" Keyset-paginated streaming of the database tables.
+
+Iterating over `TDocRighe.__table__.select()` executes a single query whose result is buffered by
+the client. The functions of this module read a table in batches instead, each one fetched by a
+separate (short) query which starts right after the last row of the previous batch:
+
+```sql
+SELECT ... FROM "TDocRighe"
+WHERE "IDDoc" >= :last_IDDoc AND ("IDDoc" > :last_IDDoc OR ("IDDoc" = :last_IDDoc AND "IDDocRiga" > :last_IDDocRiga))
+ORDER BY "IDDoc", "IDDocRiga"
+ROWS 1 TO 10000
+```
+
+The rows are read in the order of the primary key (or of an index, e.g. `TDocRighe_I2`), so the
+queries use the index instead of sorting the table, the memory stays bounded to a single batch and
+an interrupted export can be resumed from the key of the last batch it processed.
+
+!!! Example
+    ```python
+    from easyfatt_db_connector.core.connection import EasyfattDB
+    from easyfatt_db_connector.orm.keyset import iter_batches
+    from easyfatt_db_connector.orm.static import TDocRighe
+
+    database = EasyfattDB(database_path)
+    with database.connect() as connection:
+        for batch in iter_batches(connection, TDocRighe, key="TDocRighe_I2", after=last_key):
+            process(batch.rows)
+            last_key = batch.last_key  # Persist it to resume from here after a failure
+    ```
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Iterator, Optional, Sequence, Union
+
+import sqlalchemy
+
+from easyfatt_db_connector.orm._utils import get_table
+
+__all__ = ["KeysetBatch", "iter_batches", "iter_rows", "keyset_columns"]
+
+DEFAULT_BATCH_SIZE = 10_000
+""" Default number of rows fetched by each query. """
+
+
+@dataclass
+class KeysetBatch(object):
+    """ A batch of rows read by `iter_batches`. """
+
+    rows: "list[sqlalchemy.Row]"
+    """ The rows, in the order of the key. """
+
+    last_key: "tuple[Any, ...]"
+    """ Values of the key columns of the last row (pass them as `after` to resume from the next batch). """
+
+
+def keyset_columns(model: Any, key: Optional[Union[str, Sequence[str]]] = None) -> "list[sqlalchemy.Column]":
+    """ Returns the columns the rows of a table are ordered (and paginated) by.
+
+    The columns of the primary key are appended to the ones of a non-unique index (if not
+    already included), so that the key always identifies a single row.
+
+    Args:
+        model (Any): A static model (e.g. `TDocRighe`), a class created by `table_factory` or a `sqlalchemy.Table`.
+        key (str | Sequence[str], optional): Name of an index of the table (e.g. `"TDocRighe_I2"`) or names of the columns. Defaults to the primary key.
+
+    Raises:
+        ValueError: If the key is not valid.
+
+    Returns:
+        list[sqlalchemy.Column]: The columns.
+    """
+    table = get_table(model)
+    primary_key = list(table.primary_key.columns)
+    unique = True
+
+    if key is None:
+        columns = primary_key
+    elif isinstance(key, str) and key not in table.columns:
+        index = next((index for index in table.indexes if index.name == key), None)
+        if index is None:
+            raise ValueError(f"The table '{table.name}' does not have a column or an index named '{key}'")
+
+        columns = list(index.columns)
+        unique = index.unique
+    else:
+        columns = [table.columns[name] for name in ([key] if isinstance(key, str) else key)]
+        unique = set(columns) >= set(primary_key)
+
+    if not unique or not columns:
+        if not primary_key:
+            raise ValueError(f"The table '{table.name}' does not have a primary key")
+
+        columns += [column for column in primary_key if column not in columns]
+
+    return columns
+
+
+def _after(columns: "list[sqlalchemy.Column]", values: Sequence[Any]) -> sqlalchemy.ColumnElement[bool]:
+    """ Returns the condition selecting the rows whose key follows the given values.
+
+    Firebird 2.5 does not support row values (`("IDDoc", "IDDocRiga") > (:a, :b)`), so the
+    comparison is expanded. The leading `>=` lets the database start the scan of the index at
+    the right position.
+    """
+    if len(values) != len(columns):
+        raise ValueError(f"Expected {len(columns)} values for the key, got {len(values)}")
+
+    alternatives = [
+        sqlalchemy.and_(*[column == value for column, value in zip(columns[:position], values)], columns[position] > values[position])
+        for position in range(len(columns))
+    ]
+
+    if len(columns) == 1:
+        return alternatives[0]
+
+    return sqlalchemy.and_(columns[0] >= values[0], sqlalchemy.or_(*alternatives))
+
+
+def iter_batches(
+    connection: sqlalchemy.Connection,
+    model: Any,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    key: Optional[Union[str, Sequence[str]]] = None,
+    after: Optional[Sequence[Any]] = None,
+    columns: Optional[Sequence[str]] = None,
+    where: Optional[sqlalchemy.ColumnElement[bool]] = None,
+) -> Iterator[KeysetBatch]:
+    """ Streams the rows of a table in batches, ordered by a key (see the documentation of the module).
+
+    The columns of the key MUST NOT contain `NULL` values (as the primary keys and the indexes on the foreign keys of Easyfatt).
+
+    Args:
+        connection (sqlalchemy.Connection): The connection (see `EasyfattDB.connect`).
+        model (Any): A static model (e.g. `TDocRighe`), a class created by `table_factory` or a `sqlalchemy.Table`.
+        batch_size (int, optional): Number of rows fetched by each query. Defaults to DEFAULT_BATCH_SIZE.
+        key (str | Sequence[str], optional): The key the rows are ordered by (see `keyset_columns`). Defaults to the primary key.
+        after (Sequence[Any], optional): Start after the row with this key (e.g. `KeysetBatch.last_key` of a previous run). Defaults to the beginning of the table.
+        columns (Sequence[str], optional): Names of the columns to read (the columns of the key are always included). Defaults to all the columns.
+        where (sqlalchemy.ColumnElement[bool], optional): Filter applied to the query. Defaults to None.
+
+    Yields:
+        KeysetBatch: The batches of rows.
+    """
+    if batch_size < 1:
+        raise ValueError("The size of the batches must be at least 1")
+
+    table = get_table(model)
+    key_columns = keyset_columns(table, key)
+
+    selected = list(table.columns) if columns is None else [table.columns[name] for name in columns]
+    selected += [column for column in key_columns if column not in selected]
+    key_indexes = [selected.index(column) for column in key_columns]
+
+    query = sqlalchemy.select(*selected).order_by(*key_columns).limit(batch_size)
+    if where is not None:
+        query = query.where(where)
+
+    last_key = tuple(after) if after is not None else None
+    while True:
+        batch_query = query if last_key is None else query.where(_after(key_columns, last_key))
+        # Each batch is bounded by the `LIMIT` of the query, so it is simply fetched at once
+        rows = connection.execute(batch_query).fetchall()
+        if not rows:
+            return
+
+        last_key = tuple(rows[-1][index] for index in key_indexes)
+        yield KeysetBatch(rows, last_key)
+
+        if len(rows) < batch_size:
+            return
+
+
+def iter_rows(
+    connection: sqlalchemy.Connection,
+    model: Any,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    key: Optional[Union[str, Sequence[str]]] = None,
+    after: Optional[Sequence[Any]] = None,
+    columns: Optional[Sequence[str]] = None,
+    where: Optional[sqlalchemy.ColumnElement[bool]] = None,
+) -> Iterator[sqlalchemy.Row]:
+    """ Streams the rows of a table one at a time (see `iter_batches` for the arguments).
+
+    Yields:
+        sqlalchemy.Row: The rows, in the order of the key.
+    """
+    for batch in iter_batches(connection, model, batch_size=batch_size, key=key, after=after, columns=columns, where=where):
+        yield from batch.rows
@@ -11,5 +11,9 @@ with engine.connect() as conn:
     for row in conn.execute(query):
         print(row)
 ```
+
+The query above is executed at once and its result is buffered by the client: to read the
+biggest tables (e.g. `TDocRighe`, `TMovMagazz` or `TPrimaNota`) use the keyset-paginated
+iterators of `easyfatt_db_connector.orm.keyset`, which read the rows in batches.
 """
 from .models import *
\ No newline at end of file
@@ -0,0 +1,161 @@
+""" Filesystem utilities. """
+from __future__ import annotations
+
+import errno
+import logging
+import os
+from pathlib import Path
+import shutil
+import sys
+from typing import IO, Callable, Literal, Union
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["copy_file", "is_file_locked"]
+
+CopyStrategy = Literal["reflink", "copy_file_range", "sendfile", "buffered"]
+
+FICLONE = 0x40049409
+""" Linux `ioctl` request used to clone a file (copy-on-write) on `btrfs`, `XFS` and similar filesystems. """
+
+BUFFER_SIZE = 1024 * 1024
+""" Size of the chunks used by the kernel-side and buffered copies. """
+
+_WINDOWS_SHARING_ERRORS = {32, 33}
+""" `ERROR_SHARING_VIOLATION` and `ERROR_LOCK_VIOLATION`: the file is opened (or locked) by another process. """
+
+# Errors meaning that a strategy is not supported for the given files (so the next one must be tried)
+_UNSUPPORTED_ERRNOS = {
+    errno.EBADF,
+    errno.EINVAL,
+    errno.ENOSYS,
+    errno.ENOTTY,
+    errno.EOPNOTSUPP,
+    errno.EPERM,
+    errno.EXDEV,
+    getattr(errno, "ENOTSUP", errno.EOPNOTSUPP),
+}
+
+
+def _reflink(source: IO[bytes], destination: IO[bytes], size: int):
+    import fcntl
+
+    fcntl.ioctl(destination.fileno(), FICLONE, source.fileno())
+
+
+def _copy_file_range(source: IO[bytes], destination: IO[bytes], size: int):
+    copied = 0
+    while copied < size:
+        sent = os.copy_file_range(source.fileno(), destination.fileno(), min(BUFFER_SIZE * 64, size - copied))
+        if sent == 0:
+            break
+        copied += sent
+
+
+def _sendfile(source: IO[bytes], destination: IO[bytes], size: int):
+    copied = 0
+    while copied < size:
+        sent = os.sendfile(destination.fileno(), source.fileno(), copied, min(BUFFER_SIZE * 64, size - copied))
+        if sent == 0:
+            break
+        copied += sent
+
+
+def _buffered(source: IO[bytes], destination: IO[bytes], size: int):
+    shutil.copyfileobj(source, destination, BUFFER_SIZE)
+
+
+_STRATEGIES: list[tuple[CopyStrategy, Callable[[IO[bytes], IO[bytes], int], None], bool]] = [
+    ("reflink", _reflink, sys.platform.startswith("linux")),
+    ("copy_file_range", _copy_file_range, hasattr(os, "copy_file_range")),
+    ("sendfile", _sendfile, sys.platform.startswith("linux") and hasattr(os, "sendfile")),
+    ("buffered", _buffered, True),
+]
+
+
+def copy_file(source: Union[str, Path], destination: Union[str, Path]) -> CopyStrategy:
+    """ Copies a file using the fastest strategy supported by the platform and the filesystem.
+
+    The following strategies are tried in order:
+
+    1. `reflink`: copy-on-write clone of the file (`FICLONE` ioctl, supported by `btrfs`, `XFS`, ...). Nearly instant.
+    2. `copy_file_range`: kernel-side copy (which may also clone the file on some filesystems).
+    3. `sendfile`: kernel-side copy.
+    4. `buffered`: plain copy through user space.
+
+    Args:
+        source (str | Path): The file to copy.
+        destination (str | Path): The path of the copy (overwritten if it exists).
+
+    Returns:
+        CopyStrategy: The name of the strategy that was used.
+    """
+    with open(source, "rb") as source_file, open(destination, "wb") as destination_file:
+        size = os.fstat(source_file.fileno()).st_size
+
+        for name, function, available in _STRATEGIES:
+            if not available:
+                continue
+
+            try:
+                function(source_file, destination_file, size)
+            except OSError as e:
+                if e.errno not in _UNSUPPORTED_ERRNOS or name == "buffered":
+                    raise
+
+                logger.debug(f"Copy strategy '{name}' not supported for '{source}': {e}")
+
+                # Restart from scratch with the next strategy
+                source_file.seek(0)
+                destination_file.seek(0)
+                destination_file.truncate()
+                continue
+
+            return name
+
+    raise RuntimeError("No copy strategy available")
+
+
+def is_file_locked(path: Union[str, Path]) -> bool:
+    """ Checks, without blocking, whether a file is locked by another process (e.g. Firebird).
+
+    The check takes a few microseconds and never waits for the lock, so it can be polled:
+
+    - on Windows the file is opened for writing, which fails with a sharing violation while
+      Firebird has it open (it does not allow other processes to write the database). A file
+      that cannot be written at all (e.g. read-only attribute or ACL) is reported as locked too,
+      since it cannot be attached directly either;
+    - elsewhere a shared `flock` is requested (and immediately released), which fails while
+      Firebird holds its exclusive lock on the database. POSIX record locks (`fcntl`) are not
+      used, since closing the file would release the locks held by this process (e.g. by a
+      Firebird embedded connection).
+
+    Args:
+        path (str | Path): The file.
+
+    Returns:
+        bool: Whether the file is locked (or, on Windows, cannot be opened for writing).
+    """
+    if sys.platform == "win32":
+        try:
+            handle = os.open(path, os.O_RDWR | os.O_BINARY)
+        except PermissionError as e:
+            if getattr(e, "winerror", None) not in _WINDOWS_SHARING_ERRORS:
+                logger.debug(f"The file '{path}' cannot be opened for writing: {e}")
+            return True
+
+        os.close(handle)
+        return False
+
+    import fcntl
+
+    handle = os.open(path, os.O_RDONLY)
+    try:
+        fcntl.flock(handle, fcntl.LOCK_SH | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return True
+    else:
+        fcntl.flock(handle, fcntl.LOCK_UN)
+        return False
+    finally:
+        os.close(handle)
@@ -1,17 +1,38 @@
+import copy
+import os
 from pathlib import Path
-from typing import Optional, Union
+from typing import BinaryIO, Iterable, Optional, Union
+
+import lxml.etree as ET
 
 from easyfatt_db_connector.xml.root import EasyfattXML
+from easyfatt_db_connector.xml.common.diagnostics import ParseDiagnostics
+from easyfatt_db_connector.xml.columns import read_arrow, read_columns
+from easyfatt_db_connector.xml.document import Document
+from easyfatt_db_connector.xml.parallel import ReadResult, read_xml_many
+from easyfatt_db_connector.xml.stream import iter_documents, open_source, read_header
 
-__all__ = ["read_xml", "EasyfattXML"]
+__all__ = ["read_xml", "write_xml", "read_xml_many", "iter_documents", "read_header", "read_columns", "read_arrow", "EasyfattXML", "ReadResult", "ParseDiagnostics"]
 
-def read_xml(filename: Optional[Union[str, Path]] = None, text: Optional[str] = None, convert_types=True) -> EasyfattXML:
+def read_xml(
+    filename: Optional[Union[str, Path]] = None,
+    text: Optional[str] = None,
+    convert_types=True,
+    workers: Optional[int] = 1,
+    compact: bool = False,
+    diagnostics: Optional[ParseDiagnostics] = None,
+    lazy_pdf: bool = False,
+) -> EasyfattXML:
     """ Legge un file XML e lo converte in un oggetto `EasyfattXML`. 
     
     Args:
         filename (Union[str, Path], optional): Percorso del file XML da leggere. Defaults to None.
         text (str, optional): Testo del file XML da leggere. Defaults to None.
-        convert_types (bool, optional): Se `True`, converte i valori dei tag in tipi Python. Defaults to True.
+        convert_types (bool | str, optional): Se `True`, converte i valori dei tag in tipi Python. Con `"native"` converte anche le date in `datetime.date` e gli importi in `decimal.Decimal`. Defaults to True.
+        workers (int | None, optional): Numero di processi utilizzati per convertire i documenti (`None` utilizza tutte le CPU). Utile solamente per file con migliaia di documenti. Defaults to 1.
+        compact (bool, optional): Se `True`, gli oggetti memorizzano i valori in `__slots__` invece che in un dizionario, riducendo la memoria occupata dai file più grandi. Gli oggetti hanno gli stessi attributi e metodi, ma non sono istanze delle classi originali (ad esempio `isinstance(documento, Document)` è `False`). Defaults to False.
+        diagnostics (ParseDiagnostics, optional): Se specificato, i tag non gestiti dalle classi vengono raccolti in questo oggetto invece di essere registrati nel log (una volta per tag, al termine della lettura). Defaults to None.
+        lazy_pdf (bool, optional): Se `True` (e il file viene letto da `filename`), il contenuto dei PDF non viene mantenuto in memoria, ma viene letto dal file solamente quando richiesto (vedi `DocumentPDFFile`). Il file non deve quindi essere modificato, spostato o eliminato finché i PDF sono necessari, altrimenti la lettura solleva `SourceChangedError`: `DocumentPDFFile.load` carica il contenuto in memoria. Il testo dei PDF viene comunque letto durante la conversione (per poterlo ritrovare nel file) e il primo accesso ai PDF scansiona nuovamente il file (una sola volta), per cui si riduce la memoria occupata dagli oggetti, non il tempo di lettura. Defaults to False.
     
     Raises:
         ValueError: Se non viene fornito né un filename né un testo, oppure se vengono forniti entrambi.
@@ -22,12 +43,55 @@ def read_xml(filename: Optional[Union[str, Path]] = None, text: Optional[str] =
     if (filename is not None and text is not None) or (filename is None and text is None):
         raise ValueError("You must provide a filename or a text")
 
-    xml_string = ""
+    root_class = EasyfattXML.compact_class() if compact else EasyfattXML
+
     if filename is not None:
-        with open(filename, "r", encoding='utf-8-sig') as f:
-            xml_string = f.read().strip()
+        # The file is handed directly to the parser (BOM and encoding are handled by `libxml2`),
+        # so that its content is never decoded to a Python string
+        with open_source(filename) as f:
+            tree = ET.parse(f, parser=ET.XMLParser(huge_tree=True))
 
-    elif text is not None:
-        xml_string = text.strip()
-    
-    return EasyfattXML.from_xml_string(bytes(xml_string, encoding='utf-8'), convert_types=convert_types)
+        return root_class.from_xml(
+            tree.getroot(), convert_types=convert_types, workers=workers, _diagnostics=diagnostics, _lazy_pdf=lazy_pdf
+        )
+
+    return root_class.from_xml_string(
+        bytes(text.strip(), encoding='utf-8'), convert_types=convert_types, workers=workers, _diagnostics=diagnostics
+    )
+
+
+def write_xml(
+    destination: Union[str, Path, BinaryIO],
+    xml: EasyfattXML,
+    documents: Optional[Iterable[Document]] = None,
+):
+    """ Scrive un file `.DefXml` (ad esempio da importare in Easyfatt) a partire da un oggetto `EasyfattXML`.
+
+    Il file viene scritto un documento alla volta: passando i documenti tramite un generatore
+    (ad esempio `iter_documents`) la memoria utilizzata non dipende dal numero di documenti.
+    Vengono scritti solamente gli attributi impostati, per cui rileggendo il file si ottengono
+    gli stessi oggetti.
+
+    Args:
+        destination (str | Path | BinaryIO): Percorso del file da creare (oppure file aperto in modalità binaria).
+        xml (EasyfattXML): Intestazione del file (`AppVersion`, `Creator` e `<Company>`) ed eventualmente i documenti.
+        documents (Iterable[Document], optional): Documenti da scrivere al posto di `xml.documents`. Defaults to None.
+
+    Example:
+        ```python
+        header = read_header("ordini.DefXml")
+        documents = (document for document in iter_documents("ordini.DefXml") if document.type == "C")
+
+        write_xml("ordini_clienti.DefXml", header, documents)
+        ```
+    """
+    if documents is not None:
+        xml = copy.copy(xml)
+        xml.documents = documents
+
+    if isinstance(destination, os.PathLike):
+        destination = os.fspath(destination)
+
+    with ET.xmlfile(destination, encoding="UTF-8") as xml_file:
+        xml_file.write_declaration()
+        xml._write_xml(xml_file)
@@ -0,0 +1,270 @@
+""" Columnar (table-like) representation of the documents of a `.DefXml` file.
+
+The documents are flattened into one table per entity, each stored as a dictionary of columns
+(name of the column -> list of values):
+
+- `documents`: one row per document, including the nested groups and fields (e.g. the
+  column `customer.name` or `cost_vat_code.percentage`);
+- `rows` and `payments`: one row per `Product` and `Payment`, including the VAT info (e.g. the
+  column `vat_info.percentage`), with the column `document` referencing the position of the
+  document in the `documents` table.
+
+`read_columns` fills the columns directly from the XML elements while the file is being parsed
+(no `Document` or `Product` object is ever created), while `documents_to_columns` converts the
+documents that have already been read (see `EasyfattXML.to_columns`). Both return the same columns.
+
+!!! Note
+    The conversion to Arrow tables (`read_arrow`, `columns_to_arrow`) requires the optional
+    dependency [`pyarrow`](https://arrow.apache.org/docs/python/) (`pip install easyfatt-db-connector[arrow]`).
+
+!!! Example
+    ```python
+    import pyarrow.compute as pc
+    from easyfatt_db_connector.xml.columns import read_arrow
+
+    tables = read_arrow("fatture.DefXml")
+    rows = tables["rows"]
+
+    print(pc.sum(pc.multiply(rows["quantity"], rows["price"])))
+    print(rows.group_by("vat_info.code").aggregate([("total", "sum")]))
+    ```
+"""
+from typing import TYPE_CHECKING, Any, Iterable, Optional
+
+import lxml.etree as ET
+
+from easyfatt_db_connector.core.exceptions import TypeConversionError
+from easyfatt_db_connector.xml.common.mapper import _index_children
+from easyfatt_db_connector.xml.common.plan import ATTRIBUTE, CHILD, CHILDREN, GROUP, NO_DEFAULT, TEXT
+from easyfatt_db_connector.xml.common.source import XMLSource, open_source
+from easyfatt_db_connector.xml.document import Document
+from easyfatt_db_connector.xml.stream import _clear_element
+
+if TYPE_CHECKING:
+    import pyarrow
+
+__all__ = ["read_columns", "read_arrow", "documents_to_columns", "columns_to_arrow"]
+
+Columns = "dict[str, list[Any]]"
+
+DOCUMENTS_TABLE = "documents"
+""" Name of the table containing the documents (the other tables are named after the lists of the document, e.g. `rows`). """
+
+DOCUMENT_COLUMN = "document"
+""" Column containing the position of the document (in the `documents` table) each row belongs to. """
+
+EXCLUDED_COLUMNS = frozenset({"pdf.content"})
+""" Columns left out of the tables (the content of the PDFs can be read from the `Document` objects). """
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError(
+            "The optional dependency 'pyarrow' is required to create Arrow tables (install it with `pip install easyfatt-db-connector[arrow]`)."
+        ) from e
+
+    return pyarrow
+
+
+def _column_names(cls: type, native: bool, prefix: str = "") -> "list[str]":
+    """ Returns the names of the (flattened) columns of a mapper class. """
+    names = []
+    for field in cls._get_parse_plan(native=native).fields:
+        name = prefix + field.attr
+
+        if field.kind == CHILDREN or name in EXCLUDED_COLUMNS:
+            continue
+        elif field.kind in (GROUP, CHILD):
+            names.extend(_column_names(field.target, native, name + "."))
+        else:
+            names.append(name)
+
+    return names
+
+
+def _new_tables(native: bool) -> "dict[str, Columns]":
+    """ Returns the (empty) tables of the documents and of their lists. """
+    tables = {DOCUMENTS_TABLE: {name: [] for name in [DOCUMENT_COLUMN, *_column_names(Document, native)]}}
+
+    for field in Document._get_parse_plan(native=native).fields:
+        if field.kind == CHILDREN:
+            tables[field.attr] = {name: [] for name in [DOCUMENT_COLUMN, *_column_names(field.target, native)]}
+
+    return tables
+
+
+def _fill_from_element(
+    cls: type,
+    element: Optional[ET._Element],
+    convert_types,
+    columns: Columns,
+    prefix: str = "",
+    children: Optional["dict[str, Any]"] = None,
+):
+    """ Appends the values of an element (`None` if missing) to the columns, converting them like `XMLMapper.from_xml`.
+
+    The children of the element are indexed once (see `_index_children`) and shared with the `FieldGroup`s.
+    """
+    plan = cls._get_parse_plan(native=convert_types == "native")
+    if element is not None and children is None:
+        children = _index_children(element, plan)
+
+    for field in plan.fields:
+        name = prefix + field.attr
+        kind = field.kind
+
+        if kind == CHILDREN or name in EXCLUDED_COLUMNS:
+            continue
+
+        elif kind == GROUP:
+            _fill_from_element(field.target, element, convert_types, columns, name + ".", children)
+            continue
+
+        elif kind == CHILD:
+            child_element = children.get(field.tag) if element is not None else None
+            _fill_from_element(field.target, child_element, convert_types, columns, name + ".")
+            continue
+
+        if element is None:
+            columns[name].append(None)
+            continue
+
+        if kind == ATTRIBUTE:
+            element_text = element.get(field.tag)
+        elif kind == TEXT:
+            element_text = element.text
+        else:
+            child_element = children.get(field.tag)
+
+            if child_element is None:
+                # Same value of the attribute left unset by `from_xml`
+                default = field.default if field.default is not NO_DEFAULT else getattr(cls, field.attr, None)
+                columns[name].append(default)
+                continue
+
+            element_text = child_element.text
+
+        if not convert_types or field.converter is None:
+            columns[name].append(element_text)
+            continue
+
+        try:
+            columns[name].append(field.converter(element_text))
+        except ValueError:
+            raise TypeConversionError(
+                f"Error while converting `{cls.__name__}.{field.attr}`: `{element_text}` cannot be converted to `{field.type_name}`."
+            )
+
+
+def _fill_from_object(cls: type, xml_object: Any, columns: Columns, prefix: str = ""):
+    """ Appends the attributes of a mapper object (`None` if missing) to the columns. """
+    for field in cls._get_parse_plan().fields:
+        name = prefix + field.attr
+
+        if field.kind == CHILDREN or name in EXCLUDED_COLUMNS:
+            continue
+
+        value = getattr(xml_object, field.attr, None) if xml_object is not None else None
+        if field.kind in (GROUP, CHILD):
+            _fill_from_object(field.target, value, columns, name + ".")
+        else:
+            columns[name].append(value)
+
+
+def read_columns(source: XMLSource, convert_types=True) -> "dict[str, Columns]":
+    """ Legge i documenti di un file `.DefXml` in formato colonnare (vedi la documentazione del modulo).
+
+    Il file viene letto un documento alla volta (come `iter_documents`) e i valori vengono inseriti
+    direttamente nelle colonne, senza creare gli oggetti `Document` e `Product`.
+
+    Args:
+        source (str | Path | IO[bytes]): Percorso del file XML da leggere (oppure file aperto in modalità binaria).
+        convert_types (bool | str, optional): Se `True`, converte i valori dei tag in tipi Python (`"native"` converte anche date e importi). Defaults to True.
+
+    Returns:
+        dict[str, dict[str, list]]: Le tabelle (`documents`, `rows` e `payments`), ciascuna come dizionario di colonne.
+    """
+    native = convert_types == "native"
+    tables = _new_tables(native)
+    documents = tables[DOCUMENTS_TABLE]
+    plan = Document._get_parse_plan(native=native)
+    lists = [(field, tables[field.attr]) for field in plan.fields if field.kind == CHILDREN]
+
+    with open_source(source) as file:
+        context = ET.iterparse(file, events=("end",), tag=Document._get_xml_tag(), huge_tree=True)
+
+        for _, element in context:
+            parent = element.getparent()
+            if parent is None or parent.tag != "Documents":
+                continue
+
+            children = _index_children(element, plan)
+            position = len(documents[DOCUMENT_COLUMN])
+            documents[DOCUMENT_COLUMN].append(position)
+            _fill_from_element(Document, element, convert_types, documents, children=children)
+
+            for field, columns in lists:
+                for container in children.get(field.tag, ()):
+                    for child_element in container.iterchildren(field.child_tag):
+                        columns[DOCUMENT_COLUMN].append(position)
+                        _fill_from_element(field.target, child_element, convert_types, columns)
+
+            _clear_element(element)
+
+        del context
+
+    return tables
+
+
+def documents_to_columns(documents: Iterable[Document]) -> "dict[str, Columns]":
+    """ Converte dei documenti già letti in formato colonnare (vedi `read_columns`).
+
+    Args:
+        documents (Iterable[Document]): I documenti.
+
+    Returns:
+        dict[str, dict[str, list]]: Le tabelle (`documents`, `rows` e `payments`), ciascuna come dizionario di colonne.
+    """
+    tables = _new_tables(native=False)
+    table_columns = tables[DOCUMENTS_TABLE]
+    lists = [
+        (field, tables[field.attr]) for field in Document._get_parse_plan().fields if field.kind == CHILDREN
+    ]
+
+    for position, document in enumerate(documents):
+        table_columns[DOCUMENT_COLUMN].append(position)
+        _fill_from_object(Document, document, table_columns)
+
+        for field, columns in lists:
+            for item in getattr(document, field.attr, None) or []:
+                columns[DOCUMENT_COLUMN].append(position)
+                _fill_from_object(field.target, item, columns)
+
+    return tables
+
+
+def columns_to_arrow(tables: "dict[str, Columns]") -> "dict[str, pyarrow.Table]":
+    """ Converte le tabelle restituite da `read_columns` (o `documents_to_columns`) in tabelle Arrow.
+
+    I tipi delle colonne vengono dedotti dai valori (ad esempio `decimal.Decimal` diventa `decimal128`).
+
+    Args:
+        tables (dict[str, dict[str, list]]): Le tabelle.
+
+    Returns:
+        dict[str, pyarrow.Table]: Le tabelle Arrow, con gli stessi nomi.
+    """
+    pa = _import_pyarrow()
+
+    return {name: pa.table(columns) for name, columns in tables.items()}
+
+
+def read_arrow(source: XMLSource, convert_types=True) -> "dict[str, pyarrow.Table]":
+    """ Legge i documenti di un file `.DefXml` come tabelle Arrow (vedi `read_columns` per gli argomenti).
+
+    Returns:
+        dict[str, pyarrow.Table]: Le tabelle (`documents`, `rows` e `payments`).
+    """
+    return columns_to_arrow(read_columns(source, convert_types=convert_types))
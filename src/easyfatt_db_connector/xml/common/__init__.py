@@ -1,2 +1,4 @@
+from .converters import ConverterRegistry, converters, register_converter
+from .diagnostics import ParseDiagnostics
 from .fields import Field, FieldGroup
 from .mapper import XMLMapper
\ No newline at end of file
@@ -0,0 +1,141 @@
+""" Compact (`__slots__` based) versions of the mapper classes.
+
+The mapper classes are dataclasses whose instances store their attributes in a `__dict__`, which
+for big files (e.g. 100k rows, each with its `VatCode`) means hundreds of thousands of dictionaries.
+The compact version of a class has the same attributes, methods and mapping, but stores the values
+in `__slots__`: the class defaults are returned (without being stored) for the attributes that
+have not been set, exactly like with the original class. While parsing, the short string values
+are also interned (see `ParsePlan.intern_text`), since the same units, VAT codes and dates are
+repeated in most rows: this is where most of the memory is saved, as from Python 3.11 the
+attributes of the objects without slots are already stored without a separate dictionary.
+
+!!! Note
+    The compact class is a different class from the original one (an object of the compact version
+    of `Product` is **not** an instance of `Product`), but it has the same name and behaviour.
+"""
+from typing import Any, Iterator
+
+from .mapper import XMLMapper
+
+__all__ = ["compact_class", "is_compact"]
+
+# Attributes of the original class that must not be copied to the compact class
+_EXCLUDED = {"__dict__", "__weakref__", "__slots__", "__xml_plan__", "__xml_native_plan__", "__xml_compact_class__"}
+
+
+def is_compact(cls: type) -> bool:
+    """ Returns whether a mapper class is the compact version of another class. """
+    return cls.__dict__.get("__xml_compact__", False)
+
+
+def _restore(original: type, state: "list[tuple[str, Any]]", defaulted: "frozenset[str] | None" = None) -> XMLMapper:
+    """ Re-creates a compact object (used by `pickle`, since the compact classes cannot be imported). """
+    xml_object = compact_class(original)()
+    for name, value in state:
+        setattr(xml_object, name, value)
+
+    if defaulted:
+        xml_object.__xml_defaulted__ = defaulted
+
+    return xml_object
+
+
+def _is_slot_candidate(name: str, value: Any) -> bool:
+    """ Whether a class attribute is a default value (so it must become a slot) rather than a method or descriptor. """
+    if name.startswith("__") and name.endswith("__"):
+        return False
+
+    return not (
+        callable(value)
+        or isinstance(value, (classmethod, staticmethod, property))
+        or hasattr(value, "__get__")
+    )
+
+
+def compact_class(cls: type) -> type:
+    """ Returns the compact version of a mapper class, creating it on first use.
+
+    Args:
+        cls (type): The `XMLMapper` subclass (if already compact, it is returned as is).
+
+    Returns:
+        type: The compact class.
+    """
+    if is_compact(cls):
+        return cls
+
+    compact = cls.__dict__.get("__xml_compact_class__")
+    if compact is not None:
+        return compact
+
+    bases = tuple(
+        compact_class(base) if issubclass(base, XMLMapper) and base is not XMLMapper else base
+        for base in cls.__bases__
+    )
+    inherited_slots = {name for base in bases for name in getattr(base, "__xml_slots__", ())}
+
+    # Slots follow the order of the mapping, so that the objects are printed like the original ones
+    names = [*(cls.__dict__.get("__xml_mapping__") or {}), *cls.__dict__.get("__annotations__", {})]
+    names += [name for name, value in cls.__dict__.items() if _is_slot_candidate(name, value)]
+
+    defaults = {}
+    slots = []
+    for name in dict.fromkeys(names):
+        value = cls.__dict__.get(name)
+        if name in inherited_slots or isinstance(value, property) or name in _EXCLUDED:
+            continue
+
+        slots.append(name)
+        if name in cls.__dict__:
+            defaults[name] = value
+
+    namespace = {name: value for name, value in cls.__dict__.items() if name not in _EXCLUDED and name not in slots}
+    all_slots = tuple(
+        name for base in reversed(bases) for name in getattr(base, "__xml_slots__", ())
+    ) + tuple(slots)
+
+    inherited_defaults = {}
+    for base in reversed(bases):
+        inherited_defaults.update(getattr(base, "__xml_defaults__", {}))
+
+    def __getattr__(self, name: str) -> Any:
+        # Called only for the slots that have not been set
+        try:
+            return type(self).__xml_defaults__[name]
+        except KeyError:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'") from None
+
+    def _get_attributes(self) -> Iterator["tuple[str, Any]"]:
+        members = type(self).__xml_slot_members__
+        for name in type(self).__xml_slots__:
+            try:
+                yield name, members[name].__get__(self)
+            except AttributeError:
+                continue
+
+    def __reduce__(self):
+        return (_restore, (cls, list(self._get_attributes()), getattr(self, "__xml_defaulted__", None)))
+
+    namespace.update(
+        {
+            "__slots__": tuple(slots),
+            "__xml_compact__": True,
+            "__xml_original__": cls,
+            "__xml_slots__": all_slots,
+            "__xml_defaults__": {**inherited_defaults, **defaults},
+            "__getattr__": __getattr__,
+            "_get_attributes": _get_attributes,
+            "__reduce__": __reduce__,
+        }
+    )
+
+    compact = type(cls.__name__, bases, namespace)
+    compact.__xml_slot_members__ = {
+        name: member
+        for klass in reversed(compact.__mro__)
+        for name in klass.__dict__.get("__slots__", ())
+        if (member := klass.__dict__.get(name)) is not None
+    }
+
+    cls.__xml_compact_class__ = compact
+    return compact
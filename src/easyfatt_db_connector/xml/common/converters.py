@@ -0,0 +1,215 @@
+""" Registry of the functions converting the text of the XML elements to Python values.
+
+The converter of each attribute is resolved from its type hint only once, when the parse plan
+of the class is compiled (see `compile_plan`), so no inspection of the typing objects happens
+while parsing. Supported type hints:
+
+- the registered types (`str`, `int`, `float` and `bool` by default, see `register_converter`);
+- `Optional[...]` and `Union[...]` (the members are tried in order);
+- `Literal[...]` (converted like the type of its values, the values not in the list are kept as they are);
+- `Annotated[...]` and `Enum` subclasses.
+
+The converters of `date`, `datetime` and `Decimal` (used by the "native" conversion mode, see
+`XMLMapper.__xml_native_types__`) are also registered by default: since the same dates and amounts
+are repeated many times in a file, their results are cached.
+
+!!! Example
+    ```python
+    from fractions import Fraction
+    from easyfatt_db_connector.xml.common import register_converter
+
+    register_converter(Fraction, lambda text: Fraction(text or 0))
+    ```
+"""
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from enum import Enum
+from functools import lru_cache
+import threading
+import types
+from typing import Any, Callable, Literal, Optional, Union, get_args, get_origin
+
+try:
+    from typing import Annotated
+except ImportError:
+    from typing_extensions import Annotated
+
+__all__ = ["Converter", "ConverterRegistry", "converters", "register_converter"]
+
+Converter = Callable[[Optional[str]], Any]
+""" Function converting the text of an XML element (`None` if the element is empty) to a Python value. """
+
+
+def _convert_bool(text: Optional[str]) -> bool:
+    return (text if text is not None else "").lower() == "true"
+
+
+def _convert_int(text: Optional[str]) -> int:
+    return int(text if text is not None else 0)
+
+
+def _convert_float(text: Optional[str]) -> float:
+    return float(text if text is not None else 0)
+
+
+def _convert_str(text: Optional[str]) -> str:
+    return str(text if text is not None else "")
+
+
+@lru_cache(maxsize=4096)
+def _convert_date(text: Optional[str]) -> Optional[date]:
+    return date.fromisoformat(text.strip()) if text and text.strip() else None
+
+
+@lru_cache(maxsize=4096)
+def _convert_datetime(text: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(text.strip()) if text and text.strip() else None
+
+
+@lru_cache(maxsize=16384)
+def _convert_decimal(text: Optional[str]) -> Decimal:
+    try:
+        return Decimal(text.strip() if text and text.strip() else 0)
+    except InvalidOperation:
+        # Raise the same error of the other converters, so that it becomes a `TypeConversionError`
+        raise ValueError(f"Invalid decimal value: {text!r}") from None
+
+
+def _union_converter(members: "list[Converter]") -> Converter:
+    def convert(text: Optional[str]) -> Any:
+        for converter in members[:-1]:
+            try:
+                return converter(text)
+            except ValueError:
+                continue
+
+        return members[-1](text)
+
+    return convert
+
+
+def _enum_converter(enum_type: "type[Enum]") -> Converter:
+    def convert(text: Optional[str]) -> Any:
+        return enum_type(text) if text is not None else None
+
+    return convert
+
+
+class ConverterRegistry(object):
+    """ Maps the types to the functions converting the XML text to values of that type. """
+
+    version: int
+    """ Incremented at each registration, so that the parse plans compiled before are rebuilt. """
+
+    def __init__(self) -> None:
+        self._converters: "dict[Any, Converter]" = {}
+        self._lock = threading.Lock()
+        self.version = 0
+
+    def __repr__(self) -> str:
+        return f"<ConverterRegistry: {', '.join(getattr(key, '__name__', str(key)) for key in self._converters)}>"
+
+    def register(self, expected_type: Any, converter: Optional[Converter] = None):
+        """ Registers the converter of a type (replacing the existing one, if any).
+
+        Can also be used as a decorator: `@converters.register(MyType)`.
+
+        Args:
+            expected_type (Any): The type (or type hint) the converter produces.
+            converter (Converter, optional): The function. Defaults to None (returns a decorator).
+        """
+        if converter is None:
+            def decorator(function: Converter) -> Converter:
+                self.register(expected_type, function)
+                return function
+
+            return decorator
+
+        with self._lock:
+            self._converters[expected_type] = converter
+            self.version += 1
+
+    def unregister(self, expected_type: Any):
+        """ Removes the converter of a type (if registered). """
+        with self._lock:
+            if self._converters.pop(expected_type, None) is not None:
+                self.version += 1
+
+    def get(self, expected_type: Any) -> Optional[Converter]:
+        """ Returns the converter registered for exactly the given type (if any). """
+        return self._converters.get(expected_type)
+
+    def resolve(self, expected_type: Any) -> Optional[Converter]:
+        """ Returns the converter for a type hint.
+
+        Args:
+            expected_type (Any): The type hint of the attribute.
+
+        Returns:
+            Converter | None: The converter, or `None` if the text must be kept as is.
+        """
+        try:
+            converter = self._converters.get(expected_type)
+        except TypeError:
+            # Unhashable type hints (e.g. `Literal` with unhashable values)
+            converter = None
+
+        if converter is not None:
+            return converter
+
+        origin = get_origin(expected_type)
+        args = get_args(expected_type)
+
+        if origin is Union or (hasattr(types, "UnionType") and origin is getattr(types, "UnionType")):
+            members = [self.resolve(arg) for arg in args if arg is not type(None)]
+            if not members or any(member is None for member in members):
+                return None
+
+            return members[0] if len(members) == 1 else _union_converter(members)
+
+        elif origin is Literal:
+            # Not validated: a code unknown to the mapping (e.g. a new type of document) must not abort the whole parse
+            value_types = {type(value) for value in args}
+            return self.resolve(value_types.pop()) if len(value_types) == 1 else None
+
+        elif origin is Annotated:
+            return self.resolve(args[0])
+
+        elif isinstance(expected_type, type):
+            if issubclass(expected_type, Enum):
+                return _enum_converter(expected_type)
+
+            for base_type in expected_type.__mro__[1:]:
+                if base_type in self._converters and base_type is not object:
+                    return self._converters[base_type]
+
+        return None
+
+
+converters = ConverterRegistry()
+""" The registry used by all the mapper classes. """
+
+converters.register(bool, _convert_bool)
+converters.register(int, _convert_int)
+converters.register(float, _convert_float)
+converters.register(str, _convert_str)
+converters.register(date, _convert_date)
+converters.register(datetime, _convert_datetime)
+converters.register(Decimal, _convert_decimal)
+
+
+def register_converter(expected_type: Any, converter: Optional[Converter] = None):
+    """ Registers the converter of a type in the global registry (see `ConverterRegistry.register`). """
+    return converters.register(expected_type, converter)
+
+
+def type_name(expected_type: Any) -> str:
+    """ Returns a readable name of a type hint (used in the error messages). """
+    if isinstance(expected_type, type):
+        return expected_type.__name__
+
+    args = [arg for arg in get_args(expected_type) if arg is not type(None)]
+    if get_origin(expected_type) is Union and len(args) == 1:
+        return type_name(args[0])
+
+    return str(expected_type).replace("typing.", "")
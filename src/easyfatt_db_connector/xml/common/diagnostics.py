@@ -0,0 +1,112 @@
+""" Diagnostics collected while parsing the XML files.
+
+The children of an element whose tag is not handled by the `__xml_mapping__` of the class are
+silently ignored by `XMLMapper.from_xml`, so they are reported as "untracked". Since the same
+unknown tag is usually repeated in every document (or row) of a file, the occurrences are
+aggregated over the whole parse and reported only once per tag, through `logging`.
+
+The check can be disabled (e.g. in production) with the `__xml_check_untracked__` class
+attribute, either for a single class or for all of them:
+
+```python
+from easyfatt_db_connector.xml.common import XMLMapper
+
+XMLMapper.__xml_check_untracked__ = False
+```
+"""
+from dataclasses import dataclass, field
+import logging
+from typing import Iterable, Optional
+
+import lxml.etree as ET
+
+__all__ = ["ParseDiagnostics", "UntrackedTag"]
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class UntrackedTag(object):
+    """ A tag found in the XML file but not handled by the `__xml_mapping__` of a class. """
+
+    owner: str
+    """ Name of the class whose element contains the tag. """
+
+    tag: str
+    """ The tag. """
+
+    count: int = 0
+    """ Number of occurrences. """
+
+    first_path: str = ""
+    """ Path of the first occurrence (e.g. `/EasyfattDocuments/Documents/Document[3]/UnknownTag`). """
+
+
+@dataclass
+class ParseDiagnostics(object):
+    """ Collects the untracked tags found while parsing, aggregated by class and tag.
+
+    !!! Example
+        ```python
+        diagnostics = ParseDiagnostics()
+        read_xml("fatture.DefXml", diagnostics=diagnostics)
+
+        for untracked in diagnostics.untracked.values():
+            print(f"{untracked.owner}: <{untracked.tag}> x{untracked.count} (first at {untracked.first_path})")
+        ```
+    """
+
+    untracked: "dict[tuple[str, str], UntrackedTag]" = field(default_factory=dict)
+    """ The untracked tags, by name of the class and tag. """
+
+    source: str = ""
+    """ Name of the file the diagnostics refer to (if known), included in the log messages. """
+
+    def __bool__(self) -> bool:
+        return bool(self.untracked)
+
+    def add_untracked(self, owner: type, element: ET._Element, tags: Iterable[str]):
+        """ Records the untracked children of an element.
+
+        Args:
+            owner (type): The mapper class the element is parsed into.
+            element (ET._Element): The element.
+            tags (Iterable[str]): Tags of the untracked children.
+        """
+        for tag in tags:
+            key = (owner.__name__, tag)
+
+            untracked = self.untracked.get(key)
+            if untracked is None:
+                untracked = self.untracked[key] = UntrackedTag(
+                    owner.__name__, tag, first_path=f"{element.getroottree().getpath(element)}/{tag}"
+                )
+
+            untracked.count += 1
+
+    def merge(self, other: "ParseDiagnostics"):
+        """ Adds the occurrences collected by another object (e.g. by a worker process). """
+        for key, untracked in other.untracked.items():
+            current = self.untracked.get(key)
+            if current is None:
+                self.untracked[key] = UntrackedTag(untracked.owner, untracked.tag, untracked.count, untracked.first_path)
+            else:
+                current.count += untracked.count
+
+    def log(self, level: int = logging.WARNING, log: Optional[logging.Logger] = None):
+        """ Logs a single message for each untracked tag.
+
+        Args:
+            level (int, optional): The logging level. Defaults to logging.WARNING.
+            log (logging.Logger, optional): The logger. Defaults to the logger of this module.
+        """
+        for untracked in self.untracked.values():
+            (log or logger).log(
+                level,
+                "Tag <%s> is not tracked in the `%s.__xml_mapping__` class attribute (found %d times, first at %s%s)",
+                untracked.tag,
+                untracked.owner,
+                untracked.count,
+                f"{self.source}:" if self.source else "",
+                untracked.first_path,
+            )
@@ -1,12 +1,59 @@
-# import os as _os
-# import xml.dom.minidom as minidom
-from typing import get_type_hints
+import io
+import sys
+from typing import Any, Iterable, Optional
 
 import lxml.etree as ET
 
 from easyfatt_db_connector.core.exceptions import TypeConversionError
 
-from .fields import BaseField, Field, FieldGroup
+from .converters import converters
+from .diagnostics import ParseDiagnostics
+from .plan import ATTRIBUTE, CHILD, CHILDREN, GROUP, NO_DEFAULT, TEXT, ParsePlan, compile_plan
+from .writer import write_object
+
+INTERN_MAX_LENGTH = 64
+""" Maximum length of the string values interned by the compact classes (see `ParsePlan.intern_text`). """
+
+
+def _intern(value: Any) -> Any:
+    if type(value) is str and len(value) <= INTERN_MAX_LENGTH:
+        return sys.intern(value)
+
+    return value
+
+
+def _index_children(element: ET._Element, plan: ParsePlan, untracked: Optional[list] = None) -> "dict[str, Any]":
+    """ Indexes the children of an element by tag, in a single pass.
+
+    Like `element.find(tag)`, only the first child with each tag is kept, except for the containers
+    of the lists (see `ParsePlan.container_tags`), which are all collected in a list.
+
+    Args:
+        element (ET._Element): The element.
+        plan (ParsePlan): The parse plan of the class.
+        untracked (list, optional): If given, the tags of the children not handled by the plan are appended to it.
+
+    Returns:
+        dict[str, Any]: The tracked children, by tag.
+    """
+    tracked_tags = plan.tracked_tags
+    container_tags = plan.container_tags
+    children = {}
+
+    for child in element:
+        tag = child.tag
+
+        if tag in tracked_tags:
+            if tag in container_tags:
+                children.setdefault(tag, []).append(child)
+            elif tag not in children:
+                children[tag] = child
+
+        # Comments and processing instructions do not have a string tag
+        elif untracked is not None and isinstance(tag, str):
+            untracked.append(tag)
+
+    return children
 
 
 class XMLMapper(object):
@@ -16,6 +63,9 @@ class XMLMapper(object):
     - Use the `__xml_name__` class attribute to override the name of the XML element the class refers to.
     """
 
+    # No `__dict__` entries, so that the compact versions of the subclasses do not have a `__dict__` (see `compact_class`)
+    __slots__ = ("__xml_defaulted__",)
+
     __xml_name__: str = ""
     """ Customize the name of the XML tag. 
     
@@ -24,10 +74,26 @@ class XMLMapper(object):
 
     __xml_mapping__: dict[str, str] = None
 
+    __xml_check_untracked__: bool = True
+    """ Whether to report the children not handled by the `__xml_mapping__` (see `ParseDiagnostics`).
+
+    Set it to `False` (on a class or on `XMLMapper` itself) to skip the check entirely.
+    """
+
+    __xml_defaulted__: "frozenset[str]"
+    """ Names of the attributes set to their native default because the element was missing (see `writer.write_object`). """
+
+    __xml_native_types__: dict[str, Any] = None
+    """ Types used instead of the type hints when parsing with `convert_types="native"`.
+
+    For example `{"date": date, "total": Decimal}` converts the dates to `datetime.date` and the
+    amounts to `decimal.Decimal`, while the default conversion keeps them as `str` and `float`.
+    """
+
     def __str__(self) -> str:
         attributes = [
             (f"{attr}='{value}'" if type(value) == str else f"{attr}={value}")
-            for attr, value in self.__dict__.items()
+            for attr, value in self._get_attributes()
         ]
         return f"{self.__class__.__name__}({', '.join(attributes)})"
 
@@ -37,21 +103,37 @@ class XMLMapper(object):
     def __hash__(self) -> int:
         """ Returns a hash of the object. """
         return hash((type(self),) + tuple(
-            [tuple(value) if type(value) == list else value for value in self.__dict__.values()]
+            [tuple(value) if type(value) == list else value for _, value in self._get_attributes()]
         ))
 
+    def _get_attributes(self) -> Iterable[tuple[str, Any]]:
+        """ Returns the name and value of the attributes set on the object (the class defaults are excluded). """
+        return self.__dict__.items()
+
+    @classmethod
+    def compact_class(cls) -> type:
+        """ Returns the compact version of the class, whose objects store their attributes in `__slots__`.
+
+        See `easyfatt_db_connector.xml.common.compact` for details.
+        """
+        from .compact import compact_class
+
+        return compact_class(cls)
+
     @classmethod
     def _get_xml_tag(cls) -> str:
         return cls.__xml_name__ if getattr(cls, "__xml_name__", None) else cls.__name__
 
     @classmethod
-    def from_xml_string(cls, string: str, convert_types=True, *, _warn_untracked=True):
+    def from_xml_string(cls, string: str, convert_types=True, *, _warn_untracked=True, _diagnostics=None, _lazy_pdf=False):
         """ Creates an instance of the class from an XML text.
 
         Args:
             string (str): The XML text to parse.
-            convert_types (bool, optional): Whether to convert the types of the fields. Defaults to True.
+            convert_types (bool | str, optional): Whether to convert the types of the fields (`"native"` also converts dates and amounts, see `__xml_native_types__`). Defaults to True.
             _warn_untracked (bool, optional): Whether to warn if there are untracked children (for internal use only). Defaults to True.
+            _diagnostics (ParseDiagnostics, optional): Collects the untracked children instead of logging them (for internal use only). Defaults to None.
+            _lazy_pdf (bool, optional): Whether the content of the PDFs is read from the file only when requested (see `DocumentPDFFile`, for internal use only). Defaults to False.
         
         Raises:
             NotImplementedError: If the class does not have an `__xml_mapping__` attribute or if is not a dictionary.
@@ -65,16 +147,34 @@ class XMLMapper(object):
             ET.fromstring(string),
             convert_types=convert_types,
             _warn_untracked=_warn_untracked,
+            _diagnostics=_diagnostics,
+            _lazy_pdf=_lazy_pdf,
         )
 
     @classmethod
-    def from_xml(cls, element: ET._Element, convert_types=True, *, _warn_untracked=True):
+    def _get_parse_plan(cls, native: bool = False) -> ParsePlan:
+        """ Returns the compiled parse plan of the class, building it on first use. """
+        attribute = "__xml_native_plan__" if native else "__xml_plan__"
+
+        # Look only at the class own namespace, otherwise subclasses would reuse the plan of their parent.
+        # The plan is rebuilt if converters have been registered in the meantime
+        plan = cls.__dict__.get(attribute)
+        if plan is None or plan.version != converters.version:
+            plan = compile_plan(cls, native=native)
+            setattr(cls, attribute, plan)
+
+        return plan
+
+    @classmethod
+    def from_xml(cls, element: ET._Element, convert_types=True, *, _warn_untracked=True, _diagnostics=None, _lazy_pdf=False):
         """ Creates an instance of the class from an XML text.
         
         Args:
             element (ET._Element): The XML element to parse.
-            convert_types (bool, optional): Whether to convert the types of the fields. Defaults to True.
+            convert_types (bool | str, optional): Whether to convert the types of the fields (`"native"` also converts dates and amounts, see `__xml_native_types__`). Defaults to True.
             _warn_untracked (bool, optional): Whether to warn if there are untracked children (for internal use only). Defaults to True.
+            _diagnostics (ParseDiagnostics, optional): Collects the untracked children instead of logging them (for internal use only). Defaults to None.
+            _lazy_pdf (bool, optional): Whether the content of the PDFs is read from the file only when requested (see `DocumentPDFFile`, for internal use only). Defaults to False.
             
         Raises:
             NotImplementedError: If the class does not have an `__xml_mapping__` attribute or if is not a dictionary.
@@ -84,222 +184,157 @@ class XMLMapper(object):
         Returns:
             XMLMapper: An instance of the class.
         """
-        if getattr(cls, "__xml_mapping__", None) is None and type(cls.__xml_mapping__) != dict:
-            raise NotImplementedError(
-                "This class does not have an __xml_mapping__ attribute defined."
-            )
-        
-        # Check if there are tags that are not tracked in the `__xml_mapping__` attribute
-        # I did not use a list comprehension since it would have been too long and unreadable
-        child_tags = []
-        for child in cls.__xml_mapping__.values():
-            if type(child) == str:
-                child_tags.append(child)
-            elif isinstance(child, FieldGroup):
-                child_tags.extend(list(child.target.__xml_mapping__.values()))
-            elif isinstance(child, Field):
-                if getattr(child, "is_parent"):
-                    child_tags.append(child.tag)
-                elif getattr(child, "tag", None):
-                    child_tags.append(child.tag)
-                else:
-                    child_tags.append(child.target._get_xml_tag())
-
-        untracked_children = [
-            child.tag for child in element.iterchildren() if child.tag not in child_tags
-        ]
+        plan = cls._get_parse_plan(native=convert_types == "native")
+        check_untracked = _warn_untracked and cls.__xml_check_untracked__
 
-        if untracked_children and _warn_untracked:
-            print(
-                f"\nWARNING: A total of {len(untracked_children)} children are not tracked ({', '.join(untracked_children)}) in the `{cls.__name__}.__xml_mapping__` class attribute.\n"
-            )
+        # The untracked children of the nested elements are collected and reported only once, at the end
+        diagnostics = _diagnostics
+        if diagnostics is None and _warn_untracked:
+            diagnostics = ParseDiagnostics()
+
+        untracked_children = [] if check_untracked else None
+        children = _index_children(element, plan, untracked_children)
+        if untracked_children:
+            diagnostics.add_untracked(cls, element, untracked_children)
+
+        xml_object = cls._map_element(element, children, plan, convert_types, _warn_untracked, diagnostics, _lazy_pdf)
+
+        if _diagnostics is None and diagnostics:
+            diagnostics.log()
+
+        return xml_object
+
+    @classmethod
+    def _map_element(
+        cls,
+        element: ET._Element,
+        children: "dict[str, Any]",
+        plan: ParsePlan,
+        convert_types,
+        warn_untracked: bool,
+        diagnostics: Optional[ParseDiagnostics] = None,
+        lazy_pdf: bool = False,
+    ):
+        """ Creates an instance of the class from an element whose children have already been indexed (see `_index_children`).
+
+        The `FieldGroup`s are mapped from the same index, so the children are scanned only once.
+        """
+        intern_text = plan.intern_text
+        defaulted = []
 
         xml_object = cls()
-        for attr, target in cls.__xml_mapping__.items():
-            # Fail if the attribute is of the wrong type
-            if type(target) != str and not isinstance(target, BaseField):
-                raise TypeError(f"target must be a string or Field, not {type(target)}")
+        for field in plan.fields:
+            kind = field.kind
 
-            if isinstance(target, FieldGroup):
+            if kind == GROUP:
+                target = field.target
                 setattr(
                     xml_object,
-                    attr,
-                    target.target.from_xml(element, convert_types=convert_types, _warn_untracked=False),
+                    field.attr,
+                    target._map_element(element, children, target._get_parse_plan(native=convert_types == "native"), convert_types, False, None, lazy_pdf),
                 )
+                continue
 
-            elif isinstance(target, Field):
-                child_class_name = ""
-                if getattr(target, "tag", None):
-                    child_class_name = target.tag
-                elif getattr(target, "target", None):
-                    child_class_name = target.target._get_xml_tag()
-
-                if getattr(target, "is_parent"):
-                    children = element.xpath(
-                        f"{child_class_name}/{target.child.target._get_xml_tag()}"
+            elif kind == CHILDREN:
+                setattr(
+                    xml_object,
+                    field.attr,
+                    [
+                        field.target.from_xml(
+                            child_xml, convert_types=convert_types, _warn_untracked=warn_untracked, _diagnostics=diagnostics, _lazy_pdf=lazy_pdf
+                        )
+                        for container in children.get(field.tag, ())
+                        for child_xml in container.iterchildren(field.child_tag)
+                    ],
+                )
+                continue
+
+            elif kind == CHILD:
+                child_element = children.get(field.tag)
+
+                if child_element is not None:
+                    setattr(
+                        xml_object,
+                        field.attr,
+                        field.target.from_xml(
+                            child_element, convert_types=convert_types, _warn_untracked=warn_untracked, _diagnostics=diagnostics, _lazy_pdf=lazy_pdf
+                        ),
                     )
+                continue
 
-                    children_obj = [
-                        target.child.target.from_xml(child_xml, convert_types=convert_types, _warn_untracked=_warn_untracked)
-                        for child_xml in children
-                    ]
+            # ---> XML Attribute
+            elif kind == ATTRIBUTE:
+                element_text = element.get(field.tag)
 
-                    setattr(xml_object, attr, children_obj)
-                else:
-                    child_element = element.find(child_class_name)
+            elif kind == TEXT:
+                element_text = element.text
 
-                    if child_element is not None:
-                        setattr(
-                            xml_object,
-                            attr,
-                            target.target.from_xml(child_element, convert_types=convert_types, _warn_untracked=_warn_untracked),
-                        )
+            # ---> XML Child Element
+            else:
+                child_element = children.get(field.tag)
+
+                if child_element is None:
+                    if field.default is not NO_DEFAULT:
+                        setattr(xml_object, field.attr, field.default)
+                        defaulted.append(field.attr)
+                    continue
+
+                element_text = child_element.text
+
+            if not convert_types or field.converter is None:
+                setattr(xml_object, field.attr, _intern(element_text) if intern_text else element_text)
+                continue
+
+            # =======> Type conversion <=======
+            try:
+                converted_value = field.converter(element_text)
+            except ValueError:
+                raise TypeConversionError(
+                    f"Error while converting `{cls.__name__}.{field.attr}`: `{element_text}` cannot be converted to `{field.type_name}`."
+                )
             else:
-                element_text = ""
+                setattr(xml_object, field.attr, _intern(converted_value) if intern_text else converted_value)
 
-                # ---> XML Attribute
-                if target.strip().startswith("@"):
-                    element_text = element.get(target[1:])
+        if defaulted:
+            xml_object.__xml_defaulted__ = frozenset(defaulted)
 
-                elif target.strip().upper() == "#TEXT":
-                    element_text = element.text
+        return xml_object
 
-                # ---> XML Child Element
-                else:
-                    child_element = element.find(target)
+    def _write_xml(self, xml_file, tag: Optional[str] = None):
+        """ Writes the object into an `lxml.etree.xmlfile` context (see `writer.write_object`).
 
-                    if child_element is None:
-                        continue
+        Subclasses can override it to customize the output (e.g. to stream big contents).
+        """
+        write_object(xml_file, self, tag)
 
-                    element_text = child_element.text
+    def to_xml(self) -> ET._Element:
+        """ Converts the object to an XML element (the opposite of `from_xml`).
 
-                if not convert_types:
-                    setattr(xml_object, attr, element_text)
-                    continue
+        Only the attributes set on the object are written, in the same order of the `__xml_mapping__`.
 
-                # =======> Type conversion <=======
-                expected_type = get_type_hints(cls)[attr]
-
-                try:
-                    converted_value = None
-                    if expected_type == bool or "[bool]" in str(expected_type):
-                        if element_text is None:
-                            element_text = ""
-                        converted_value = element_text.lower() == "true"
-
-                    elif expected_type == int or "[int]" in str(expected_type):
-                        if element_text is None:
-                            element_text = 0
-                        converted_value = int(element_text)
-
-                    elif expected_type == float or "[float]" in str(expected_type):
-                        if element_text is None:
-                            element_text = 0
-                        converted_value = float(element_text)
-
-                    elif expected_type == str or "[str]" in str(expected_type):
-                        if element_text is None:
-                            element_text = ""
-                        converted_value = str(element_text)
-
-                    else:
-                        converted_value = element_text
-
-                except ValueError:
-                    raise TypeConversionError(
-                        f"Error while converting `{cls.__name__}.{attr}`: `{element_text}` cannot be converted to `{expected_type.__name__}`."
-                    )
-                else:
-                    setattr(xml_object, attr, converted_value)
+        Returns:
+            ET._Element: The XML element.
+        """
+        return ET.fromstring(self.to_xml_string(xml_declaration=False).encode("utf-8"), parser=ET.XMLParser(huge_tree=True))
 
-        return xml_object
+    def to_xml_string(self, prettify: bool = False, xml_declaration: bool = True) -> str:
+        """ Converts the object to an XML string.
+
+        Args:
+            prettify (bool, optional): Pretty print the XML. Defaults to False.
+            xml_declaration (bool, optional): Whether to include the XML declaration. Defaults to True.
+
+        Returns:
+            str: String representation of the XML object.
+        """
+        buffer = io.BytesIO()
+        with ET.xmlfile(buffer, encoding="utf-8") as xml_file:
+            if xml_declaration:
+                xml_file.write_declaration()
+            self._write_xml(xml_file)
+
+        if not prettify:
+            return buffer.getvalue().decode("utf-8")
 
-    # def to_xml(self) -> ET.Element:
-    #     if getattr(self, "__xml_mapping__", None) is None or self.__xml_mapping__ == {}:
-    #         raise NotImplementedError(
-    #             "This class does not have an __xml_mapping__ attribute defined."
-    #         )
-
-    #     custom_element_name = getattr(self, "__xml_name__", "")
-    #     root = ET.Element(
-    #         custom_element_name if custom_element_name else self.__class__.__name__
-    #     )
-
-    #     for attr, xml_tag in self.__xml_mapping__.items():
-    #         if isinstance(xml_tag, Field):
-    #             tag_name = ""
-    #             if getattr(xml_tag, "tag", None):
-    #                 tag_name = xml_tag.tag
-    #             elif getattr(xml_tag, "target", None):
-    #                 if getattr(xml_tag.target, "__xml_name__", None):
-    #                     tag_name = xml_tag.target.__xml_name__
-    #                 else:
-    #                     tag_name = xml_tag.target.__name__
-    #             print(tag_name)
-
-    #         if not hasattr(self, attr):
-    #             raise AttributeError(
-    #                 f"Attribute {attr} not found in class {self.__class__.__name__}"
-    #             )
-
-    #         attribute_value = getattr(self, attr)
-
-    #         if attribute_value is None:
-    #             continue
-
-    #         # ---> XML Attribute
-    #         if xml_tag.startswith("@"):
-    #             root.set(xml_tag[1:], python2xml(attribute_value))
-
-    #         # ---> XML Child Element
-    #         else:
-    #             child_element = ET.Element(xml_tag)
-    #             if isinstance(attribute_value, list):
-    #                 for item in attribute_value:
-    #                     if isinstance(item, XMLMapper):
-    #                         child_element.append(item.to_xml())
-    #                     else:
-    #                         raise TypeError(
-    #                             f"Item {item} is not an instance of XMLConverter"
-    #                         )
-
-    #                 child_element[:] = sorted(
-    #                     child_element, key=lambda child: child.tag
-    #                 )
-    #             else:
-    #                 child_element.text = python2xml(attribute_value)
-
-    #             root.append(child_element)
-
-    #     root[:] = sorted(root, key=lambda child: child.tag)
-
-    #     return root
-
-    # def to_xml_string(
-    #     self, short_empty_elements=False, prettify=False, indent="    "
-    # ) -> str:
-    #     """Converts the object to an XML string.
-
-    #     Args:
-    #         short_empty_elements (bool, optional): Shorten empty elements. Defaults to False.
-    #         prettify (bool, optional): Pretty print the XML. Defaults to False.
-    #         indent (str, optional): Character used while pretty printing the XML. Defaults to "    ".
-
-    #     Returns:
-    #         str: string representation of the XML object.
-    #     """
-    #     xml_string = ET.tostring(
-    #         self.to_xml(),
-    #         method="xml",
-    #         encoding="UTF-8",
-    #         short_empty_elements=short_empty_elements,
-    #         xml_declaration=True,
-    #     ).decode("utf-8")
-
-    #     if not prettify:
-    #         return xml_string
-
-    #     pretty_xml = minidom.parseString(xml_string).toprettyxml(indent=indent)
-    #     pretty_xml = _os.linesep.join([s for s in pretty_xml.splitlines() if s.strip()])
-
-    #     return pretty_xml
+        element = ET.fromstring(buffer.getvalue(), parser=ET.XMLParser(remove_blank_text=True, huge_tree=True))
+        return ET.tostring(element, encoding="UTF-8", xml_declaration=xml_declaration, pretty_print=True).decode("utf-8")
@@ -0,0 +1,234 @@
+""" Compiled parse plans for `XMLMapper` subclasses.
+
+A parse plan is built once per mapper class (the first time the class is parsed) and
+contains everything `XMLMapper.from_xml` needs to know about the `__xml_mapping__`
+attribute: resolved tag names, target classes and type converters.
+
+This way the (expensive) inspection of the mapping and of the type hints happens only once
+per class instead of once per parsed element.
+"""
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Optional, get_args, get_type_hints
+
+from .converters import converters, type_name
+from .fields import BaseField, Field, FieldGroup
+
+
+ATTRIBUTE = "attribute"
+""" The value is read from an attribute of the element (`@Name`). """
+
+TEXT = "text"
+""" The value is read from the text of the element itself (`#TEXT`). """
+
+CHILD_TEXT = "child_text"
+""" The value is read from the text of a child element. """
+
+GROUP = "group"
+""" The value is a `FieldGroup`, parsed from the same element. """
+
+CHILD = "child"
+""" The value is a nested mapper, parsed from a child element. """
+
+CHILDREN = "children"
+""" The value is a list of nested mappers, parsed from the children of a container element. """
+
+NO_DEFAULT = object()
+""" Marks the fields whose attribute is left untouched when the element is missing. """
+
+
+@dataclass
+class FieldPlan(object):
+    """ Compiled instructions to parse a single attribute of a mapper class. """
+
+    attr: str
+    """ Name of the Python attribute. """
+
+    kind: str
+    """ How the value is read from the XML element (one of the module constants). """
+
+    tag: Optional[str] = None
+    """ Tag (or attribute name) the value is read from. """
+
+    target: Optional[type] = None
+    """ Mapper class used to parse nested elements. """
+
+    child_tag: Optional[str] = None
+    """ Tag of the items inside a container element (only for `CHILDREN`). """
+
+    converter: Optional[Callable[[Optional[str]], Any]] = None
+    """ Function converting the XML text to the expected Python type. """
+
+    type_name: str = ""
+    """ Name of the expected type (used in error messages). """
+
+    default: Any = NO_DEFAULT
+    """ Value assigned when the element is missing (`NO_DEFAULT` leaves the class default). """
+
+
+@dataclass
+class ParsePlan(object):
+    """ Compiled instructions to parse an XML element into a mapper class. """
+
+    fields: list[FieldPlan] = field(default_factory=list)
+    """ Instructions for each attribute, in the same order of the `__xml_mapping__`. """
+
+    tracked_tags: frozenset[str] = frozenset()
+    """ Tags of the child elements handled by the mapper (including the ones of its `FieldGroup`s). """
+
+    container_tags: frozenset[str] = frozenset()
+    """ Tags of the containers of the lists (e.g. `Rows`), whose elements are all collected instead of the first one. """
+
+    version: int = 0
+    """ Version of the converter registry the plan has been compiled with. """
+
+    intern_text: bool = False
+    """ Whether the short string values are interned, so that the values repeated in many elements are stored only once. """
+
+    defaults: "dict[str, Any]" = field(default_factory=dict)
+    """ Values assigned to the attributes whose element is missing (only for the native plans, see `FieldPlan.default`). """
+
+
+def _get_mapper(expected_type: Any) -> Optional[type]:
+    """ Returns the mapper class a type hint refers to (e.g. `Optional[VatCode]`), if any. """
+    from .mapper import XMLMapper
+
+    candidates = [expected_type, *get_args(expected_type)]
+    for candidate in candidates:
+        if isinstance(candidate, type) and issubclass(candidate, XMLMapper):
+            return candidate
+
+    return None
+
+
+def _get_tag(target: Field, mapper: Optional[type] = None) -> str:
+    """ Returns the tag of the element a `Field` refers to. """
+    if getattr(target, "tag", None):
+        return target.tag
+    elif getattr(target, "target", None):
+        return target.target._get_xml_tag()
+    elif mapper is not None:
+        return mapper._get_xml_tag()
+
+    return ""
+
+
+def compile_plan(cls: type, native: bool = False) -> ParsePlan:
+    """ Builds the parse plan of a mapper class.
+
+    Args:
+        cls (type): The `XMLMapper` subclass.
+        native (bool, optional): Whether to use the types declared in `__xml_native_types__` instead of the type hints. Defaults to False.
+
+    Raises:
+        NotImplementedError: If the class does not have an `__xml_mapping__` attribute or if is not a dictionary.
+        TypeError: If the value of the `__xml_mapping__` attribute is not valid.
+
+    Returns:
+        ParsePlan: The compiled plan.
+    """
+    if getattr(cls, "__xml_mapping__", None) is None and type(cls.__xml_mapping__) != dict:
+        raise NotImplementedError(
+            "This class does not have an __xml_mapping__ attribute defined."
+        )
+
+    original = cls.__dict__.get("__xml_original__")
+    if original is not None:
+        # Compact classes (see `compact_class`) parse like the original one, into compact nested objects
+        from .compact import compact_class
+
+        plan = compile_plan(original, native=native)
+        plan.fields = [
+            replace(field_plan, target=compact_class(field_plan.target)) if field_plan.target is not None else field_plan
+            for field_plan in plan.fields
+        ]
+        plan.intern_text = True
+        return plan
+
+    type_hints = get_type_hints(cls)
+    native_types = (getattr(cls, "__xml_native_types__", None) or {}) if native else {}
+    fields = []
+    tracked_tags = set()
+    container_tags = set()
+
+    for attr, target in cls.__xml_mapping__.items():
+        # Fail if the attribute is of the wrong type
+        if type(target) != str and not isinstance(target, BaseField):
+            raise TypeError(f"target must be a string or Field, not {type(target)}")
+
+        expected_type = type_hints.get(attr)
+
+        if isinstance(target, FieldGroup):
+            tracked_tags.update(target.target.__xml_mapping__.values())
+            fields.append(FieldPlan(attr, GROUP, target=target.target))
+
+        elif isinstance(target, Field):
+            if getattr(target, "is_parent"):
+                tag = _get_tag(target)
+                container_tags.add(tag)
+                fields.append(
+                    FieldPlan(
+                        attr,
+                        CHILDREN,
+                        tag=tag,
+                        target=target.child.target,
+                        child_tag=target.child.target._get_xml_tag(),
+                    )
+                )
+            else:
+                # The target class may be omitted, in which case it is taken from the type hint
+                mapper = target.target or _get_mapper(expected_type)
+                if mapper is None:
+                    raise TypeError(f"Cannot determine the mapper class of `{cls.__name__}.{attr}`")
+
+                tag = _get_tag(target, mapper)
+                fields.append(FieldPlan(attr, CHILD, tag=tag, target=mapper))
+
+            tracked_tags.add(tag)
+
+        else:
+            if expected_type is None:
+                raise TypeError(f"The attribute `{cls.__name__}.{attr}` does not have a type hint")
+
+            default = NO_DEFAULT
+            if attr in native_types:
+                expected_type = native_types[attr]
+
+                # The class defaults are (usually) strings or floats, so they are converted as well
+                class_default = getattr(cls, attr, None)
+                if class_default is not None:
+                    default = converters.resolve(expected_type)(str(class_default))
+
+            mapper = _get_mapper(expected_type)
+            converter = converters.resolve(expected_type)
+
+            if target.strip().startswith("@"):
+                fields.append(FieldPlan(attr, ATTRIBUTE, target[1:], converter=converter, type_name=type_name(expected_type)))
+
+            elif target.strip().upper() == "#TEXT":
+                fields.append(FieldPlan(attr, TEXT, converter=converter, type_name=type_name(expected_type)))
+
+            elif mapper is not None:
+                # Nested mapper referenced by a plain tag name (e.g. `"vat_info": "VatCode"`)
+                tracked_tags.add(target)
+                fields.append(FieldPlan(attr, CHILD, tag=target, target=mapper))
+
+            else:
+                tracked_tags.add(target)
+                fields.append(
+                    FieldPlan(
+                        attr,
+                        CHILD_TEXT,
+                        target,
+                        converter=converter,
+                        type_name=type_name(expected_type),
+                        default=default,
+                    )
+                )
+
+    return ParsePlan(
+        fields=fields,
+        defaults={field.attr: field.default for field in fields if field.default is not NO_DEFAULT},
+        tracked_tags=frozenset(tracked_tags),
+        container_tags=frozenset(container_tags),
+        version=converters.version,
+    )
@@ -0,0 +1,253 @@
+""" Access to the XML files the mappers are parsed from.
+
+Besides opening the files for the parser, this module allows to record a reference to an
+element during parsing and to read its text again later, straight from the file, so that big
+values (e.g. the base64 content of the embedded PDFs) do not need to be kept in memory.
+"""
+from collections import OrderedDict
+import codecs
+from contextlib import contextmanager
+from dataclasses import dataclass
+import hashlib
+import os
+from pathlib import Path
+import re
+import threading
+from typing import IO, Iterator, Optional, Union
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+
+import lxml.etree as ET
+
+from easyfatt_db_connector.core.exceptions import SourceChangedError
+
+XMLSource = Union[str, Path, IO[bytes]]
+
+_PREAMBLE_SIZE = 4096
+""" Maximum number of bytes inspected to skip the BOM and the whitespace before the XML declaration. """
+
+CHUNK_SIZE = 1024 * 1024
+""" Size of the chunks read from the file while indexing (and reading) the text of the elements. """
+
+
+@contextmanager
+def open_source(source: XMLSource) -> Iterator[IO[bytes]]:
+    """ Opens an XML source in binary mode, ready to be handed to the `lxml` parser.
+
+    The UTF-8 BOM and any whitespace before the XML declaration are skipped (`libxml2` would
+    refuse the file otherwise), while the declared encoding is left to the parser, so the
+    content is never decoded to a Python string.
+
+    Args:
+        source (str | Path | IO[bytes]): Path of the XML file (or a file opened in binary mode).
+
+    Yields:
+        IO[bytes]: The file object, positioned at the beginning of the XML content.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as file:
+            _skip_preamble(file)
+            yield file
+    else:
+        if source.seekable():
+            _skip_preamble(source)
+        yield source
+
+
+def _skip_preamble(file: IO[bytes]):
+    """ Moves the file position after the UTF-8 BOM and the leading whitespace (if any). """
+    start = file.tell()
+    head = file.read(_PREAMBLE_SIZE)
+
+    content = head[len(codecs.BOM_UTF8):] if head.startswith(codecs.BOM_UTF8) else head
+    content = content.lstrip(b" \t\r\n")
+
+    file.seek(start + len(head) - len(content))
+
+
+@dataclass(frozen=True)
+class TextLocation(object):
+    """ Reference to the text of an element inside an XML file, used to read it again on demand. """
+
+    path: Path
+    """ Path of the XML file. """
+
+    tag: str
+    """ Tag of the element. """
+
+    digest: bytes
+    """ Hash of the text (whitespace excluded), used to find the element inside the file. """
+
+    fingerprint: "tuple[int, int]"
+    """ Size and modification time of the file when the element was parsed. """
+
+
+_WHITESPACE = b" \t\r\n"
+
+_INDEX_CACHE_SIZE = 8
+""" Maximum number of files whose index is kept in memory (see `_get_index`). """
+
+_indexes: "OrderedDict[tuple, dict[bytes, int]]" = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def _hash_text(data: bytes) -> bytes:
+    return hashlib.blake2b(data.translate(None, _WHITESPACE), digest_size=16).digest()
+
+
+def locate(element: ET._Element) -> Optional[TextLocation]:
+    """ Returns a reference to the text of an element, if it has been parsed from a file on disk.
+
+    Line numbers reported by `libxml2` are not reliable after very long text nodes, so the
+    element is identified by the hash of its text instead: the file is scanned (only once, see
+    `_get_index`) the first time the text is read with `iter_text`.
+
+    Args:
+        element (ET._Element): The element.
+
+    Returns:
+        TextLocation | None: The reference, or `None` if the element has not been parsed from a file (e.g. from a string).
+    """
+    url = element.getroottree().docinfo.URL
+    if not url:
+        return None
+
+    if url.startswith("file:"):
+        url = url2pathname(urlparse(url).path)
+
+    try:
+        path = Path(url).resolve()
+        stat = path.stat()
+    except (OSError, ValueError):
+        return None
+
+    return TextLocation(
+        path=path,
+        tag=element.tag,
+        digest=_hash_text((element.text or "").encode("utf-8")),
+        fingerprint=(stat.st_size, stat.st_mtime_ns),
+    )
+
+
+def _build_index(path: Path, tag: str) -> "dict[bytes, int]":
+    """ Scans a file and returns the offset of the text of all the elements with the given tag, by hash of the text. """
+    start_pattern = re.compile(rb"<" + re.escape(tag.encode("utf-8")) + rb"(?=[\s/>])")
+    index = {}
+
+    with open(path, "rb") as file:
+        buffer = file.read(CHUNK_SIZE)
+        offset = 0  # File position of `buffer[0]`
+        position = 0
+
+        while True:
+            match = start_pattern.search(buffer, position)
+            end = buffer.find(b">", match.end()) if match is not None else -1
+
+            if end == -1:
+                chunk = file.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+
+                # Keep the bytes that could belong to a start tag that is not complete yet
+                keep = match.start() if match is not None else max(position, len(buffer) - len(tag) - 1)
+                offset += keep
+                buffer = buffer[keep:] + chunk
+                position = 0
+                continue
+
+            if buffer[end - 1:end] == b"/":
+                index.setdefault(_hash_text(b""), offset + end + 1)
+                position = end + 1
+                continue
+
+            # Hash the text, reading more chunks until the next tag
+            content_offset = offset + end + 1
+            hasher = hashlib.blake2b(digest_size=16)
+            position = end + 1
+
+            while True:
+                text_end = buffer.find(b"<", position)
+                if text_end != -1:
+                    hasher.update(buffer[position:text_end].translate(None, _WHITESPACE))
+                    position = text_end
+                    break
+
+                hasher.update(buffer[position:].translate(None, _WHITESPACE))
+                offset += len(buffer)
+                buffer = file.read(CHUNK_SIZE)
+                position = 0
+                if not buffer:
+                    break
+
+            index.setdefault(hasher.digest(), content_offset)
+            if not buffer:
+                break
+
+    return index
+
+
+def _get_index(location: TextLocation) -> "dict[bytes, int]":
+    """ Returns the (cached) index of the elements of a file, see `_build_index`. """
+    key = (location.path, location.fingerprint, location.tag)
+
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is not None:
+            _indexes.move_to_end(key)
+            return index
+
+    index = _build_index(location.path, location.tag)
+
+    with _indexes_lock:
+        _indexes[key] = index
+        while len(_indexes) > _INDEX_CACHE_SIZE:
+            _indexes.popitem(last=False)
+
+    return index
+
+
+def iter_text(location: TextLocation, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """ Reads the text of an element directly from the XML file, in chunks.
+
+    Only elements containing plain character data (no child elements, entities or CDATA
+    sections) are supported, which is always the case for base64 encoded content.
+
+    Args:
+        location (TextLocation): The reference to the element (see `locate`).
+        chunk_size (int, optional): Maximum size of each chunk. Defaults to CHUNK_SIZE.
+
+    Raises:
+        SourceChangedError: If the file has been modified since it was parsed.
+        ValueError: If the text of the element contains markup or entities.
+
+    Yields:
+        bytes: The raw (encoded) text of the element.
+    """
+    try:
+        stat = location.path.stat()
+    except OSError as e:
+        raise SourceChangedError(f"The file '{location.path}' is no longer available: {e}") from e
+
+    if (stat.st_size, stat.st_mtime_ns) != location.fingerprint:
+        raise SourceChangedError(f"The file '{location.path}' has been modified after it was parsed")
+
+    offset = _get_index(location).get(location.digest)
+    if offset is None:
+        raise ValueError(f"The text of <{location.tag}> cannot be read from '{location.path}' (it contains markup or entities)")
+
+    with open(location.path, "rb") as file:
+        file.seek(offset)
+
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                return
+
+            end = chunk.find(b"<")
+            if end == -1:
+                yield chunk
+                continue
+
+            if end > 0:
+                yield chunk[:end]
+            return
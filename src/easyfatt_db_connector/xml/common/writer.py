@@ -0,0 +1,113 @@
+""" Serialization of the mapper objects to XML, driven by the same parse plans used to read them.
+
+The objects are written incrementally into an `lxml.etree.xmlfile` context, so the lists of
+nested objects (e.g. the documents of an `EasyfattXML`) can also be generators: only the object
+being written needs to be in memory.
+
+Only the attributes set on the objects are written (the class defaults are not), which mirrors
+`XMLMapper.from_xml`: an element missing from the file leaves the attribute unset, so reading the
+written file gives back the same objects. This also follows the conventions of Easyfatt, which
+uses its own default values for the omitted tags.
+"""
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Optional
+
+import lxml.etree as ET
+
+from .plan import ATTRIBUTE, CHILD, CHILDREN, GROUP, TEXT
+
+__all__ = ["format_value", "write_object"]
+
+
+def format_value(value: Any) -> Optional[str]:
+    """ Converts a Python value to the text of an XML element (the opposite of the converters).
+
+    Args:
+        value (Any): The value.
+
+    Returns:
+        str | None: The text (`None` if the value must not be written).
+    """
+    if value is None:
+        return None
+    elif isinstance(value, bool):
+        return "true" if value else "false"
+    elif isinstance(value, Enum):
+        return format_value(value.value)
+    elif isinstance(value, float):
+        # Never use the scientific notation (e.g. `1e-05`), not supported by Easyfatt
+        return format(Decimal(repr(value)), "f")
+    elif isinstance(value, Decimal):
+        return format(value, "f")
+    elif isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+
+    return str(value)
+
+
+def _collect(xml_object: Any, attrib: dict, content: list):
+    """ Collects the XML attributes and the content (text and children) of an object, including its groups. """
+    values = dict(xml_object._get_attributes())
+
+    # The native defaults assigned by the parser (and never changed) were not in the source, so they are not written
+    defaulted = getattr(xml_object, "__xml_defaulted__", None)
+    if defaulted:
+        defaults = type(xml_object)._get_parse_plan(native=True).defaults
+        for attr in defaulted:
+            if attr in values and values[attr] == defaults.get(attr):
+                del values[attr]
+
+    for field in type(xml_object)._get_parse_plan().fields:
+        if field.attr not in values:
+            continue
+
+        value = values[field.attr]
+        if field.kind == GROUP:
+            if value is not None:
+                _collect(value, attrib, content)
+            continue
+
+        if value is None:
+            continue
+
+        if field.kind == ATTRIBUTE:
+            text = format_value(value)
+            if text:
+                attrib[field.tag] = text
+        else:
+            content.append((field, value))
+
+
+def write_object(xml_file, xml_object: Any, tag: Optional[str] = None):
+    """ Writes an object (and its nested objects) into an `lxml.etree.xmlfile` context.
+
+    Args:
+        xml_file: The `xmlfile` context (see `lxml.etree.xmlfile`).
+        xml_object (XMLMapper): The object.
+        tag (str, optional): Tag of the element. Defaults to the tag of the class.
+    """
+    attrib = {}
+    content = []
+    _collect(xml_object, attrib, content)
+
+    with xml_file.element(tag or xml_object._get_xml_tag(), attrib):
+        for field, value in content:
+            kind = field.kind
+
+            if kind == TEXT:
+                xml_file.write(format_value(value))
+
+            elif kind == CHILD:
+                value._write_xml(xml_file, field.tag)
+
+            elif kind == CHILDREN:
+                with xml_file.element(field.tag):
+                    for item in value:
+                        item._write_xml(xml_file, field.child_tag)
+
+            else:
+                child_element = ET.Element(field.tag)
+                child_element.text = format_value(value)
+                xml_file.write(child_element)
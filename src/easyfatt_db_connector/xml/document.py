@@ -1,5 +1,12 @@
+import binascii
 from dataclasses import dataclass, field
-from typing import Literal, Optional
+from datetime import date, datetime
+from decimal import Decimal
+import os
+from pathlib import Path
+from typing import BinaryIO, Iterator, Literal, Optional, Union
+
+import lxml.etree as ET
 
 from easyfatt_db_connector.xml.vat_code import VatCode
 
@@ -10,6 +17,7 @@ except ImportError:
 
 from easyfatt_db_connector.xml.product import Product
 from easyfatt_db_connector.xml.common import Field, FieldGroup, XMLMapper
+from easyfatt_db_connector.xml.common.source import CHUNK_SIZE, TextLocation, iter_text, locate
 
 DocumentType: TypeAlias = Literal[
     "A",
@@ -45,6 +53,11 @@ class Payment(XMLMapper):
         "paid": "Paid",
     }
 
+    __xml_native_types__ = {
+        "amount": Decimal,
+        "date": date,
+    }
+
     advance: bool
     """ Se `true`, segnala che il pagamento è riferito ad un acconto.
     
@@ -189,6 +202,10 @@ class TransportInfo(XMLMapper):
         "tracking_number": "TrackingNumber",
     }
 
+    __xml_native_types__ = {
+        "date_time": datetime,
+    }
+
     carrier: str = ""
     """ Denominazione vettore.
 
@@ -588,6 +605,11 @@ class WithholdingTax(XMLMapper):
         "name_extras": "WithholdingTaxNameB",
     }
 
+    __xml_native_types__ = {
+        "amount": Decimal,
+        "amount_extras": Decimal,
+    }
+
     rate1: float = 0
     """ Percentuale ritenuta d'acconto applicata [Numerico].
     
@@ -656,6 +678,10 @@ class Contributions(XMLMapper):
         "vat_code": "ContribVatCode",
     }
 
+    __xml_native_types__ = {
+        "total": Decimal,
+    }
+
     description: str = ""
     """ Descrizione contributi previdenziali.
     
@@ -714,7 +740,15 @@ class Contributions(XMLMapper):
 
 @dataclass(eq=False, init=False, repr=False)
 class DocumentPDFFile(XMLMapper):
-    """ Campo `<Pdf>`. """
+    """ Campo `<Pdf>`.
+
+    Se il documento viene letto da un file con `lazy_pdf=True` (vedi `read_xml`), il contenuto del PDF
+    non viene mantenuto in memoria: viene memorizzato solamente un riferimento al tag all'interno del
+    file e il contenuto viene letto (e decodificato) solamente quando richiesto, ad esempio tramite
+    `save` o `iter_bytes`. In questo caso il file XML non deve essere modificato, spostato o eliminato
+    finché il contenuto è necessario (altrimenti viene sollevato `SourceChangedError`): per svincolare
+    l'oggetto dal file è sufficiente chiamare `load`.
+    """
 
     __xml_name__ = "Pdf"
     __xml_mapping__ = {
@@ -733,8 +767,8 @@ class DocumentPDFFile(XMLMapper):
         ```
     """
 
-    content: str = ""
-    """ Contenuto file codificato in base64.
+    content: str
+    """ Contenuto file codificato in base64 (letto dal file XML ad ogni accesso, se non è in memoria).
     
     Example:
         ```xml
@@ -743,7 +777,139 @@ class DocumentPDFFile(XMLMapper):
         </Document>
         ```
     """
-    
+
+    # Not annotated, so that they are not mistaken for XML fields
+    _text = None  # type: Optional[str]
+    _location = None  # type: Optional[TextLocation]
+
+    def __str__(self) -> str:
+        if self._location is not None:
+            content = f"<{self._location.path.name}>"
+        else:
+            content = f"<{len(self._text or '')} characters>"
+
+        return f"{self.__class__.__name__}(filename='{self.filename}', content={content})"
+
+    @property
+    def content(self) -> str:
+        if self._location is None:
+            return self._text or ""
+
+        return b"".join(iter_text(self._location)).decode("ascii")
+
+    @content.setter
+    def content(self, value: str):
+        self._text = value
+        self._location = None
+
+    @property
+    def is_lazy(self) -> bool:
+        """ Se `True`, il contenuto non è in memoria e viene letto dal file XML quando richiesto. """
+        return self._location is not None
+
+    @classmethod
+    def from_xml(
+        cls, element: ET._Element, convert_types=True, *, _warn_untracked=True, _diagnostics=None, _lazy_pdf=False
+    ) -> "DocumentPDFFile":
+        pdf = cls()
+        pdf.filename = element.get("FileName", "")
+
+        location = locate(element) if _lazy_pdf else None
+        if location is not None:
+            pdf._location = location
+        else:
+            pdf._text = element.text or ""
+
+        return pdf
+
+    def _write_xml(self, xml_file, tag: Optional[str] = None):
+        # The content is copied one chunk at a time, without loading it in memory.
+        # The carriage returns (e.g. of the files written on Windows) are dropped, otherwise they would
+        # be escaped as `&#13;` and the content could not be read lazily from the new file
+        with xml_file.element(tag or self._get_xml_tag(), {"FileName": self.filename} if self.filename else {}):
+            for chunk in self.iter_base64():
+                xml_file.write(chunk.replace(b"\r", b"").decode("ascii"))
+
+    def load(self):
+        """ Carica in memoria il contenuto del PDF (ad esempio prima di modificare o eliminare il file XML). """
+        if self._location is not None:
+            self.content = self.content
+
+    def iter_base64(self, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        """ Restituisce il contenuto codificato in base64, un blocco alla volta.
+
+        Args:
+            chunk_size (int, optional): Dimensione massima (in byte) di ogni blocco. Defaults to CHUNK_SIZE.
+
+        Raises:
+            SourceChangedError: Se il file XML è stato modificato dopo essere stato letto.
+
+        Yields:
+            bytes: Blocchi del testo base64 (compresi eventuali a capo).
+        """
+        if self._location is not None:
+            yield from iter_text(self._location, chunk_size=chunk_size)
+            return
+
+        text = (self._text or "").encode("ascii")
+        for start in range(0, len(text), chunk_size):
+            yield text[start:start + chunk_size]
+
+    def iter_bytes(self, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        """ Restituisce il contenuto decodificato del PDF, un blocco alla volta.
+
+        Args:
+            chunk_size (int, optional): Dimensione (in byte) dei blocchi di testo base64 decodificati. Defaults to CHUNK_SIZE.
+
+        Raises:
+            SourceChangedError: Se il file XML è stato modificato dopo essere stato letto.
+            binascii.Error: Se il contenuto non è codificato correttamente.
+
+        Yields:
+            bytes: Blocchi del file PDF.
+        """
+        remainder = b""
+        for chunk in self.iter_base64(chunk_size=chunk_size):
+            data = remainder + chunk.translate(None, b" \t\r\n")
+
+            # Only groups of 4 characters can be decoded, the rest is kept for the next chunk
+            usable = len(data) - len(data) % 4
+            remainder = data[usable:]
+            if usable:
+                yield binascii.a2b_base64(data[:usable])
+
+        if remainder:
+            yield binascii.a2b_base64(remainder)
+
+    def read(self) -> bytes:
+        """ Restituisce il contenuto decodificato del PDF.
+
+        Returns:
+            bytes: Il file PDF.
+        """
+        return b"".join(self.iter_bytes())
+
+    def save(self, destination: Union[str, Path, BinaryIO], chunk_size: int = CHUNK_SIZE) -> int:
+        """ Salva il PDF decodificato in un file o in un buffer binario, senza caricarlo interamente in memoria.
+
+        Args:
+            destination (str | Path | BinaryIO): Percorso del file da creare (o file aperto in modalità binaria).
+            chunk_size (int, optional): Dimensione (in byte) dei blocchi di testo base64 decodificati. Defaults to CHUNK_SIZE.
+
+        Returns:
+            int: Numero di byte scritti.
+        """
+        if isinstance(destination, (str, os.PathLike)):
+            with open(destination, "wb") as file:
+                return self.save(file, chunk_size=chunk_size)
+
+        written = 0
+        for chunk in self.iter_bytes(chunk_size=chunk_size):
+            destination.write(chunk)
+            written += len(chunk)
+
+        return written
+
 
 @dataclass(eq=False, init=False, repr=False)
 class Document(XMLMapper):
@@ -797,6 +963,17 @@ class Document(XMLMapper):
         "pdf": Field(DocumentPDFFile, tag="Pdf"),
     }
 
+    __xml_native_types__ = {
+        "date": date,
+        "expected_conclusion": date,
+        "cost_amount": Decimal,
+        "total_without_tax": Decimal,
+        "total_vat": Decimal,
+        "total": Decimal,
+        "total_paid": Decimal,
+        "total_subject_to_withholding_tax": Decimal,
+    }
+
     rows: list["Product"] = field(default_factory=list)
     """ Lista dei prodotti o delle note contenute nel documento. 
     
@@ -0,0 +1,316 @@
+""" Parallel reading of `.DefXml` files.
+
+Parsing is CPU-bound (`libxml2` plus the mapping done by `XMLMapper.from_xml`), so the work is
+split among a pool of worker processes: one file per task (`read_xml_many`) or, for a single big
+file, one chunk of `<Document>` elements per task (`map_documents`).
+"""
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+import math
+import os
+from pathlib import Path
+import pickle
+import re
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional, Sequence, Union
+
+import lxml.etree as ET
+
+from easyfatt_db_connector.core.exceptions import EasyfattXMLError
+from easyfatt_db_connector.xml.common.diagnostics import ParseDiagnostics
+from easyfatt_db_connector.xml.document import Document, DocumentPDFFile
+
+if TYPE_CHECKING:
+    from easyfatt_db_connector.xml.root import EasyfattXML
+
+__all__ = ["ReadResult", "read_xml_many", "map_documents"]
+
+CHUNKS_PER_WORKER = 4
+""" Number of chunks each worker receives (on average) when the chunk size is not specified. """
+
+MIN_CHUNK_SIZE = 50
+""" Minimum number of documents per chunk when the chunk size is not specified. """
+
+
+@dataclass
+class ReadResult(object):
+    """ Risultato della lettura di un singolo file (vedi `read_xml_many`). """
+
+    path: Path
+    """ Percorso del file. """
+
+    xml: Optional["EasyfattXML"] = None
+    """ Contenuto del file (`None` in caso di errore). """
+
+    error: Optional[Exception] = None
+    """ Errore avvenuto durante la lettura del file (ad esempio `TypeConversionError`). """
+
+    diagnostics: Optional[ParseDiagnostics] = None
+    """ Tag presenti nel file ma non gestiti dalle classi (vedi `ParseDiagnostics`). """
+
+    @property
+    def ok(self) -> bool:
+        """ Se `True`, il file è stato letto correttamente. """
+        return self.error is None
+
+    def unwrap(self) -> "EasyfattXML":
+        """ Restituisce il contenuto del file, sollevando l'errore avvenuto durante la lettura (se presente). """
+        if self.error is not None:
+            raise self.error
+
+        return self.xml
+
+
+def _read_file(path: Path, convert_types: bool, compact: bool = False, lazy_pdf: bool = False) -> ReadResult:
+    """ Reads a single file, capturing the error (if any) in the result. Executed in the worker processes. """
+    from easyfatt_db_connector.xml import read_xml
+
+    diagnostics = ParseDiagnostics(source=str(path))
+
+    try:
+        xml = read_xml(path, convert_types=convert_types, compact=compact, diagnostics=diagnostics, lazy_pdf=lazy_pdf)
+        return ReadResult(path, xml=xml, diagnostics=diagnostics)
+    except Exception as e:
+        try:
+            pickle.dumps(e)
+        except Exception:
+            # Some errors (e.g. the ones raised by `lxml`) cannot be sent back to the main process
+            e = EasyfattXMLError(f"{type(e).__name__}: {e}")
+
+        return ReadResult(path, error=e, diagnostics=diagnostics)
+
+
+def _report(result: ReadResult) -> ReadResult:
+    """ Logs the untracked tags of a file (in the main process, where logging is configured). """
+    if result.diagnostics:
+        result.diagnostics.log()
+
+    return result
+
+
+def read_xml_many(
+    paths: Iterable[Union[str, Path]],
+    workers: Optional[int] = None,
+    ordered: bool = True,
+    convert_types: bool = True,
+    executor: Optional[Executor] = None,
+    compact: bool = False,
+    lazy_pdf: bool = False,
+) -> Iterator[ReadResult]:
+    """ Legge più file XML in parallelo, in un pool di processi.
+
+    Gli errori relativi ad un singolo file (ad esempio `TypeConversionError`) non interrompono la
+    lettura degli altri file, ma vengono restituiti nel relativo `ReadResult`, così come i tag non
+    gestiti (che vengono anche registrati nel log, una volta per file).
+
+    Args:
+        paths (Iterable[str | Path]): Percorsi dei file XML da leggere.
+        workers (int, optional): Numero di processi da utilizzare (`1` legge i file nel processo corrente). Defaults to the number of CPUs.
+        ordered (bool, optional): Se `True` i risultati vengono restituiti nello stesso ordine dei file, altrimenti appena sono disponibili. Defaults to True.
+        convert_types (bool, optional): Se `True`, converte i valori dei tag in tipi Python. Defaults to True.
+        executor (Executor, optional): Pool (già esistente) da utilizzare al posto di crearne uno nuovo. Defaults to None.
+        compact (bool, optional): Se `True`, restituisce gli oggetti in versione compatta (vedi `read_xml`). Defaults to False.
+        lazy_pdf (bool, optional): Se `True`, il contenuto dei PDF viene letto dal file solamente quando richiesto (vedi `read_xml`). Defaults to False.
+
+    Yields:
+        ReadResult: Il risultato della lettura di ciascun file.
+
+    Example:
+        ```python
+        for result in read_xml_many(Path("import").glob("*.DefXml"), workers=4, ordered=False):
+            if not result.ok:
+                print(f"Errore nel file {result.path}: {result.error}")
+                continue
+
+            print(f"{result.path}: {len(result.xml.documents)} documenti")
+        ```
+    """
+    paths = [Path(path) for path in paths]
+
+    if executor is None and (workers == 1 or len(paths) <= 1):
+        for path in paths:
+            yield _report(_read_file(path, convert_types, compact, lazy_pdf))
+        return
+
+    if executor is None:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            yield from read_xml_many(
+                paths, ordered=ordered, convert_types=convert_types, executor=executor, compact=compact, lazy_pdf=lazy_pdf
+            )
+        return
+
+    futures: "list[Future[ReadResult]]" = [executor.submit(_read_file, path, convert_types, compact, lazy_pdf) for path in paths]
+    try:
+        for future in futures if ordered else as_completed(futures):
+            yield _report(future.result())
+    finally:
+        # The caller stopped iterating, so the files that have not been read yet are no longer needed
+        for future in futures:
+            future.cancel()
+
+
+def _locate(element: ET._Element) -> "tuple[str, int, bool]":
+    """ Returns the path of the parent of an element, the position of the element and whether its path contains the position. """
+    parent_path, step = element.getroottree().getpath(element).rsplit("/", 1)
+    position = re.search(r"\[(\d+)\]$", step)
+
+    return parent_path, int(position.group(1)) if position else 1, position is not None
+
+
+def _relocate(diagnostics: ParseDiagnostics, parent_path: str, position: int, indexed: bool):
+    """ Rewrites the paths of the untracked tags found in a chunk as paths of the original file.
+
+    In the chunk the documents are children of a synthetic `<Documents>` element and their
+    positions restart from 1, so the prefix `/Documents/Document[n]` is replaced by the path
+    of the same document in the original file.
+    """
+    tag = Document._get_xml_tag()
+    pattern = re.compile(rf"/Documents/{re.escape(tag)}(?:\[(\d+)\])?(?=/|$)")
+
+    for untracked in diagnostics.untracked.values():
+        match = pattern.match(untracked.first_path)
+        if match is None:
+            continue
+
+        step = f"{tag}[{position + int(match.group(1) or 1) - 1}]" if indexed else tag
+        untracked.first_path = f"{parent_path}/{step}{untracked.first_path[match.end():]}"
+
+
+def _map_chunk(
+    chunk: bytes,
+    convert_types: bool,
+    warn_untracked: bool,
+    compact: bool = False,
+    location: "Optional[tuple[str, int, bool]]" = None,
+) -> "tuple[list[Document], ParseDiagnostics]":
+    """ Maps a chunk of serialized `<Document>` elements. Executed in the worker processes.
+
+    The untracked children are sent back to the main process, which reports them once for the whole file.
+    Their paths refer to the original file if the `location` of the first document of the chunk is given (see `_locate`).
+    """
+    container = ET.fromstring(chunk, parser=ET.XMLParser(huge_tree=True))
+    document_class = Document.compact_class() if compact else Document
+    diagnostics = ParseDiagnostics()
+
+    documents = [
+        document_class.from_xml(element, convert_types=convert_types, _warn_untracked=warn_untracked, _diagnostics=diagnostics)
+        for element in container
+    ]
+
+    if location is not None and diagnostics:
+        _relocate(diagnostics, *location)
+
+    return documents, diagnostics
+
+
+def _serialize_chunk(
+    elements: Sequence[ET._Element], compact: bool = False, lazy_pdf: bool = False
+) -> "tuple[bytes, dict[int, DocumentPDFFile]]":
+    """ Serializes a chunk of `<Document>` elements, mapping their PDFs in the current process.
+
+    The PDFs are left out of the serialized chunk, so that their (big) content is never sent
+    to the workers and, with `lazy_pdf`, they keep the reference to the original file (see `DocumentPDFFile`).
+
+    Returns:
+        tuple[bytes, dict[int, DocumentPDFFile]]: The serialized chunk and the PDFs, by position in the chunk.
+    """
+    pdf_class = DocumentPDFFile.compact_class() if compact else DocumentPDFFile
+    parts = [b"<Documents>"]
+    pdfs = {}
+
+    for index, element in enumerate(elements):
+        pdf_element = element.find(DocumentPDFFile._get_xml_tag())
+        if pdf_element is None:
+            parts.append(ET.tostring(element, with_tail=False))
+            continue
+
+        pdfs[index] = pdf_class.from_xml(pdf_element, _lazy_pdf=lazy_pdf)
+
+        position = element.index(pdf_element)
+        element.remove(pdf_element)
+        try:
+            parts.append(ET.tostring(element, with_tail=False))
+        finally:
+            element.insert(position, pdf_element)
+
+    parts.append(b"</Documents>")
+    return b"".join(parts), pdfs
+
+
+def map_documents(
+    elements: Sequence[ET._Element],
+    workers: Optional[int] = None,
+    convert_types: bool = True,
+    chunk_size: Optional[int] = None,
+    compact: bool = False,
+    lazy_pdf: bool = False,
+    *,
+    _warn_untracked: bool = True,
+    _diagnostics: Optional[ParseDiagnostics] = None,
+) -> "list[Document]":
+    """ Maps a list of `<Document>` elements to `Document` objects in a pool of processes.
+
+    The elements are split into chunks, which are serialized and mapped by the workers; the
+    resulting documents are returned in the original order. Only a few chunks per worker are
+    in flight at any time, so the serialized copies never take more than a fraction of the file.
+
+    The elements MUST be consecutive siblings (e.g. all the children of `<Documents>`), so that
+    the untracked tags are reported with their path in the original file.
+
+    Args:
+        elements (Sequence[ET._Element]): The `<Document>` elements.
+        workers (int, optional): Number of processes (`1` maps the elements in the current process). Defaults to the number of CPUs.
+        convert_types (bool, optional): Whether to convert the types of the fields. Defaults to True.
+        chunk_size (int, optional): Number of documents per chunk. Defaults to a size giving `CHUNKS_PER_WORKER` chunks to each worker.
+        compact (bool, optional): Whether to return the compact version of the documents (see `compact_class`). Defaults to False.
+        lazy_pdf (bool, optional): Whether the content of the PDFs is read from the file only when requested (see `DocumentPDFFile`). Defaults to False.
+        _warn_untracked (bool, optional): Whether to warn if there are untracked children (for internal use only). Defaults to True.
+        _diagnostics (ParseDiagnostics, optional): Collects the untracked children instead of logging them (for internal use only). Defaults to None.
+
+    Returns:
+        list[Document]: The documents, in the same order of the elements.
+    """
+    workers = workers or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(MIN_CHUNK_SIZE, math.ceil(len(elements) / (workers * CHUNKS_PER_WORKER)))
+
+    diagnostics = _diagnostics if _diagnostics is not None else ParseDiagnostics()
+    documents = []
+
+    def collect(future: "Future[tuple[list[Document], ParseDiagnostics]]", pdfs: "dict[int, DocumentPDFFile]"):
+        chunk_documents, chunk_diagnostics = future.result()
+        diagnostics.merge(chunk_diagnostics)
+        for index, pdf in pdfs.items():
+            chunk_documents[index].pdf = pdf
+        documents.extend(chunk_documents)
+
+    if workers == 1 or len(elements) <= chunk_size:
+        document_class = Document.compact_class() if compact else Document
+        documents = [
+            document_class.from_xml(
+                element, convert_types=convert_types, _warn_untracked=_warn_untracked, _diagnostics=diagnostics, _lazy_pdf=lazy_pdf
+            )
+            for element in elements
+        ]
+    else:
+        # The path of the first element is computed once, the ones of the chunks are derived from it
+        parent_path, first_position, indexed = _locate(elements[0])
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+
+            for start in range(0, len(elements), chunk_size):
+                chunk, pdfs = _serialize_chunk(elements[start:start + chunk_size], compact, lazy_pdf)
+                location = (parent_path, first_position + start, indexed)
+                pending.append((executor.submit(_map_chunk, chunk, convert_types, _warn_untracked, compact, location), pdfs))
+
+                if len(pending) >= workers * 2:
+                    collect(*pending.popleft())
+
+            while pending:
+                collect(*pending.popleft())
+
+    if _diagnostics is None and diagnostics:
+        diagnostics.log()
+
+    return documents
@@ -1,4 +1,6 @@
 from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
 from typing import Optional
 import lxml.etree as ET
 
@@ -33,6 +35,13 @@ class Product(XMLMapper):
         "commission_percentage": "CommissionPerc",
     }
 
+    __xml_native_types__ = {
+        "expiry_date": date,
+        "price": Decimal,
+        "eco_fee": Decimal,
+        "total": Decimal,
+    }
+
     code: str = ""
     """ Codice prodotto.
     
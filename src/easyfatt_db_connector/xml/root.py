@@ -1,9 +1,17 @@
 import dataclasses
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
+
+import lxml.etree as ET
 
 from easyfatt_db_connector.xml.company import Company
 from easyfatt_db_connector.xml.document import Document
 from easyfatt_db_connector.xml.common import Field, XMLMapper
+from easyfatt_db_connector.xml.common.compact import is_compact
+from easyfatt_db_connector.xml.common.diagnostics import ParseDiagnostics
+from easyfatt_db_connector.xml.parallel import map_documents
+
+if TYPE_CHECKING:
+    import pyarrow
 
 
 @dataclasses.dataclass(init=False, repr=False)
@@ -86,6 +94,110 @@ class EasyfattXML(XMLMapper):
     #     self.company = None
     #     self.documents = []
 
+    @classmethod
+    def from_xml_string(
+        cls,
+        string: str,
+        convert_types=True,
+        *,
+        workers: Optional[int] = 1,
+        chunk_size: Optional[int] = None,
+        _warn_untracked=True,
+        _diagnostics: Optional[ParseDiagnostics] = None,
+        _lazy_pdf=False,
+    ) -> "EasyfattXML":
+        """ Creates an instance of the class from an XML text (see `from_xml` for the arguments). """
+        return cls.from_xml(
+            ET.fromstring(string),
+            convert_types=convert_types,
+            workers=workers,
+            chunk_size=chunk_size,
+            _warn_untracked=_warn_untracked,
+            _diagnostics=_diagnostics,
+            _lazy_pdf=_lazy_pdf,
+        )
+
+    @classmethod
+    def from_xml(
+        cls,
+        element: ET._Element,
+        convert_types=True,
+        *,
+        workers: Optional[int] = 1,
+        chunk_size: Optional[int] = None,
+        _warn_untracked=True,
+        _diagnostics: Optional[ParseDiagnostics] = None,
+        _lazy_pdf=False,
+    ) -> "EasyfattXML":
+        """ Creates an instance of the class from an XML element.
+
+        Args:
+            element (ET._Element): The XML element to parse.
+            convert_types (bool, optional): Whether to convert the types of the fields. Defaults to True.
+            workers (int | None, optional): Number of processes used to map the documents (`None` uses all the CPUs, see `map_documents`). Defaults to 1.
+            chunk_size (int, optional): Number of documents mapped by each task. Defaults to an automatic size.
+            _warn_untracked (bool, optional): Whether to warn if there are untracked children (for internal use only). Defaults to True.
+            _diagnostics (ParseDiagnostics, optional): Collects the untracked children instead of logging them (for internal use only). Defaults to None.
+            _lazy_pdf (bool, optional): Whether the content of the PDFs is read from the file only when requested (see `DocumentPDFFile`, for internal use only). Defaults to False.
+
+        Returns:
+            EasyfattXML: An instance of the class.
+        """
+        # Not `super()`, which would fail for the compact version of the class (see `compact_class`)
+        parse = XMLMapper.from_xml.__func__
+
+        container = element.find("Documents")
+        if workers == 1 or container is None:
+            return parse(
+                cls, element, convert_types=convert_types, _warn_untracked=_warn_untracked, _diagnostics=_diagnostics, _lazy_pdf=_lazy_pdf
+            )
+
+        diagnostics = _diagnostics
+        if diagnostics is None and _warn_untracked:
+            diagnostics = ParseDiagnostics()
+
+        # Map everything but the documents (the container is detached only for the time needed)
+        position = element.index(container)
+        element.remove(container)
+        try:
+            xml_object = parse(
+                cls, element, convert_types=convert_types, _warn_untracked=_warn_untracked, _diagnostics=diagnostics, _lazy_pdf=_lazy_pdf
+            )
+        finally:
+            element.insert(position, container)
+
+        xml_object.documents = map_documents(
+            container.findall(Document._get_xml_tag()),
+            workers=workers,
+            convert_types=convert_types,
+            chunk_size=chunk_size,
+            compact=is_compact(cls),
+            lazy_pdf=_lazy_pdf,
+            _warn_untracked=_warn_untracked,
+            _diagnostics=diagnostics,
+        )
+
+        if _diagnostics is None and diagnostics:
+            diagnostics.log()
+
+        return xml_object
+
+    def to_columns(self) -> "dict[str, dict[str, list]]":
+        """ Returns the documents as columnar tables (`documents`, `rows` and `payments`).
+
+        See `easyfatt_db_connector.xml.columns` for the layout of the tables (use `read_columns`
+        to build them while reading the file, without creating the `Document` objects).
+        """
+        from easyfatt_db_connector.xml.columns import documents_to_columns
+
+        return documents_to_columns(self.documents)
+
+    def to_arrow(self) -> "dict[str, pyarrow.Table]":
+        """ Returns the documents as Arrow tables (see `to_columns`). Requires `pyarrow`. """
+        from easyfatt_db_connector.xml.columns import columns_to_arrow
+
+        return columns_to_arrow(self.to_columns())
+
     def add_document(self, document: Document):
         self.documents.append(document)
 
@@ -0,0 +1,130 @@
+""" Streaming access to `.DefXml` files.
+
+Unlike `read_xml`, the functions in this module never build the whole XML tree in memory:
+the file is parsed incrementally and each `<Document>` element is discarded as soon as it
+has been mapped, so the memory usage stays bounded to (roughly) a single document.
+"""
+from typing import Iterator, Optional
+
+import lxml.etree as ET
+
+from easyfatt_db_connector.xml.common.diagnostics import ParseDiagnostics
+from easyfatt_db_connector.xml.common.source import XMLSource, open_source
+from easyfatt_db_connector.xml.company import Company
+from easyfatt_db_connector.xml.document import Document
+from easyfatt_db_connector.xml.root import EasyfattXML
+
+__all__ = ["iter_documents", "read_header"]
+
+
+def _clear_element(element: ET._Element):
+    """ Frees the memory used by an element and by its (already processed) previous siblings. """
+    element.clear(keep_tail=True)
+
+    parent = element.getparent()
+    if parent is not None:
+        while element.getprevious() is not None:
+            del parent[0]
+
+
+def read_header(source: XMLSource, convert_types=True) -> EasyfattXML:
+    """ Legge solamente l'intestazione di un file `.DefXml`, senza leggere i documenti.
+
+    L'oggetto restituito contiene gli attributi del tag radice (`AppVersion`, `Creator`, `CreatorUrl`)
+    ed i dati dell'azienda (`<Company>`), mentre la lista `documents` è sempre vuota.
+
+    Args:
+        source (str | Path | IO[bytes]): Percorso del file XML da leggere (oppure file aperto in modalità binaria).
+        convert_types (bool, optional): Se `True`, converte i valori dei tag in tipi Python. Defaults to True.
+
+    Returns:
+        EasyfattXML: Oggetto `EasyfattXML` contenente solamente l'intestazione del file.
+    """
+    root = None
+    company = None
+
+    with open_source(source) as file:
+        context = ET.iterparse(
+            file,
+            events=("start", "end"),
+            tag=(EasyfattXML._get_xml_tag(), Company._get_xml_tag(), "Documents"),
+            huge_tree=True,
+        )
+        for event, element in context:
+            if root is None:
+                root = element.getroottree().getroot()
+
+            if event == "end" and element.tag == Company._get_xml_tag() and element.getparent() is root:
+                company = Company.from_xml(element, convert_types=convert_types)
+
+            # The documents are always placed after the `<Company>` tag, so there is no need to read them
+            elif event == "start" and element.tag == "Documents":
+                break
+
+        del context
+
+    if root is None:
+        raise ValueError("The XML file does not contain any element")
+
+    # Copy only the attributes of the root element, so that the documents are never parsed
+    header = EasyfattXML.from_xml(
+        ET.Element(root.tag, dict(root.attrib)), convert_types=convert_types
+    )
+    if company is not None:
+        header.company = company
+
+    return header
+
+
+def iter_documents(
+    source: XMLSource,
+    convert_types=True,
+    compact: bool = False,
+    diagnostics: Optional[ParseDiagnostics] = None,
+    lazy_pdf: bool = False,
+) -> Iterator[Document]:
+    """ Legge i documenti di un file `.DefXml` uno alla volta.
+
+    A differenza di `read_xml`, il file non viene caricato interamente in memoria: ogni elemento
+    `<Document>` viene convertito in un oggetto `Document` e subito dopo rimosso dall'albero XML.
+
+    Args:
+        source (str | Path | IO[bytes]): Percorso del file XML da leggere (oppure file aperto in modalità binaria).
+        convert_types (bool, optional): Se `True`, converte i valori dei tag in tipi Python. Defaults to True.
+        compact (bool, optional): Se `True`, restituisce i documenti in versione compatta (vedi `read_xml`). Defaults to False.
+        diagnostics (ParseDiagnostics, optional): Se specificato, i tag non gestiti dalle classi vengono raccolti in questo oggetto invece di essere registrati nel log (una volta per tag, al termine della lettura). Defaults to None.
+        lazy_pdf (bool, optional): Se `True`, il contenuto dei PDF viene letto dal file solamente quando richiesto (vedi `read_xml`). Defaults to False.
+
+    Yields:
+        Document: I documenti contenuti nel file, nello stesso ordine in cui compaiono.
+    """
+    document_class = Document.compact_class() if compact else Document
+    collected = diagnostics if diagnostics is not None else ParseDiagnostics()
+
+    try:
+        yield from _iter_documents(source, document_class, convert_types, collected, lazy_pdf)
+    finally:
+        if diagnostics is None and collected:
+            collected.log()
+
+
+def _iter_documents(
+    source: XMLSource, document_class: type, convert_types, diagnostics: ParseDiagnostics, lazy_pdf: bool = False
+) -> Iterator[Document]:
+    with open_source(source) as file:
+        context = ET.iterparse(
+            file,
+            events=("end",),
+            tag=Document._get_xml_tag(),
+            huge_tree=True,
+        )
+        for _, element in context:
+            parent = element.getparent()
+            if parent is None or parent.tag != "Documents":
+                continue
+
+            yield document_class.from_xml(element, convert_types=convert_types, _diagnostics=diagnostics, _lazy_pdf=lazy_pdf)
+
+            _clear_element(element)
+
+        del context
@@ -0,0 +1,200 @@
+""" Stand-ins and fixtures shared by the tests. """
+import datetime
+from decimal import Decimal
+import inspect
+from pathlib import Path
+import tempfile
+import threading
+import time
+
+import fdb
+import sqlalchemy
+
+from easyfatt_db_connector.core.connection import EasyfattFDB
+from easyfatt_db_connector.core.exceptions import DatabaseLockedError
+from easyfatt_db_connector.orm.static import TDocRighe
+
+
+class FakeCursor(object):
+	""" Minimal stand-in for `fdb.Cursor`, recording the threads it is used from. """
+	def __init__(self, rows, delay=0):
+		self.rows = list(rows)
+		self.delay = delay
+		self.threads = set()
+
+	def execute(self, query, parameters=None):
+		self.threads.add(threading.current_thread().name)
+		time.sleep(self.delay)
+		return self
+
+	def fetchmany(self, size):
+		self.threads.add(threading.current_thread().name)
+		rows, self.rows = self.rows[:size], self.rows[size:]
+		return rows
+
+	def fetchall(self):
+		return self.fetchmany(len(self.rows))
+
+
+class FakeConnection(object):
+	""" Minimal stand-in for `fdb.Connection`, recording the database it was attached to. """
+	def __init__(self, database_path, read_only, rows=((1,),), delay=0):
+		self.database_path = database_path
+		self.read_only = read_only
+		self.rows = rows
+		self.delay = delay
+		self.cursors = []
+		self.closed = False
+
+	def cursor(self):
+		self.cursors.append(FakeCursor(self.rows, self.delay))
+		return self.cursors[-1]
+
+	def rollback(self):
+		pass
+
+	def close(self):
+		self.closed = True
+
+
+class OfflineFDB(EasyfattFDB):
+	""" `EasyfattFDB` whose connections do not need the Firebird client library. """
+	locked = False
+	""" Whether the archive itself cannot be attached, as if Easyfatt was open. """
+
+	rows = ((1,),)
+	""" Rows returned by every query. """
+
+	delay = 0
+	""" Seconds taken by every query. """
+
+	opened = 0
+	""" Number of connections opened so far. """
+
+	def _connect(self, database_path, read_only=False):
+		if self.locked and Path(database_path) == self.archive_path:
+			raise DatabaseLockedError(f"The database '{self.archive_path}' is locked.")
+
+		self.opened += 1
+		return FakeConnection(Path(database_path), read_only, rows=self.rows, delay=self.delay)
+
+
+class FakeDBAPICursor(object):
+	""" Cursor of `FakeDBAPIConnection`, storing the inserted values in a single table. """
+	def __init__(self, connection):
+		self.connection = connection
+		self.description = None
+		self.rowcount = -1
+		self.rows = []
+
+	def execute(self, statement, parameters=()):
+		if statement.startswith("INSERT"):
+			if self.connection.read_only:
+				raise fdb.DatabaseError("attempted update during read-only transaction", -817, 335544361)
+
+			self.connection.pending.append(tuple(parameters))
+			self.rowcount = 1
+		else:
+			self.description = (("VALUE", None, None, None, None, None, None),)
+			self.rows = list(self.connection.tables.get(self.connection.kwargs["database"], []))
+
+	def fetchall(self):
+		rows, self.rows = self.rows, []
+		return rows
+
+	def close(self):
+		pass
+
+
+class FakeDBAPIConnection(object):
+	""" Connection returned by the stubbed `fdb.connect` (see `fake_connect`), honouring the read-only transactions. """
+	engine_version = 2.5
+
+	tables = {}
+	""" Committed rows of each database. """
+
+	def __init__(self, **kwargs):
+		self.kwargs = kwargs
+		self.pending = []
+		self.closed = False
+
+	@property
+	def read_only(self):
+		return fdb.isc_tpb_read in self.kwargs.get("isolation_level", b"")
+
+	def cursor(self):
+		return FakeDBAPICursor(self)
+
+	def commit(self):
+		self.tables.setdefault(self.kwargs["database"], []).extend(self.pending)
+		self.pending = []
+
+	def rollback(self):
+		self.pending = []
+
+	def close(self):
+		self.closed = True
+
+
+def fake_connect(**kwargs):
+	""" Stand-in for `fdb.connect`, to be used with `mock.patch("fdb.connect", side_effect=fake_connect)`. """
+	# Rejects the arguments unknown to `fdb.connect`, like the real function
+	inspect.signature(fdb.connect).bind(**kwargs)
+	return FakeDBAPIConnection(**kwargs)
+
+
+class TemporaryArchive(object):
+	""" Test case mixin creating, for each test, a temporary archive and the `database_class` object connected to it. """
+	database_class = OfflineFDB
+
+	def setUp(self):
+		self.folder = tempfile.TemporaryDirectory()
+		self.archive = Path(self.folder.name) / "archive.eft"
+		self.archive.write_bytes(b"version 1")
+
+		# The connections are never attached, so an empty client library is enough
+		firebird_path = Path(self.folder.name) / "firebird"
+		firebird_path.mkdir()
+		(firebird_path / "fbembed.dll").touch()
+
+		self.database = self.database_class(self.archive, firebird_path=firebird_path)
+
+	def tearDown(self):
+		FakeDBAPIConnection.tables.clear()
+		self.database.dispose()
+		self.folder.cleanup()
+
+
+def line_values(model, rows):
+	""" Default content of the tables of `create_test_engine`: `rows` lines of `TDocRighe`, three per document (in reverse order). """
+	assert model is TDocRighe, f"No test data for {model.__name__}"
+
+	return [
+		{
+			"IDDocRiga": index,
+			"IDDoc": (rows - index) // 3,
+			"Desc": f"Row {index}",
+			"Qta": Decimal("1.5") * index,
+			"DataScadenza": datetime.date(2023, 1, 1 + index % 28),
+			"MovMagazz": index % 2,
+		}
+		for index in range(1, rows + 1)
+	]
+
+
+def create_test_engine(models=(TDocRighe,), rows=10, values=line_values):
+	""" Creates an in-memory database containing the tables of the given models.
+
+	Args:
+		models (Sequence[type]): The models whose tables are created and filled, in this order. Defaults to `TDocRighe`.
+		rows (int): Number of rows (or documents) passed to `values`. Defaults to 10.
+		values (Callable[[type, int], list[dict]]): Returns the content of the table of a model. Defaults to `line_values`.
+	"""
+	engine = sqlalchemy.create_engine("sqlite://")
+
+	with engine.begin() as connection:
+		for model in models:
+			model.__table__.create(connection)
+			connection.execute(model.__table__.insert(), values(model, rows))
+
+	return engine
@@ -0,0 +1,78 @@
+import asyncio
+import unittest
+
+import sqlalchemy
+import sqlalchemy.pool
+
+from easyfatt_db_connector.core.connection import AsyncSQLAlchemyConnection
+from easyfatt_db_connector.core.connection._async import AsyncExecutor
+from tests.helpers import TemporaryArchive
+
+
+class TestAsyncFDB(TemporaryArchive, unittest.IsolatedAsyncioTestCase):
+	def setUp(self):
+		super().setUp()
+		self.database.rows = [(number,) for number in range(2500)]
+		self.database.delay = 0.2
+
+	async def test_aconnect(self):
+		async with self.database.aconnect() as connection:
+			self.assertEqual(connection.connection.database_path, self.database.snapshots.current.path)
+
+			cursor = await connection.execute("SELECT 1 FROM RDB$DATABASE")
+			rows = [row async for row in cursor]
+
+		self.assertEqual(len(rows), 2500)
+		self.assertTrue(connection.connection.closed)
+		self.assertTrue(all(name.startswith("easyfatt-fdb") for name in cursor.cursor.threads))
+
+	async def test_event_loop_is_not_blocked(self):
+		ticks = 0
+
+		async def tick():
+			nonlocal ticks
+			while True:
+				ticks += 1
+				await asyncio.sleep(0.01)
+
+		ticker = asyncio.ensure_future(tick())
+		try:
+			async with self.database.aconnect() as connection:
+				await connection.execute("SELECT 1 FROM RDB$DATABASE")
+		finally:
+			ticker.cancel()
+
+		self.assertGreater(ticks, 5)
+
+	async def test_error_closes_the_connection(self):
+		with self.assertRaises(ZeroDivisionError):
+			async with self.database.aconnect() as connection:
+				1 / 0
+
+		self.assertTrue(connection.connection.closed)
+
+
+class TestAsyncSQLAlchemy(unittest.IsolatedAsyncioTestCase):
+	async def test_execute(self):
+		engine = sqlalchemy.create_engine(
+			"sqlite://", connect_args={"check_same_thread": False}, poolclass=sqlalchemy.pool.StaticPool
+		)
+		executor = AsyncExecutor(max_workers=1)
+
+		try:
+			with engine.connect() as blocking_connection:
+				connection = AsyncSQLAlchemyConnection(blocking_connection, executor)
+				query = sqlalchemy.text("WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < 10) SELECT x FROM n")
+
+				result = await connection.execute(query)
+				self.assertEqual(await result.fetchmany(3), [(1,), (2,), (3,)])
+
+				result = await connection.stream(query)
+				self.assertEqual([len(rows) async for rows in result.batches(4)], [4, 4, 2])
+		finally:
+			executor.shutdown()
+			engine.dispose()
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,69 @@
+from decimal import Decimal
+from pathlib import Path
+import tempfile
+import unittest
+
+from easyfatt_db_connector.orm.changes import ChangeTracker, diff_snapshots
+from easyfatt_db_connector.orm.static import TDocRighe
+from tests.helpers import create_test_engine
+
+
+def modify(connection):
+	table = TDocRighe.__table__
+	connection.execute(table.update().where(table.c.IDDocRiga == 2).values(Qta=Decimal(42)))
+	connection.execute(table.delete().where(table.c.IDDocRiga == 3))
+	connection.execute(table.insert().values(IDDocRiga=6, IDDoc=2, Desc="Row 6"))
+
+
+class TestChangeTracker(unittest.TestCase):
+	def test_extract(self):
+		engine = create_test_engine(rows=5)
+
+		with tempfile.TemporaryDirectory() as folder:
+			state_path = Path(folder) / "state.json"
+
+			with engine.begin() as connection:
+				changes = ChangeTracker(state_path, models=[TDocRighe]).extract(connection, save=True)["TDocRighe"]
+				self.assertEqual(len(changes.inserted), 5)
+
+				modify(connection)
+
+				# The state MUST be read back from the sidecar file
+				tracker = ChangeTracker(state_path, models=[TDocRighe])
+				changes = tracker.extract(connection)["TDocRighe"]
+
+				self.assertEqual([row["IDDocRiga"] for row in changes.inserted], [6])
+				self.assertEqual([row["IDDocRiga"] for row in changes.updated], [2])
+				self.assertEqual(changes.deleted, [{"IDDocRiga": 3}])
+
+				# Nothing changed since the last extraction
+				self.assertFalse(tracker.extract(connection)["TDocRighe"])
+
+	def test_initialize(self):
+		engine = create_test_engine(rows=5)
+
+		with tempfile.TemporaryDirectory() as folder, engine.begin() as connection:
+			tracker = ChangeTracker(Path(folder) / "state.json", models=[TDocRighe])
+			tracker.initialize(connection)
+
+			modify(connection)
+			changes = tracker.extract(connection)["TDocRighe"]
+
+		self.assertEqual([row["IDDocRiga"] for row in changes.inserted], [6])
+		self.assertEqual([row["IDDocRiga"] for row in changes.updated], [2])
+		self.assertEqual(changes.deleted, [{"IDDocRiga": 3}])
+
+	def test_diff_snapshots(self):
+		old_engine, new_engine = create_test_engine(rows=5), create_test_engine(rows=5)
+
+		with old_engine.connect() as old_connection, new_engine.begin() as new_connection:
+			modify(new_connection)
+			changes = diff_snapshots(old_connection, new_connection, models=[TDocRighe])["TDocRighe"]
+
+		self.assertEqual([row["IDDocRiga"] for row in changes.inserted], [6])
+		self.assertEqual([row["IDDocRiga"] for row in changes.updated], [2])
+		self.assertEqual(changes.deleted, [{"IDDocRiga": 3}])
+
+
+if __name__ == "__main__":
+	unittest.main()
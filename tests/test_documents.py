@@ -0,0 +1,128 @@
+from datetime import date
+from decimal import Decimal
+import unittest
+
+import sqlalchemy
+
+from easyfatt_db_connector.orm.documents import load_documents
+from easyfatt_db_connector.orm.static import TDocRighe, TDocTestate, TIva, TPrimaNota
+from tests.helpers import create_test_engine
+
+
+def document_values(model, documents):
+	""" Content of the tables of some documents (with 3 rows and 2 payments each), see `create_test_engine`. """
+	if model is TIva:
+		return [
+			{"CodIva": "22", "DescIva": "Aliquota 22%", "PercIva": Decimal("22.00"), "ClasseIva": "I"},
+			{"CodIva": "N4", "DescIva": "Esente", "PercIva": Decimal("0.00"), "ClasseIva": "E"},
+		]
+
+	if model is TDocTestate:
+		return [
+			{
+				"IDDoc": index,
+				"TipoDoc": "I" if index % 2 else "C",
+				"Data": date(2023, 1, index),
+				"DataDoc": date(2023, 1, index),
+				"Num": index,
+				"IDListino": 1,
+				"Anagr_Nome": f"Cliente {index}",
+				"UsaPrezzoIvato": index == 3,
+				"TotDoc": Decimal("122.0000"),
+				"Spese_CodIva": "22",
+			}
+			for index in range(documents, 0, -1)
+		]
+
+	if model is TDocRighe:
+		return [
+			{
+				"IDDocRiga": document * 10 + row,
+				"IDDoc": document,
+				"Desc": f"Riga {row}",
+				"Qta": Decimal("2.0000"),
+				"PrezzoNetto": Decimal("50.0000"),
+				"PrezzoIvato": Decimal("61.0000"),
+				"CodIva": "N4" if row == 3 else "22",
+				"MovMagazz": row != 2,
+			}
+			for document in range(1, documents + 1)
+			for row in (3, 1, 2)
+		]
+
+	return [
+		{
+			"IDPrimaNota": document * 10 + payment,
+			"IDDoc": document,
+			"DataScad": date(2023, 2 + payment, 1),
+			"DataPagam": date(2023, 2 + payment, 1),
+			"Ordinam": 0,
+			"Importo": Decimal("61.0000"),
+			"Saldato": payment == 0,
+		}
+		for document in range(1, documents + 1)
+		for payment in (1, 0)
+	]
+
+
+class TestLoadDocuments(unittest.TestCase):
+	def setUp(self):
+		self.engine = create_test_engine((TIva, TDocTestate, TDocRighe, TPrimaNota), rows=5, values=document_values)
+		self.queries = []
+		sqlalchemy.event.listen(self.engine, "before_cursor_execute", self._count)
+
+	def tearDown(self):
+		self.engine.dispose()
+
+	def _count(self, connection, cursor, statement, parameters, context, executemany):
+		self.queries.append(statement)
+
+	def test_documents(self):
+		with self.engine.connect() as connection:
+			documents = load_documents(connection)
+
+		self.assertEqual(len(self.queries), 4)
+		self.assertEqual([document.number for document in documents], ["1", "2", "3", "4", "5"])
+
+		document = documents[0]
+		self.assertEqual(document.date, "2023-01-01")
+		self.assertEqual(document.type, "I")
+		self.assertEqual(document.customer.name, "Cliente 1")
+		self.assertEqual(document.total, 122.0)
+		self.assertEqual(document.cost_vat_code.percentage, "22")
+		self.assertIs(document.prices_include_vat, False)
+
+		self.assertEqual([row.description for row in document.rows], ["Riga 1", "Riga 2", "Riga 3"])
+		self.assertEqual([row.vat_info.code for row in document.rows], ["22", "22", "N4"])
+		self.assertEqual([row.stock for row in document.rows], [True, False, True])
+		self.assertEqual(document.rows[0].quantity, 2)
+		self.assertEqual(document.rows[0].price, 50.0)
+		self.assertIsNot(document.rows[0].vat_info, document.rows[1].vat_info)
+
+		self.assertEqual([payment.date for payment in document.payments], ["2023-02-01", "2023-03-01"])
+		self.assertEqual([payment.paid for payment in document.payments], [True, False])
+
+		# The prices of the documents with `UsaPrezzoIvato` include the VAT
+		self.assertEqual(documents[2].rows[0].price, 61.0)
+
+	def test_filters(self):
+		with self.engine.connect() as connection:
+			documents = load_documents(connection, types="I", date_from=date(2023, 1, 2), date_to=date(2023, 1, 5))
+
+		self.assertEqual(len(self.queries), 4)
+		self.assertEqual([document.number for document in documents], ["3", "5"])
+		self.assertTrue(all(len(document.rows) == 3 and len(document.payments) == 2 for document in documents))
+
+	def test_convert_types(self):
+		with self.engine.connect() as connection:
+			raw = load_documents(connection, types=["I", "C"], convert_types=False)[0]
+			native = load_documents(connection, types=["I", "C"], convert_types="native")[0]
+
+		self.assertEqual(raw.total, "122")
+		self.assertEqual(raw.rows[0].stock, "true")
+		self.assertEqual(native.total, Decimal("122"))
+		self.assertEqual(native.date, date(2023, 1, 1))
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,47 @@
+from decimal import Decimal
+from pathlib import Path
+import tempfile
+import unittest
+
+from easyfatt_db_connector.orm.static import TDocRighe
+from tests.helpers import create_test_engine
+
+try:
+	import pyarrow
+	import pyarrow.parquet
+except ImportError:
+	pyarrow = None
+
+if pyarrow is not None:
+	from easyfatt_db_connector.orm.export import arrow_schema, iter_record_batches, write_parquet
+
+
+@unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+class TestArrowExport(unittest.TestCase):
+	def test_schema(self):
+		schema = arrow_schema(TDocRighe)
+
+		self.assertEqual(schema.field("IDDocRiga").type, pyarrow.int32())
+		self.assertEqual(schema.field("IDDoc").type, pyarrow.int32())
+		self.assertEqual(schema.field("Qta").type, pyarrow.decimal128(18, 4))
+		self.assertEqual(schema.field("DataScadenza").type, pyarrow.date32())
+		self.assertEqual(schema.field("MovMagazz").type, pyarrow.bool_())
+
+	def test_record_batches(self):
+		with create_test_engine(rows=10).connect() as connection:
+			batches = list(iter_record_batches(connection, TDocRighe, batch_size=4, columns=["IDDocRiga", "Qta", "MovMagazz"]))
+
+		self.assertEqual([batch.num_rows for batch in batches], [4, 4, 2])
+		self.assertEqual(batches[0].column("Qta")[1].as_py(), Decimal("3.0000"))
+		self.assertEqual(batches[0].column("MovMagazz").to_pylist(), [True, False, True, False])
+
+	def test_write_parquet(self):
+		with tempfile.TemporaryDirectory() as folder, create_test_engine(rows=25).connect() as connection:
+			path = Path(folder) / "TDocRighe.parquet"
+
+			self.assertEqual(write_parquet(connection, TDocRighe, path, batch_size=10), 25)
+			self.assertEqual(pyarrow.parquet.read_table(path).num_rows, 25)
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -1,7 +1,12 @@
+import os
+from pathlib import Path
+import sys
 import unittest
+from unittest import mock
 
 from easyfatt_db_connector.core.connection import EasyfattFDB
 from easyfatt_db_connector.core.exceptions import FirebirdClientError
+from tests.helpers import TemporaryArchive
 
 TEST_DATABASE = "~/Documents/Danea Easyfatt/TestArchivio.eft"
 
@@ -19,6 +24,69 @@ class TestEasyfattFDB(unittest.TestCase):
 			self.assertGreater(len(tables), 10)
 			
 
+class TestDirectConnection(TemporaryArchive, unittest.TestCase):
+	def test_idle_archive(self):
+		with self.database.connect(direct=True) as connection:
+			self.assertEqual(connection.database_path, self.archive.resolve())
+			self.assertTrue(connection.read_only)
+
+		self.assertTrue(connection.closed)
+		self.assertIsNone(self.database.snapshots.current)
+
+	@unittest.skipIf(sys.platform == "win32", "flock is not available on Windows")
+	def test_is_locked(self):
+		import fcntl
+
+		self.assertFalse(self.database.is_locked())
+
+		with open(self.archive, "rb") as archive:
+			fcntl.flock(archive.fileno(), fcntl.LOCK_EX)
+			self.assertTrue(self.database.is_locked())
+
+			with self.database.connect(direct=True) as connection:
+				self.assertNotEqual(connection.database_path, self.archive.resolve())
+
+			fcntl.flock(archive.fileno(), fcntl.LOCK_UN)
+			self.assertFalse(self.database.is_locked())
+
+	def test_read_only_archive(self):
+		real_open = os.open
+
+		def open_read_only(path, flags, *args):
+			# E.g. an archive with the read-only attribute: Windows refuses to open it for writing
+			if flags & os.O_RDWR and Path(path) == self.database.archive_path:
+				error = PermissionError(13, "Access is denied")
+				error.winerror = 5
+				raise error
+
+			return real_open(path, flags, *args)
+
+		with mock.patch.object(sys, "platform", "win32"), mock.patch.object(os, "O_BINARY", 0, create=True):
+			with mock.patch("os.open", side_effect=open_read_only):
+				self.assertTrue(self.database.is_locked())
+
+				with self.database.connect(direct=True) as connection:
+					self.assertEqual(connection.database_path, self.database.snapshots.current.path)
+
+	def test_dispose(self):
+		with self.database as database:
+			with database.connect() as connection:
+				pass
+
+			snapshot = database.snapshots.current
+			self.assertTrue(snapshot.path.exists())
+
+		self.assertFalse(snapshot.path.exists())
+		self.assertIsNone(self.database.snapshots.current)
+
+	def test_locked_archive(self):
+		self.database.locked = True
+
+		with self.database.connect(direct=True) as connection:
+			self.assertEqual(connection.database_path, self.database.snapshots.current.path)
+			# The snapshot is shared with the other connections
+			self.assertTrue(connection.read_only)
+
 
 if __name__ == "__main__":
 	unittest.main()
\ No newline at end of file
@@ -0,0 +1,55 @@
+import unittest
+
+import sqlalchemy
+
+from easyfatt_db_connector.orm.keyset import iter_batches, iter_rows, keyset_columns
+from easyfatt_db_connector.orm.static import TDocRighe
+from tests.helpers import create_test_engine
+
+
+class TestKeysetPagination(unittest.TestCase):
+	def setUp(self):
+		self.engine = create_test_engine()
+
+	def tearDown(self):
+		self.engine.dispose()
+
+	def test_primary_key(self):
+		with self.engine.connect() as connection:
+			batches = list(iter_batches(connection, TDocRighe, batch_size=4))
+
+		self.assertEqual([len(batch.rows) for batch in batches], [4, 4, 2])
+		self.assertEqual([row.IDDocRiga for batch in batches for row in batch.rows], list(range(1, 11)))
+		self.assertEqual(batches[0].last_key, (4,))
+
+	def test_index(self):
+		self.assertEqual([column.name for column in keyset_columns(TDocRighe, "TDocRighe_I2")], ["IDDoc", "IDDocRiga"])
+		self.assertEqual([column.name for column in keyset_columns(TDocRighe, "IDDoc")], ["IDDoc", "IDDocRiga"])
+
+		with self.engine.connect() as connection:
+			rows = list(iter_rows(connection, TDocRighe, batch_size=2, key="TDocRighe_I2"))
+			expected = connection.execute(
+				sqlalchemy.select(TDocRighe.__table__).order_by(TDocRighe.IDDoc, TDocRighe.IDDocRiga)
+			).fetchall()
+
+		self.assertEqual(rows, expected)
+
+	def test_resume(self):
+		with self.engine.connect() as connection:
+			first = next(iter_batches(connection, TDocRighe, batch_size=3, key="TDocRighe_I2", columns=["Desc"]))
+			rest = list(iter_rows(connection, TDocRighe, batch_size=3, key="TDocRighe_I2", after=first.last_key, columns=["Desc"]))
+
+			all_rows = list(iter_rows(connection, TDocRighe, batch_size=100, key="TDocRighe_I2", columns=["Desc"]))
+
+		self.assertEqual(first.rows + rest, all_rows)
+		self.assertEqual(list(all_rows[0]._fields), ["Desc", "IDDoc", "IDDocRiga"])
+
+	def test_where(self):
+		with self.engine.connect() as connection:
+			rows = list(iter_rows(connection, TDocRighe, batch_size=2, where=TDocRighe.IDDoc == 1))
+
+		self.assertEqual([row.IDDocRiga for row in rows], [5, 6, 7])
+
+
+if __name__ == "__main__":
+	unittest.main()
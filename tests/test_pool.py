@@ -0,0 +1,61 @@
+import threading
+import unittest
+
+from easyfatt_db_connector.core.connection import FDBConnectionPool
+from easyfatt_db_connector.core.exceptions import PoolTimeoutError
+from tests.helpers import TemporaryArchive
+
+
+class TestFDBConnectionPool(TemporaryArchive, unittest.TestCase):
+	def test_connections_are_reused(self):
+		with FDBConnectionPool(self.database, size=2) as pool:
+			with pool.connection() as first:
+				pass
+
+			with pool.connection() as second:
+				self.assertIs(first, second)
+
+		self.assertEqual(self.database.opened, 1)
+		self.assertTrue(first.read_only)
+		self.assertTrue(first.closed)
+
+	def test_connections_are_recycled(self):
+		with FDBConnectionPool(self.database, size=2) as pool:
+			with pool.connection() as first:
+				pass
+
+			self.archive.write_bytes(b"version 2")
+
+			with pool.connection() as second:
+				self.assertIsNot(first, second)
+				self.assertNotEqual(first.database_path, second.database_path)
+
+			self.assertTrue(first.closed)
+			self.assertFalse(first.database_path.exists())
+
+	def test_timeout(self):
+		with FDBConnectionPool(self.database, size=1, timeout=0.05) as pool:
+			with pool.connection():
+				self.assertRaises(PoolTimeoutError, lambda: pool.connection().__enter__())
+
+	def test_concurrent_checkout(self):
+		borrowed = []
+
+		def worker(pool):
+			for _ in range(20):
+				with pool.connection() as connection:
+					borrowed.append(connection)
+
+		with FDBConnectionPool(self.database, size=3) as pool:
+			threads = [threading.Thread(target=worker, args=(pool,)) for _ in range(6)]
+			for thread in threads:
+				thread.start()
+			for thread in threads:
+				thread.join()
+
+		self.assertEqual(len(borrowed), 120)
+		self.assertLessEqual(self.database.opened, 3)
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,54 @@
+from pathlib import Path
+import tempfile
+import unittest
+
+from easyfatt_db_connector.core.connection._snapshot import SnapshotManager
+
+
+class TestSnapshotManager(unittest.TestCase):
+	def setUp(self):
+		self.folder = tempfile.TemporaryDirectory()
+		self.archive = Path(self.folder.name) / "archive.eft"
+		self.archive.write_bytes(b"version 1")
+
+		self.manager = SnapshotManager(self.archive, directory=self.folder.name)
+
+	def tearDown(self):
+		self.manager.close()
+		self.folder.cleanup()
+
+	def test_snapshot_is_reused(self):
+		with self.manager.acquire() as first:
+			self.assertEqual(first.path.read_bytes(), b"version 1")
+			self.assertIn(first.strategy, ("reflink", "copy_file_range", "sendfile", "buffered"))
+
+		with self.manager.acquire() as second:
+			self.assertIs(first, second)
+			self.assertTrue(second.path.exists())
+
+	def test_snapshot_is_refreshed(self):
+		with self.manager.acquire() as first:
+			self.archive.write_bytes(b"version 2")
+			self.assertTrue(self.manager.is_stale())
+
+			with self.manager.acquire() as second:
+				self.assertIsNot(first, second)
+				self.assertEqual(second.path.read_bytes(), b"version 2")
+
+			# The old snapshot is still in use and MUST NOT be deleted yet
+			self.assertTrue(first.path.exists())
+
+		self.assertFalse(first.path.exists())
+		self.assertTrue(second.path.exists())
+
+	def test_close(self):
+		with self.manager.acquire() as snapshot:
+			pass
+
+		self.manager.close()
+		self.assertFalse(snapshot.path.exists())
+		self.assertIsNone(self.manager.current)
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,79 @@
+from pathlib import Path
+import unittest
+from unittest import mock
+
+import fdb
+import sqlalchemy.exc
+import sqlalchemy.pool
+
+from easyfatt_db_connector.core.connection import EasyfattDB
+from tests.helpers import TemporaryArchive, fake_connect
+
+
+class TestEasyfattDB(TemporaryArchive, unittest.TestCase):
+	database_class = EasyfattDB
+
+	def test_engine_is_cached(self):
+		engine = self.database.engine
+
+		self.assertIs(engine, self.database.engine)
+		self.assertEqual(Path(engine.url.database), self.database.snapshots.current.path)
+		self.assertEqual(engine.pool.size(), self.database.pool_size)
+
+	def test_engine_is_rebuilt(self):
+		engine = self.database.engine
+		old_snapshot = self.database.snapshots.current
+
+		self.archive.write_bytes(b"version 2")
+
+		self.assertIsNot(engine, self.database.engine)
+		self.assertFalse(old_snapshot.path.exists())
+
+	def test_pinned_engine_is_not_disposed(self):
+		with self.database._pinned_engine() as engine:
+			old_snapshot = self.database.snapshots.current
+			self.archive.write_bytes(b"version 2")
+
+			# A concurrent refresh must not delete the snapshot used by the pinned engine
+			self.assertIsNot(engine, self.database.engine)
+			self.assertTrue(old_snapshot.path.exists())
+
+		self.assertFalse(old_snapshot.path.exists())
+
+	def test_engine_is_read_only(self):
+		insert = sqlalchemy.text("INSERT INTO TEST (VALUE) VALUES (:value)")
+
+		with mock.patch("fdb.connect", side_effect=fake_connect):
+			with self.assertRaises(sqlalchemy.exc.DatabaseError):
+				with self.database.session() as session:
+					session.execute(insert, {"value": 1})
+					session.commit()
+
+			# The write must not be visible to the other users of the shared snapshot
+			with self.database.connect() as connection:
+				rows = connection.execute(sqlalchemy.text("SELECT VALUE FROM TEST")).fetchall()
+
+		self.assertEqual(rows, [])
+
+	def test_direct_engine(self):
+		engine = self.database.direct_engine
+
+		self.assertIs(engine, self.database.direct_engine)
+		self.assertEqual(Path(engine.url.database), self.archive)
+		self.assertIsInstance(engine.pool, sqlalchemy.pool.NullPool)
+		self.assertIsNone(self.database.snapshots.current)
+
+	def test_direct_connection(self):
+		with mock.patch("fdb.connect", side_effect=fake_connect):
+			with self.database.connect(direct=True) as connection:
+				dbapi_connection = connection.connection.dbapi_connection
+
+		self.assertEqual(Path(dbapi_connection.kwargs["database"]), self.archive)
+		self.assertEqual(dbapi_connection.kwargs["isolation_level"], fdb.ISOLATION_LEVEL_READ_COMMITED_RO)
+		self.assertTrue(dbapi_connection.kwargs["no_gc"])
+		self.assertTrue(dbapi_connection.closed)
+		self.assertIsNone(self.database.snapshots.current)
+
+
+if __name__ == "__main__":
+	unittest.main()
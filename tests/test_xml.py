@@ -0,0 +1,573 @@
+import base64
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+import io
+import os
+from pathlib import Path
+import pickle
+import tempfile
+from typing import Literal, Optional, Union
+import unittest
+from unittest import mock
+
+try:
+	import pyarrow
+except ImportError:
+	pyarrow = None
+
+from easyfatt_db_connector.core.exceptions import SourceChangedError, TypeConversionError
+from easyfatt_db_connector.xml import EasyfattXML, ParseDiagnostics, iter_documents, read_arrow, read_columns, read_header, read_xml, read_xml_many, write_xml
+from easyfatt_db_connector.xml.common import ConverterRegistry, Field, XMLMapper
+from easyfatt_db_connector.xml.common.converters import converters
+from easyfatt_db_connector.xml.document import CustomerInfo, Document, Payment
+from easyfatt_db_connector.xml.product import Product
+from easyfatt_db_connector.xml.vat_code import VatCode
+
+TEST_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<EasyfattDocuments AppVersion="2" Creator="Danea Soft" CreatorUrl="http://www.danea.it">
+	<Company>
+		<Name>Tuttobimbi Srl</Name>
+		<City>Vigonza</City>
+	</Company>
+	<Documents>
+		<Document>
+			<CustomerName>Amici del Gioco</CustomerName>
+			<DocumentType>I</DocumentType>
+			<Date>2009-02-28</Date>
+			<Number>72</Number>
+			<Total>613.92</Total>
+			<PricesIncludeVat>false</PricesIncludeVat>
+			<Payments>
+				<Payment>
+					<Advance>false</Advance>
+					<Date>2009-03-31</Date>
+					<Amount>306.96</Amount>
+					<Paid>true</Paid>
+				</Payment>
+			</Payments>
+			<Rows>
+				<Row>
+					<Code>0011</Code>
+					<Description>Anello refrigerante</Description>
+					<Qty>5</Qty>
+					<Price>5.24</Price>
+					<VatCode Perc="20" Class="Imponibile">20</VatCode>
+					<Stock>false</Stock>
+				</Row>
+				<Row>
+					<Code>0010</Code>
+					<Qty>2</Qty>
+				</Row>
+			</Rows>
+		</Document>
+	</Documents>
+</EasyfattDocuments>
+"""
+
+class TestXMLMapper(unittest.TestCase):
+	def test_read_xml(self):
+		xml = read_xml(text=TEST_XML)
+
+		self.assertEqual(xml.protocol_version, "2")
+		self.assertEqual(xml.company.name, "Tuttobimbi Srl")
+		self.assertEqual(len(xml.documents), 1)
+
+		document = xml.documents[0]
+		self.assertEqual(document.number, "72")
+		self.assertEqual(document.type, "I")
+		self.assertEqual(document.total, 613.92)
+		self.assertEqual(document.prices_include_vat, False)
+		self.assertEqual(document.customer.name, "Amici del Gioco")
+		self.assertEqual([row.code for row in document.rows], ["0011", "0010"])
+		self.assertEqual(document.rows[0].vat_info.vat_class, "Imponibile")
+		self.assertEqual(document.payments[0].paid, True)
+
+	def test_read_xml_file(self):
+		with tempfile.TemporaryDirectory() as folder:
+			xml_file = Path(folder) / "test.DefXml"
+			xml_file.write_bytes(b"\xef\xbb\xbf \r\n" + TEST_XML.encode("utf-8"))
+
+			self.assertEqual(repr(read_xml(xml_file)), repr(read_xml(text=TEST_XML)))
+			self.assertEqual(len(list(iter_documents(xml_file))), 1)
+
+	def test_no_type_conversion(self):
+		document = read_xml(text=TEST_XML, convert_types=False).documents[0]
+
+		self.assertEqual(document.total, "613.92")
+		self.assertEqual(document.rows[0].quantity, "5")
+
+	def test_native_types(self):
+		document = read_xml(text=TEST_XML, convert_types="native").documents[0]
+
+		self.assertEqual(document.date, date(2009, 2, 28))
+		self.assertEqual(document.total, Decimal("613.92"))
+		self.assertEqual(document.payments[0].amount, Decimal("306.96"))
+		self.assertEqual(document.rows[0].price, Decimal("5.24"))
+		self.assertEqual(document.rows[1].price, Decimal("0"))
+		self.assertEqual(document.rows[0].expiry_date, date(2999, 12, 31))
+		self.assertEqual(document.rows[0].quantity, 5)
+
+		# The default conversion is not affected
+		self.assertEqual(read_xml(text=TEST_XML).documents[0].date, "2009-02-28")
+
+	def test_conversion_error(self):
+		self.assertRaisesRegex(
+			TypeConversionError,
+			r"`Payment.amount`: `abc` cannot be converted to `float`",
+			lambda: Payment.from_xml_string("<Payment><Amount>abc</Amount></Payment>"),
+		)
+
+	def test_children_dispatch(self):
+		document = Document.from_xml_string(
+			"<Document><!-- comment --><Number>1</Number><Number>2</Number>"
+			"<Rows><Row><Code>A</Code></Row></Rows><CustomerName>Mario</CustomerName><Rows><Row><Code>B</Code></Row></Rows></Document>"
+		)
+
+		# Like `find`, the first element wins, while the items of all the containers are collected (like `Rows/Row`)
+		self.assertEqual(document.number, "1")
+		self.assertEqual([row.code for row in document.rows], ["A", "B"])
+		self.assertEqual(document.customer.name, "Mario")
+		self.assertEqual(Document._get_parse_plan().container_tags, frozenset({"Rows", "Payments"}))
+
+	def test_parse_plan_is_cached(self):
+		read_xml(text=TEST_XML)
+
+		self.assertIs(Document._get_parse_plan(), Document._get_parse_plan())
+		self.assertIn("Rows", Document._get_parse_plan().tracked_tags)
+		self.assertIn("CustomerName", Document._get_parse_plan().tracked_tags)
+		self.assertNotIn("Rows", Product._get_parse_plan().tracked_tags)
+
+
+class Point(object):
+	def __init__(self, x: int, y: int):
+		self.x, self.y = x, y
+
+
+@dataclass(eq=False, init=False, repr=False)
+class ConvertedRow(XMLMapper):
+	__xml_name__ = "Row"
+	__xml_mapping__ = {
+		"code": "Code",
+		"kind": "@Kind",
+		"amount": "Amount",
+		"flag": "Flag",
+		"point": "Point",
+		"vat_info": "VatCode",
+		"other_vat_info": Field(tag="OtherVatCode"),
+	}
+
+	code: Union[int, str] = ""
+	kind: Optional[Literal["A", "B"]] = None
+	amount: Optional[float] = 0
+	flag: Optional[bool] = None
+	point: Optional[Point] = None
+	vat_info: Optional[VatCode] = None
+	other_vat_info: Optional[VatCode] = None
+
+
+class TestConverters(unittest.TestCase):
+	def test_resolve(self):
+		registry = ConverterRegistry()
+		registry.register(int, int)
+
+		self.assertIs(registry.resolve(int), int)
+		self.assertIs(registry.resolve(Optional[int]), int)
+		self.assertIsNone(registry.resolve(Optional[str]))
+		self.assertIsNone(registry.resolve(list))
+
+	def test_mapping(self):
+		row = ConvertedRow.from_xml_string(
+			'<Row Kind="B"><Code>A12</Code><Amount>1.5</Amount><Flag>true</Flag>'
+			'<VatCode Perc="22">22</VatCode><OtherVatCode Perc="10">10</OtherVatCode></Row>'
+		)
+
+		self.assertEqual(row.code, "A12")
+		self.assertEqual(row.kind, "B")
+		self.assertEqual(row.amount, 1.5)
+		self.assertIs(row.flag, True)
+		self.assertEqual(row.vat_info.percentage, "22")
+		self.assertEqual(row.other_vat_info.code, "10")
+		self.assertEqual(ConvertedRow.from_xml_string("<Row><Code>12</Code></Row>").code, 12)
+
+	def test_native_conversion_error(self):
+		self.assertRaisesRegex(
+			TypeConversionError,
+			r"`Payment.date`: `31/03/2009` cannot be converted to `date`",
+			lambda: Payment.from_xml_string("<Payment><Date>31/03/2009</Date></Payment>", convert_types="native"),
+		)
+
+	def test_literal(self):
+		# The values not in the `Literal` (e.g. a new type of document) are kept as they are
+		self.assertEqual(ConvertedRow.from_xml_string('<Row Kind="C"/>').kind, "C")
+		self.assertEqual(Document.from_xml_string("<Document><DocumentType>Z</DocumentType></Document>").type, "Z")
+
+	def test_register_converter(self):
+		self.assertEqual(ConvertedRow.from_xml_string("<Row><Point>1,2</Point></Row>").point, "1,2")
+
+		converters.register(Point, lambda text: Point(*map(int, text.split(","))))
+		try:
+			point = ConvertedRow.from_xml_string("<Row><Point>1,2</Point></Row>").point
+		finally:
+			converters.unregister(Point)
+
+		self.assertEqual((point.x, point.y), (1, 2))
+
+
+class TestXMLStream(unittest.TestCase):
+	def test_iter_documents(self):
+		documents = list(iter_documents(io.BytesIO(TEST_XML.encode("utf-8"))))
+
+		self.assertEqual(len(documents), 1)
+		self.assertEqual(repr(documents[0]), repr(read_xml(text=TEST_XML).documents[0]))
+
+	def test_read_header(self):
+		header = read_header(io.BytesIO(TEST_XML.encode("utf-8")))
+
+		self.assertEqual(header.protocol_version, "2")
+		self.assertEqual(header.creator_name, "Danea Soft")
+		self.assertEqual(header.company.city, "Vigonza")
+		self.assertEqual(header.documents, [])
+
+
+class TestParseDiagnostics(unittest.TestCase):
+	def setUp(self):
+		self.text = TEST_XML.replace("<Stock>", "<Unknown>1</Unknown><Stock>").replace("<Qty>2", "<Unknown/><Qty>2")
+
+	def test_logged_once(self):
+		with self.assertLogs("easyfatt_db_connector.xml.common.diagnostics") as logs:
+			read_xml(text=self.text)
+
+		self.assertEqual(len(logs.records), 1)
+		self.assertIn("<Unknown>", logs.output[0])
+		self.assertIn("Product", logs.output[0])
+		self.assertIn("found 2 times", logs.output[0])
+
+	def test_collected(self):
+		diagnostics = ParseDiagnostics()
+		with mock.patch.object(ParseDiagnostics, "log") as log:
+			list(iter_documents(io.BytesIO(self.text.encode("utf-8")), diagnostics=diagnostics))
+
+		log.assert_not_called()
+
+		untracked = diagnostics.untracked["Product", "Unknown"]
+		self.assertEqual(untracked.count, 2)
+		self.assertEqual(untracked.first_path, "/EasyfattDocuments/Documents/Document/Rows/Row[1]/Unknown")
+
+	def test_disabled(self):
+		diagnostics = ParseDiagnostics()
+		Product.__xml_check_untracked__ = False
+		try:
+			read_xml(text=self.text, diagnostics=diagnostics)
+		finally:
+			del Product.__xml_check_untracked__
+
+		self.assertFalse(diagnostics)
+
+
+class TestXMLParallel(unittest.TestCase):
+	def setUp(self):
+		self.folder = tempfile.TemporaryDirectory()
+		self.paths = []
+
+		for index, total in enumerate(["1.5", "abc", "3"]):
+			path = Path(self.folder.name) / f"{index}.DefXml"
+			path.write_text(TEST_XML.replace("613.92", total), encoding="utf-8")
+			self.paths.append(path)
+
+	def tearDown(self):
+		self.folder.cleanup()
+
+	def test_read_xml_many(self):
+		results = list(read_xml_many(self.paths, workers=2))
+
+		self.assertEqual([result.path for result in results], self.paths)
+		self.assertEqual([result.ok for result in results], [True, False, True])
+		self.assertEqual(results[2].xml.documents[0].total, 3)
+		self.assertIsInstance(results[1].error, TypeConversionError)
+		self.assertRaises(TypeConversionError, results[1].unwrap)
+
+	def test_unordered(self):
+		results = list(read_xml_many(self.paths, workers=2, ordered=False))
+
+		self.assertEqual(sorted(result.path for result in results), self.paths)
+
+	def test_single_worker(self):
+		self.paths[0].write_text("<EasyfattDocuments>", encoding="utf-8")
+		results = list(read_xml_many(self.paths, workers=1))
+
+		self.assertEqual([result.ok for result in results], [False, False, True])
+
+
+class TestXMLParallelDocuments(unittest.TestCase):
+	def test_map_documents(self):
+		text = TEST_XML.replace("<Documents>", "<Documents>" + "".join(
+			f"<Document><Number>{number}</Number><Pdf FileName='{number}.pdf'>SGVsbG8=</Pdf></Document>"
+			for number in range(10)
+		))
+
+		xml = EasyfattXML.from_xml_string(text.encode("utf-8"), workers=2, chunk_size=3)
+
+		self.assertEqual(repr(xml), repr(read_xml(text=text)))
+		self.assertEqual([document.number for document in xml.documents], [*map(str, range(10)), "72"])
+		self.assertEqual(xml.documents[4].pdf.filename, "4.pdf")
+		self.assertEqual(xml.documents[4].pdf.read(), b"Hello")
+
+		compact = EasyfattXML.compact_class().from_xml_string(text.encode("utf-8"), workers=2, chunk_size=3)
+		self.assertEqual(repr(compact), repr(xml))
+		self.assertFalse(hasattr(compact.documents[4].pdf, "__dict__"))
+
+	def test_untracked_paths(self):
+		text = TEST_XML.replace("<Documents>", "<Documents>" + "".join(
+			f"<Document><Number>{number}</Number></Document>" for number in range(4)
+		)).replace("<Qty>2", "<Unknown/><Qty>2")
+
+		for workers in (1, 2):
+			diagnostics = ParseDiagnostics()
+			EasyfattXML.from_xml_string(text.encode("utf-8"), workers=workers, chunk_size=2, _diagnostics=diagnostics)
+
+			# The same path of the single-process parsing, not the one inside the chunk
+			self.assertEqual(
+				diagnostics.untracked["Product", "Unknown"].first_path,
+				"/EasyfattDocuments/Documents/Document[5]/Rows/Row[2]/Unknown",
+			)
+
+	def test_read_xml(self):
+		with tempfile.TemporaryDirectory() as folder:
+			xml_file = Path(folder) / "test.DefXml"
+			xml_file.write_text(TEST_XML, encoding="utf-8")
+
+			self.assertEqual(repr(read_xml(xml_file, workers=2)), repr(read_xml(xml_file)))
+
+
+class TestCompactClasses(unittest.TestCase):
+	def test_read_xml(self):
+		xml = read_xml(text=TEST_XML, compact=True)
+		document = xml.documents[0]
+
+		self.assertEqual(repr(xml), repr(read_xml(text=TEST_XML)))
+		self.assertFalse(hasattr(document, "__dict__"))
+		self.assertFalse(hasattr(document.rows[0].vat_info, "__dict__"))
+		self.assertIs(type(document), Document.compact_class())
+		self.assertEqual(document.rows[1].price, 0)
+		self.assertEqual(document.rows[1].vat_info, None)
+
+		document.rows[1].price = 1.5
+		self.assertEqual(document.rows[1].price, 1.5)
+		self.assertRaises(AttributeError, lambda: document.missing)
+
+	def test_interned_values(self):
+		first, second = read_xml(text=TEST_XML.replace("<Qty>2</Qty>", "<Description>Anello refrigerante</Description>"), compact=True).documents[0].rows
+
+		self.assertIs(first.description, second.description)
+
+	def test_pickle(self):
+		xml = read_xml(text=TEST_XML, compact=True, convert_types="native")
+
+		self.assertEqual(repr(pickle.loads(pickle.dumps(xml))), repr(xml))
+
+	def test_streamed_documents(self):
+		with tempfile.TemporaryDirectory() as folder:
+			xml_file = Path(folder) / "test.DefXml"
+			xml_file.write_text(TEST_XML, encoding="utf-8")
+
+			document = next(iter_documents(xml_file, compact=True))
+			self.assertIs(type(document), Document.compact_class())
+			self.assertEqual(repr(read_xml(xml_file, workers=2, compact=True)), repr(read_xml(xml_file)))
+
+
+class TestColumns(unittest.TestCase):
+	def setUp(self):
+		self.folder = tempfile.TemporaryDirectory()
+		self.xml_file = Path(self.folder.name) / "test.DefXml"
+		self.xml_file.write_text(
+			TEST_XML.replace("<Documents>", "<Documents><Document><Number>1</Number><Pdf FileName='a.pdf'>SGVsbG8=</Pdf></Document>"),
+			encoding="utf-8",
+		)
+
+	def tearDown(self):
+		self.folder.cleanup()
+
+	def test_read_columns(self):
+		tables = read_columns(self.xml_file)
+
+		self.assertEqual(set(tables), {"documents", "rows", "payments"})
+		self.assertEqual(tables["documents"]["document"], [0, 1])
+		self.assertEqual(tables["documents"]["number"], ["1", "72"])
+		self.assertEqual(tables["documents"]["customer.name"], ["", "Amici del Gioco"])
+		self.assertEqual(tables["documents"]["pdf.filename"], ["a.pdf", None])
+		self.assertNotIn("pdf.content", tables["documents"])
+		self.assertEqual(tables["rows"]["document"], [1, 1])
+		self.assertEqual(tables["rows"]["quantity"], [5, 2])
+		self.assertEqual(tables["rows"]["vat_info.percentage"], ["20", None])
+		self.assertEqual(tables["payments"]["amount"], [306.96])
+
+	def test_same_columns_of_objects(self):
+		for convert_types in (True, False, "native"):
+			self.assertEqual(
+				read_columns(self.xml_file, convert_types=convert_types),
+				read_xml(self.xml_file, convert_types=convert_types).to_columns(),
+			)
+
+	@unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+	def test_read_arrow(self):
+		rows = read_arrow(self.xml_file, convert_types="native")["rows"]
+
+		self.assertEqual(rows.num_rows, 2)
+		self.assertEqual(rows.schema.field("quantity").type, pyarrow.int64())
+		self.assertTrue(pyarrow.types.is_decimal(rows.schema.field("price").type))
+		self.assertEqual(read_xml(self.xml_file).to_arrow()["documents"].num_rows, 2)
+
+
+class TestXMLWriter(unittest.TestCase):
+	def test_round_trip(self):
+		for convert_types in (True, False, "native"):
+			xml = read_xml(text=TEST_XML, convert_types=convert_types)
+			written = xml.to_xml_string()
+
+			self.assertEqual(repr(read_xml(text=written, convert_types=convert_types)), repr(xml))
+
+	def test_native_defaults_are_not_written(self):
+		for compact in (False, True):
+			row = read_xml(text=TEST_XML, convert_types="native", compact=compact).documents[0].rows[1]
+			self.assertEqual(row.price, Decimal("0"))
+
+			for copy in (row, pickle.loads(pickle.dumps(row))):
+				element = copy.to_xml()
+				self.assertEqual([child.tag for child in element], ["Code", "Qty"])
+
+			# Once changed, the value is written
+			row.price = Decimal("1.5")
+			self.assertEqual(row.to_xml().findtext("Price"), "1.5")
+
+	def test_to_xml(self):
+		row = read_xml(text=TEST_XML).documents[0].rows[0]
+		element = row.to_xml()
+
+		self.assertEqual(element.tag, "Row")
+		self.assertEqual(element.findtext("Qty"), "5")
+		self.assertEqual(element.findtext("Stock"), "false")
+		self.assertEqual(element.find("VatCode").text, "20")
+		self.assertEqual(element.find("VatCode").get("Perc"), "20")
+		self.assertIsNone(element.find("Notes"))
+
+	def test_field_groups(self):
+		document = Document()
+		document.number = "1"
+		document.total = 1e-05
+		document.date = date(2023, 1, 31)
+		document.customer = CustomerInfo()
+		document.customer.name = "Mario Rossi"
+		element = document.to_xml()
+
+		self.assertEqual(element.findtext("CustomerName"), "Mario Rossi")
+		self.assertEqual(element.findtext("Total"), "0.00001")
+		self.assertEqual(element.findtext("Date"), "2023-01-31")
+		self.assertEqual(Document.from_xml(element).customer.name, "Mario Rossi")
+
+	def test_write_xml(self):
+		with tempfile.TemporaryDirectory() as folder:
+			source = Path(folder) / "source.DefXml"
+			source.write_text(TEST_XML.replace("</Document>", "<Pdf FileName='a.pdf'>SGVsbG8=</Pdf></Document>"), encoding="utf-8")
+			destination = Path(folder) / "destination.DefXml"
+
+			write_xml(destination, read_header(source), iter_documents(source))
+
+			xml = read_xml(destination)
+			self.assertEqual(xml.company.name, "Tuttobimbi Srl")
+			self.assertEqual(xml.documents[0].rows[0].vat_info.vat_class, "Imponibile")
+			self.assertEqual(xml.documents[0].pdf.filename, "a.pdf")
+			self.assertEqual(xml.documents[0].pdf.read(), b"Hello")
+			self.assertEqual(read_columns(destination), read_columns(source))
+
+
+class TestDocumentPDFFile(unittest.TestCase):
+	def setUp(self):
+		self.folder = tempfile.TemporaryDirectory()
+		self.pdf = os.urandom(100_000)
+
+		# Two PDFs in the same document, the second one on the same line of the end of the first one
+		encoded = base64.encodebytes(self.pdf).decode("ascii")
+		self.xml_file = Path(self.folder.name) / "pdf.DefXml"
+		self.xml_file.write_text(
+			TEST_XML.replace(
+				"</Document>",
+				f'<Pdf FileName="a.pdf">{encoded}</Pdf></Document><Document><Pdf FileName="b.pdf">{encoded[:-9]}\r\n</Pdf></Document>',
+			),
+			encoding="utf-8",
+		)
+
+	def tearDown(self):
+		self.folder.cleanup()
+
+	def test_lazy_content(self):
+		first, second = [document.pdf for document in read_xml(self.xml_file, lazy_pdf=True).documents]
+
+		self.assertTrue(first.is_lazy)
+		self.assertNotIn("_text", first.__dict__)
+		self.assertEqual(first.filename, "a.pdf")
+		self.assertEqual(first.read(), self.pdf)
+		self.assertEqual(base64.b64decode(second.content), base64.b64decode(base64.encodebytes(self.pdf)[:-9]))
+
+		buffer = io.BytesIO()
+		self.assertEqual(first.save(buffer, chunk_size=1000), len(self.pdf))
+		self.assertEqual(buffer.getvalue(), self.pdf)
+
+	def test_streamed_documents(self):
+		pdf = next(iter_documents(self.xml_file, lazy_pdf=True)).pdf
+
+		self.assertTrue(pdf.is_lazy)
+		self.assertEqual(pdf.read(), self.pdf)
+
+	def test_content_from_string(self):
+		pdf = read_xml(text=self.xml_file.read_text(encoding="utf-8"), lazy_pdf=True).documents[0].pdf
+
+		self.assertFalse(pdf.is_lazy)
+		self.assertEqual(pdf.read(), self.pdf)
+
+	def test_source_changed(self):
+		pdf = read_xml(self.xml_file, lazy_pdf=True).documents[0].pdf
+		self.xml_file.write_text(TEST_XML, encoding="utf-8")
+
+		self.assertRaises(SourceChangedError, pdf.read)
+
+	def test_write_crlf(self):
+		# Base64 with Windows line breaks
+		encoded = base64.encodebytes(self.pdf).decode("ascii").replace("\n", "\r\n")
+		self.xml_file.write_bytes(
+			TEST_XML.replace("</Document>", f'<Pdf FileName="a.pdf">{encoded}</Pdf></Document>').encode("utf-8")
+		)
+		destination = Path(self.folder.name) / "destination.DefXml"
+
+		write_xml(destination, read_header(self.xml_file), iter_documents(self.xml_file))
+
+		self.assertNotIn(b"&#13;", destination.read_bytes())
+		pdf = read_xml(destination, lazy_pdf=True).documents[0].pdf
+		self.assertTrue(pdf.is_lazy)
+		self.assertEqual(pdf.read(), self.pdf)
+
+	def test_load(self):
+		pdf = read_xml(self.xml_file, lazy_pdf=True).documents[0].pdf
+		pdf.load()
+		self.xml_file.unlink()
+
+		self.assertFalse(pdf.is_lazy)
+		self.assertEqual(pdf.read(), self.pdf)
+
+	def test_eager_by_default(self):
+		pdfs = [
+			read_xml(self.xml_file).documents[0].pdf,
+			read_xml(self.xml_file, workers=2).documents[0].pdf,
+			next(iter_documents(self.xml_file)).pdf,
+			next(read_xml_many([self.xml_file], workers=1)).xml.documents[0].pdf,
+		]
+		# E.g. a file moved away after being imported
+		self.xml_file.unlink()
+
+		for pdf in pdfs:
+			self.assertFalse(pdf.is_lazy)
+			self.assertEqual(pdf.read(), self.pdf)
+
+
+if __name__ == "__main__":
+	unittest.main()